@@ -366,11 +366,17 @@ class ApplicationManager:
             # Initialize progress manager
             self.progress_manager = ProgressManager()
             
-            # Initialize downloader with system binaries
-            system_config = self.config.get("system_binaries", {})
+            # Initialize downloader with system binaries and download settings
             self.downloader = YouTubeDownloader(
                 app_root=self.app_root,
-                config=system_config
+                config=self.config,
+                progress_manager=self.progress_manager
+            )
+            
+            # Pick up downloads interrupted by the last shutdown
+            download_settings = self.config.get('download_settings', {})
+            self.downloader.restore_interrupted_downloads(
+                auto_resume=download_settings.get('resume_on_startup', True)
             )
             
             # Initialize worker manager
@@ -519,6 +525,10 @@ class ApplicationManager:
             if self.worker_manager:
                 self.worker_manager.cleanup()
             
+            # Stop dispatching queued downloads
+            if self.downloader:
+                self.downloader.shutdown()
+            
             # Clean up progress manager
             if self.progress_manager:
                 self.progress_manager.cleanup()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for per-update progress handling
+Compares the validated ProgressInfo model with the ProgressRecord used on
+the download hot path, for the two operations every progress update goes
+through: building the state of a yt-dlp hook call and updating fields.
+Also times the downloader's real progress hook with a progress manager
+and counts the ProgressInfo models it builds
+"""
+
+import sys
+import timeit
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from downloader.core import YouTubeDownloader
+from downloader.progress import ProgressManager
+from downloader.validation import ProgressInfo, ProgressRecord, ProgressStatus
+
+ITERATIONS = 20000
+
+HOOK_FIELDS = {
+    'request_id': 'benchmark',
+    'status': ProgressStatus.DOWNLOADING,
+    'percentage': 42.5,
+    'downloaded_bytes': 44564480,
+    'total_bytes': 104857600,
+    'speed': 5242880.0,
+    'eta': 11,
+    'filename': 'video.mp4',
+    'temp_filename': 'video.mp4.part',
+    'current_operation': 'Downloading video.mp4',
+}
+
+
+def measure(label, statement):
+    """Time a statement and print its cost per call"""
+    seconds = min(timeit.repeat(statement, number=ITERATIONS, repeat=3))
+    per_call = seconds / ITERATIONS * 1e6
+    print(f"  {label:<44} {per_call:8.2f} µs")
+    return per_call
+
+
+def benchmark_hook_update():
+    """Build the progress state of a yt-dlp hook call"""
+    
+    print("Hook update (new state per call):")
+    before = measure("ProgressInfo(**fields)", lambda: ProgressInfo(**HOOK_FIELDS))
+    after = measure("ProgressRecord(**fields)", lambda: ProgressRecord(**HOOK_FIELDS))
+    published = measure("ProgressRecord(**fields).to_info()", lambda: ProgressRecord(**HOOK_FIELDS).to_info())
+    print(f"  Speedup as a record: {before / after:.1f}x, converted to a model: {before / published:.1f}x")
+
+
+def benchmark_field_update():
+    """Change a few fields of the current progress state"""
+    
+    print("Field update (status and operation):")
+    info = ProgressInfo(**HOOK_FIELDS)
+    record = ProgressRecord(**HOOK_FIELDS)
+    
+    before = measure(
+        "ProgressInfo.update_progress(...)",
+        lambda: info.update_progress(status=ProgressStatus.PROCESSING, current_operation="Processing")
+    )
+    after = measure(
+        "ProgressRecord.copy().update(...)",
+        lambda: record.copy().update(status=ProgressStatus.PROCESSING, current_operation="Processing")
+    )
+    published = measure(
+        "ProgressRecord.copy().update(...).to_info()",
+        lambda: record.copy().update(status=ProgressStatus.PROCESSING, current_operation="Processing").to_info()
+    )
+    print(f"  Speedup as a record: {before / after:.1f}x, converted to a model: {before / published:.1f}x")
+
+
+def benchmark_hook_path():
+    """Run yt-dlp progress dictionaries through the downloader's hook"""
+    
+    print("Progress hook (downloader with progress manager and event listener):")
+    with tempfile.TemporaryDirectory() as temp:
+        manager = ProgressManager()
+        manager.add_event_listener(lambda event: None)
+        downloader = YouTubeDownloader(Path(temp), {}, progress_manager=manager)
+        
+        request_id = 'benchmark'
+        record = ProgressRecord(request_id=request_id, status=ProgressStatus.DOWNLOADING)
+        downloader.active_downloads[request_id] = {
+            'progress': record,
+            'cancel_event': threading.Event(),
+            'partial_files': {'video.mp4.part'},
+        }
+        manager.register_progress(request_id, record)
+        
+        # Count the models built, wherever they are built
+        built = [0]
+        construct = ProgressInfo.construct.__func__
+        
+        def counting_construct(cls, *args, **kwargs):
+            built[0] += 1
+            return construct(cls, *args, **kwargs)
+        
+        ProgressInfo.construct = classmethod(counting_construct)
+        step = [0]
+        
+        def hook():
+            step[0] += 1
+            downloader._progress_hook(request_id, {
+                'status': 'downloading',
+                'downloaded_bytes': step[0] * 1024,
+                'total_bytes': 104857600,
+                'speed': 5242880.0,
+                'eta': 11,
+                'filename': 'video.mp4',
+                'tmpfilename': 'video.mp4.part',
+            })
+        
+        try:
+            without_callback = measure("_progress_hook()", hook)
+            manager.flush_events()
+            per_hook = built[0] / step[0]
+            print(f"  ProgressInfo models built per hook call: {per_hook:.3f}")
+            
+            downloader.progress_callbacks[request_id] = lambda progress: None
+            with_callback = measure("_progress_hook() with a download callback", hook)
+            print(f"  A per-download callback adds {with_callback - without_callback:.2f} µs per call")
+        finally:
+            del ProgressInfo.construct
+            downloader.shutdown()
+
+
+def check_equivalence():
+    """Make sure both paths produce the same model"""
+    
+    info = ProgressInfo(**HOOK_FIELDS).update_progress(current_operation="Processing")
+    record = ProgressRecord(**HOOK_FIELDS).update(current_operation="Processing").to_info()
+    
+    ignored = {'updated_at'}
+    assert info.dict(exclude=ignored) == record.dict(exclude=ignored)
+    print("✅ ProgressRecord produces the same ProgressInfo")
+
+
+if __name__ == "__main__":
+    check_equivalence()
+    benchmark_hook_update()
+    benchmark_field_update()
+    benchmark_hook_path()
@@ -16,6 +16,8 @@ from pathlib import Path
 from typing import Dict, Optional, Callable, Any
 from urllib.parse import urlparse
 
+from downloader.writer import BufferedFileWriter, preallocate
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,8 +90,16 @@ class BinaryDownloader:
             total_size = int(response.headers.get('content-length', 0))
             downloaded = 0
             
-            with open(destination, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            # Reserve the file up front and write it in large aligned blocks
+            download_settings = self.config.get("download_settings", {})
+            preallocate(destination, total_size)
+            
+            with BufferedFileWriter(
+                destination,
+                buffer_size=download_settings.get("write_buffer_kb", 2048) * 1024,
+                fsync_policy=download_settings.get("fsync_policy", "close")
+            ) as f:
+                for chunk in response.iter_content(chunk_size=1048576):
                     if chunk:
                         f.write(chunk)
                         downloaded += len(chunk)
@@ -0,0 +1,309 @@
+"""
+Video metadata caching.
+
+This module provides a two-level cache for yt-dlp info dictionaries:
+an in-memory LRU in front of a JSON store on disk, both keyed by the
+canonical YouTube video ID and subject to a shared time-to-live.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Patterns that carry the 11 character video ID
+_VIDEO_ID_PATTERNS = [
+    re.compile(r'[?&]v=([\w-]{11})'),
+    re.compile(r'youtu\.be/([\w-]{11})'),
+    re.compile(r'youtube\.com/(?:shorts|embed|live|v)/([\w-]{11})'),
+]
+
+_VALID_KEY = re.compile(r'^[\w-]+$')
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Extract the canonical video ID from a YouTube URL.
+    
+    Args:
+        url: YouTube video URL
+    
+    Returns:
+        Video ID or None if the URL does not point to a single video
+    """
+    url_str = str(url)
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url_str)
+        if match:
+            return match.group(1)
+    return None
+
+
+class MetadataCache:
+    """
+    Two-level metadata cache with TTL and LRU eviction.
+    
+    Entries live in a bounded in-memory LRU and are written through to
+    one JSON file per video under the cache directory. The disk store is
+    trimmed oldest-first when it grows beyond its size budget.
+    """
+    
+    def __init__(self, cache_dir: Path, ttl: int = 3600, max_memory_entries: int = 128,
+                 max_disk_bytes: int = 200 * 1024 * 1024):
+        """
+        Initialize metadata cache.
+        
+        Args:
+            cache_dir: Directory for the on-disk store
+            ttl: Time-to-live of an entry in seconds
+            max_memory_entries: Maximum number of entries kept in memory
+            max_disk_bytes: Maximum total size of the on-disk store
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_disk_bytes = max_disk_bytes
+        
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._disk_sizes: Dict[str, int] = {}
+        self._disk_total = 0
+        
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        # Thread safety
+        self._lock = threading.RLock()
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._scan_disk()
+    
+    def _scan_disk(self):
+        """Index existing cache files and their sizes."""
+        for entry_file in self.cache_dir.glob("*.json"):
+            try:
+                size = entry_file.stat().st_size
+            except OSError:
+                continue
+            self._disk_sizes[entry_file.stem] = size
+            self._disk_total += size
+    
+    def _entry_path(self, key: str) -> Path:
+        """Get the on-disk path for a cache key."""
+        return self.cache_dir / f"{key}.json"
+    
+    def _is_fresh(self, stored_at: float) -> bool:
+        """Check whether an entry stored at the given time is within TTL."""
+        return (time.time() - stored_at) < self.ttl
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached metadata.
+        
+        The returned dictionary is shared with the cache and must be
+        copied before it is modified.
+        
+        Args:
+            key: Canonical video ID
+        
+        Returns:
+            Cached info dictionary or None on miss or expiry
+        """
+        if not key or not _VALID_KEY.match(key):
+            return None
+        
+        with self._lock:
+            # Level 1: memory
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, info = entry
+                if self._is_fresh(stored_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return info
+                self._remove(key)
+            
+            # Level 2: disk
+            entry_path = self._entry_path(key)
+            if key in self._disk_sizes:
+                try:
+                    with open(entry_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    stored_at = data['stored_at']
+                    info = data['info']
+                except Exception as e:
+                    logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+                    self._remove(key)
+                else:
+                    if self._is_fresh(stored_at):
+                        self._remember(key, stored_at, info)
+                        self.disk_hits += 1
+                        
+                        # Refresh access time for oldest-first trimming
+                        try:
+                            os.utime(entry_path, None)
+                        except OSError:
+                            pass
+                        return info
+                    self._remove(key)
+            
+            self.misses += 1
+            return None
+    
+    def peek(self, key: str, ignore_ttl: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached metadata without counting the lookup.
+        
+        Unlike get(), this leaves the hit/miss counters, the LRU order and
+        expired entries alone, so it suits repeated internal lookups.
+        
+        Args:
+            key: Canonical video ID
+            ignore_ttl: Also return entries that have expired
+        
+        Returns:
+            Cached info dictionary or None if there is no usable entry
+        """
+        if not key or not _VALID_KEY.match(key):
+            return None
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and key in self._disk_sizes:
+                try:
+                    with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    entry = data['stored_at'], data['info']
+                except Exception as e:
+                    logger.debug(f"Cannot read cache entry {key}: {e}")
+        
+        if entry is None or not (ignore_ttl or self._is_fresh(entry[0])):
+            return None
+        return entry[1]
+    
+    def put(self, key: str, info: Dict[str, Any]):
+        """
+        Store metadata in both cache levels.
+        
+        Args:
+            key: Canonical video ID
+            info: JSON-serializable info dictionary
+        """
+        if not key or not _VALID_KEY.match(key):
+            return
+        
+        stored_at = time.time()
+        
+        with self._lock:
+            self._remember(key, stored_at, info)
+            
+            entry_path = self._entry_path(key)
+            temp_path = entry_path.with_suffix(".tmp")
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'stored_at': stored_at, 'info': info}, f)
+                os.replace(temp_path, entry_path)
+            except Exception as e:
+                logger.warning(f"Failed to write cache entry {key}: {e}")
+                if temp_path.exists():
+                    temp_path.unlink()
+                return
+            
+            size = entry_path.stat().st_size
+            self._disk_total += size - self._disk_sizes.get(key, 0)
+            self._disk_sizes[key] = size
+            
+            self._trim_disk()
+    
+    def _remember(self, key: str, stored_at: float, info: Dict[str, Any]):
+        """Insert an entry into the memory LRU, evicting the oldest."""
+        self._memory[key] = (stored_at, info)
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+    
+    def _trim_disk(self):
+        """Remove least recently used files until the store fits its budget."""
+        if self._disk_total <= self.max_disk_bytes:
+            return
+        
+        entries = []
+        for key in self._disk_sizes:
+            try:
+                entries.append((self._entry_path(key).stat().st_mtime, key))
+            except OSError:
+                entries.append((0.0, key))
+        entries.sort()
+        
+        for _, key in entries:
+            if self._disk_total <= self.max_disk_bytes:
+                break
+            self._remove_file(key)
+            self.evictions += 1
+    
+    def _remove_file(self, key: str):
+        """Delete an entry from the disk store."""
+        self._disk_total -= self._disk_sizes.pop(key, 0)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove cache entry {key}: {e}")
+    
+    def _remove(self, key: str):
+        """Delete an entry from both cache levels."""
+        self._memory.pop(key, None)
+        self._remove_file(key)
+    
+    def invalidate(self, key: str):
+        """
+        Drop a single entry from the cache.
+        
+        Args:
+            key: Canonical video ID
+        """
+        with self._lock:
+            self._remove(key)
+    
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            for key in list(self._disk_sizes):
+                self._remove_file(key)
+            self._memory.clear()
+            self._disk_total = 0
+            logger.info("Metadata cache cleared")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with hit/miss counters and current sizes
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': len(self._disk_sizes),
+                'disk_bytes': self._disk_total,
+            }
@@ -6,14 +6,17 @@ metadata extraction, video downloading, and progress tracking.
 """
 
 import os
+import re
 import sys
 import json
+import time
 import logging
-import tempfile
+import asyncio
 import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable, List
-from urllib.parse import urlparse
+from typing import Dict, Any, Optional, Callable, List, Iterator
 from datetime import datetime
 
 # Add embedded Python path for imports
@@ -24,19 +27,47 @@ if python_runtime.exists():
 
 try:
     import yt_dlp
-    from yt_dlp.utils import DownloadError, ExtractorError
+    from yt_dlp.utils import DownloadError, ExtractorError, DownloadCancelled
 except ImportError as e:
     yt_dlp = None
     DownloadError = Exception
     ExtractorError = Exception
+    DownloadCancelled = Exception
 
 from .validation import (
-    VideoInfo, DownloadRequest, ProgressInfo,
+    VideoInfo, DownloadRequest, ProgressInfo, ProgressRecord,
     ProgressStatus, DownloadType, QualityOption
 )
+from .scheduler import DownloadScheduler
+from .cache import MetadataCache, extract_video_id
+from .pool import YoutubeDLPool
+from .resume import ResumeIndex
+from .journal import QueueJournal
+from .ratelimit import BandwidthLimiter
+from .hostlimit import HostLimiter, RetryMonitor, is_throttling_error, is_forbidden_error
+from .diskspace import DiskSpaceReserver, estimate_download_size
+from .streams import find_ffmpeg, build_stream_selector, combine_stream_progress, remux_streams
+from .segmented import SegmentedDownloader, is_segmentable
+from .postprocess import extract_audio, transcode_stream, audio_output_path, build_audio_selector, can_copy_audio
 
 logger = logging.getLogger(__name__)
 
+_FINAL_STATES = (ProgressStatus.COMPLETED, ProgressStatus.FAILED, ProgressStatus.CANCELLED)
+
+
+class DownloadCancelledError(DownloadCancelled):
+    """Raised from the progress hook to abort a cancelled transfer."""
+
+
+# URLs that list several videos rather than a single one
+_PLAYLIST_URL_PATTERN = re.compile(
+    r'youtube\.com/(?:playlist\?|@[\w.-]+|channel/|c/|user/)|[?&]list=',
+    re.IGNORECASE
+)
+
+# Signed media URLs carry their expiry as "expire=<unix time>" or "/expire/<unix time>/"
+_EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d+)')
+
 
 class YouTubeDownloader:
     """
@@ -46,34 +77,142 @@ class YouTubeDownloader:
     with support for various formats and quality options.
     """
     
-    def __init__(self, app_root: Path, config: Dict[str, Any]):
+    def __init__(self, app_root: Path, config: Dict[str, Any], progress_manager=None):
         """
         Initialize YouTube downloader.
         
         Args:
             app_root: Root directory of the application
             config: Application configuration dictionary
+            progress_manager: Optional ProgressManager receiving status updates
         """
         self.app_root = Path(app_root)
         self.config = config
+        self.progress_manager = progress_manager
         self.active_downloads: Dict[str, Any] = {}
         self.progress_callbacks: Dict[str, Callable] = {}
         
+        # Download scheduling
+        download_settings = self.config.get("download_settings", {})
+        self.scheduler = DownloadScheduler(
+            worker=self._download_worker,
+            max_concurrent=download_settings.get("max_concurrent_downloads", 3),
+            max_pending=download_settings.get("max_queued_downloads", 0),
+            admission=self._admit_download,
+            admission_retry=download_settings.get("disk_space_retry_interval", 10)
+        )
+        
+        # Space reserved on each output volume by running downloads
+        self.disk_space = DiskSpaceReserver(
+            margin=download_settings.get("disk_reserve_margin_mb", 512) * 1024 * 1024
+        )
+        
+        # Shared per-host concurrency limits and throttling backoff
+        self.host_limiter = HostLimiter(
+            max_per_host=download_settings.get("host_max_connections", 6),
+            min_per_host=download_settings.get("host_min_connections", 1)
+        )
+        
+        # Total bandwidth cap shared by all running downloads
+        self.bandwidth = BandwidthLimiter(
+            rate=download_settings.get("bandwidth_limit_kbps", 0) * 1024,
+            schedule=[
+                dict(rule, rate=rule.get("limit_kbps", 0) * 1024)
+                for rule in download_settings.get("bandwidth_schedule", [])
+            ]
+        )
+        
+        # Pooled HTTP client for multi-connection downloads of progressive
+        # formats (segment_connections <= 1 disables them) and streaming
+        self.segmented = None
+        try:
+            self.segmented = SegmentedDownloader(
+                connections=download_settings.get("segment_connections", 4),
+                min_segment_size=download_settings.get("segment_min_size_mb", 1) * 1024 * 1024,
+                write_buffer_size=download_settings.get("write_buffer_kb", 2048) * 1024,
+                fsync_policy=download_settings.get("fsync_policy", "close")
+            )
+        except Exception as e:
+            logger.warning(f"Segmented downloads disabled: {e}")
+        
+        # Convert audio while it downloads instead of from a finished file
+        self.stream_transcode = download_settings.get("stream_transcode", False)
+        
         # Set up paths
         self.cache_dir = self.app_root / "cache"
         self.temp_dir = self.app_root / "temp"
         self.binaries_dir = self.app_root / "binaries"
+        self.data_dir = self.app_root / "data"
         
         # Ensure directories exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Crash-safe record of the download queue
+        self.journal = QueueJournal(
+            self.data_dir / "queue_journal.jsonl",
+            flush_interval=download_settings.get("journal_flush_interval", 0.5)
+        )
+        
+        # Partial downloads that can be resumed after a restart
+        self.resume_index = ResumeIndex(self.temp_dir / "resume_index.json")
+        
+        # Metadata cache keyed by video ID
+        cache_settings = self.config.get("cache_settings", {})
+        self.metadata_cache = MetadataCache(
+            self.cache_dir / "metadata",
+            ttl=cache_settings.get("metadata_ttl", 3600),
+            max_memory_entries=cache_settings.get("metadata_memory_entries", 128),
+            max_disk_bytes=cache_settings.get("metadata_disk_mb", 200) * 1024 * 1024
+        )
         
         # Configure yt-dlp paths
         self.ffmpeg_path = self.binaries_dir / "ffmpeg" / "bin" / "ffmpeg.exe"
         self.ffprobe_path = self.binaries_dir / "ffmpeg" / "bin" / "ffprobe.exe"
         
+        # Long-lived YoutubeDL instances for metadata extraction
+        self.info_pool = YoutubeDLPool(
+            self._create_info_ydl,
+            max_size=download_settings.get("extractor_pool_size", 4),
+            max_uses=download_settings.get("extractor_max_uses", 50),
+            recoverable_errors=(DownloadError, ExtractorError)
+        )
+        
+        # Bounded executor for blocking extraction work
+        self.extract_executor = ThreadPoolExecutor(
+            max_workers=download_settings.get("extractor_workers", self.info_pool.max_size),
+            thread_name_prefix="extract"
+        )
+        
+        # ffmpeg work runs here after the download slot has been handed on
+        self.postprocess_executor = ThreadPoolExecutor(
+            max_workers=download_settings.get("postprocess_workers") or os.cpu_count() or 2,
+            thread_name_prefix="postprocess"
+        )
+        
         if not yt_dlp:
             logger.error("yt-dlp not available. Run setup.py to install dependencies.")
+        else:
+            # Prepare the first instance so the first preview does not pay for it
+            threading.Thread(target=self.info_pool.prewarm, daemon=True).start()
+    
+    def _create_info_ydl(self):
+        """
+        Create a YoutubeDL instance configured for metadata extraction.
+        
+        Returns:
+            YoutubeDL instance for the extraction pool
+        """
+        # Create temporary request for options
+        temp_request = DownloadRequest(
+            url="https://www.youtube.com/watch?v=info",
+            download_type=DownloadType.VIDEO,
+            output_path=self.temp_dir,
+            request_id="temp_info"
+        )
+        
+        return yt_dlp.YoutubeDL(self._get_ydl_opts(temp_request, for_info=True))
     
     def _get_ydl_opts(self, request: DownloadRequest, for_info: bool = False) -> Dict[str, Any]:
         """
@@ -86,6 +225,7 @@ class YouTubeDownloader:
         Returns:
             Dictionary of yt-dlp options
         """
+        retry_monitor = RetryMonitor(logger)
         opts = {
             # Paths and executables
             'ffmpeg_location': str(self.ffmpeg_path.parent) if self.ffmpeg_path.exists() else None,
@@ -99,8 +239,9 @@ class YouTubeDownloader:
             # Quality and format selection
             'format': self._get_format_selector(request),
             
-            # Extraction options
+            # Extraction options (playlists are expanded before download)
             'extract_flat': False,
+            'noplaylist': True,
             'writethumbnail': False,
             'writeinfojson': False,
             'writedescription': False,
@@ -114,13 +255,22 @@ class YouTubeDownloader:
             'continuedl': request.continue_partial,
             'retries': request.retry_count,
             'fragment_retries': request.retry_count,
+            'concurrent_fragment_downloads': (
+                request.concurrent_fragments
+                or self.config.get("download_settings", {}).get("concurrent_fragments", 4)
+            ),
+            'retry_sleep_functions': {
+                kind: functools.partial(self._retry_sleep, retry_monitor, request, kind)
+                for kind in ('http', 'fragment', 'extractor')
+            },
             
             # Networking
             'socket_timeout': 30,
             'http_chunk_size': 10485760,  # 10MB chunks
+            'buffersize': 1048576,  # start with large blocks instead of growing from 1KB
             
             # Logging
-            'logger': logger,
+            'logger': retry_monitor,
             'no_color': True,
         }
         
@@ -133,26 +283,53 @@ class YouTubeDownloader:
                 'no_warnings': True,
             })
         else:
-            # For actual downloads, add progress hook
-            opts['progress_hooks'] = [self._progress_hook]
+            # For actual downloads, add a progress hook bound to this request
+            opts['progress_hooks'] = [functools.partial(self._progress_hook, request.request_id)]
             
-            # Handle audio extraction
+            # Remux merged streams into the requested container
+            if request.merge_streams:
+                opts['merge_output_format'] = getattr(request.video_format, 'value', request.video_format) or "mp4"
+            
+            # Audio is converted in the post-processing stage, see _get_postprocessing_steps;
+            # streams that only need remuxing into the target format are preferred
             if request.download_type == DownloadType.AUDIO or request.extract_audio:
-                opts.update({
-                    'format': 'bestaudio/best',
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio',
-                        'preferredcodec': request.audio_format.value if request.audio_format else 'mp3',
-                        'preferredquality': '192',
-                        'nopostoverwrites': not request.overwrite,
-                    }]
-                })
-                
-                if not request.keep_video and request.download_type != DownloadType.AUDIO:
-                    opts['postprocessors'][0]['nopostoverwrites'] = False
+                opts['format'] = request.format_id or build_audio_selector(self._get_audio_codec(request))
         
         return opts
     
+    def _get_audio_codec(self, request: DownloadRequest) -> str:
+        """
+        Get the target audio format of a request.
+        
+        Args:
+            request: Download request parameters
+        
+        Returns:
+            Audio format value, mp3 if none was requested
+        """
+        return getattr(request.audio_format, 'value', request.audio_format) or 'mp3'
+    
+    def _retry_sleep(self, retry_monitor: RetryMonitor, request: DownloadRequest, kind: str, n: int) -> float:
+        """
+        Delay before a yt-dlp internal retry, shared with the host limiter.
+        
+        Transfer retries count against the media host the download's slot
+        is held on, extraction retries against the page host.
+        
+        Args:
+            retry_monitor: Logger of the YoutubeDL instance that retries
+            request: Download request parameters
+            kind: yt-dlp retry kind (http, fragment or extractor)
+            n: Zero-based retry number
+        
+        Returns:
+            Seconds to sleep
+        """
+        url = str(request.url)
+        if kind != 'extractor':
+            url = (self.active_downloads.get(request.request_id) or {}).get('media_url') or url
+        return self.host_limiter.retry_delay(url, n, throttled=retry_monitor.throttled)
+    
     def _get_output_template(self, request: DownloadRequest) -> str:
         """
         Generate output template for yt-dlp.
@@ -183,68 +360,134 @@ class YouTubeDownloader:
         Returns:
             Format selector string
         """
+        if request.format_id:
+            return request.format_id
+        
         if request.download_type == DownloadType.AUDIO:
             return "bestaudio/best"
         
         quality = request.quality
-        video_format = request.video_format.value if request.video_format else "mp4"
+        # Enum fields hold plain values once validated (use_enum_values)
+        video_format = getattr(request.video_format, 'value', request.video_format) or "mp4"
         
         if quality == QualityOption.BEST:
-            return f"best[ext={video_format}]/best"
+            height = None
+            progressive = f"best[ext={video_format}]/best"
         elif quality == QualityOption.WORST:
-            return f"worst[ext={video_format}]/worst"
+            height = None
+            progressive = f"worst[ext={video_format}]/worst"
         else:
             # Extract height from quality (e.g., "720p" -> "720")
-            height = quality.value.rstrip('p')
-            return f"best[height<={height}][ext={video_format}]/best[height<={height}]/best"
+            height = getattr(quality, 'value', quality).rstrip('p')
+            progressive = f"best[height<={height}][ext={video_format}]/best[height<={height}]/best"
+        
+        # Separate DASH streams reach higher qualities but need ffmpeg to merge
+        if not request.merge_streams or not find_ffmpeg(self.ffmpeg_path):
+            return progressive
+        
+        streams = build_stream_selector(video_format, height, worst=(quality == QualityOption.WORST))
+        return f"{streams}/{progressive}"
     
-    def _progress_hook(self, d: Dict[str, Any]):
+    def _progress_hook(self, request_id: str, d: Dict[str, Any]):
         """
         Progress hook for yt-dlp downloads.
         
+        Each YoutubeDL instance receives this hook pre-bound to its request
+        ID, so routing a callback is a single dictionary lookup.
+        
         Args:
+            request_id: Request ID the hook was bound to
             d: Progress dictionary from yt-dlp
         """
-        if 'info_dict' not in d:
+        download_info = self.active_downloads.get(request_id)
+        if download_info is None:
             return
         
-        # Find associated request
-        request_id = None
-        for rid, download_info in self.active_downloads.items():
-            if download_info.get('temp_filename') == d.get('tmpfilename'):
-                request_id = rid
-                break
+        # Remember partial files for cancellation cleanup and resuming
+        temp_filename = d.get('tmpfilename')
+        if temp_filename and temp_filename not in download_info['partial_files']:
+            download_info['partial_files'].add(temp_filename)
+            self._record_resume_state(request_id, d.get('info_dict') or {})
         
-        if not request_id:
-            return
+        # Abort the transfer as soon as the job has been cancelled
+        if download_info['cancel_event'].is_set() or download_info.get('abort_streams'):
+            raise DownloadCancelledError(f"Download cancelled: {request_id}")
+        
+        # Bytes written since the previous call for this file
+        delta = 0
+        if d.get('status') == 'downloading':
+            transferred = download_info.setdefault('transferred', {})
+            downloaded = d.get('downloaded_bytes') or 0
+            delta = downloaded - transferred.get(temp_filename, 0)
+            transferred[temp_filename] = downloaded
+        
+        # Streams downloading side by side are reported as one download
+        streams = download_info.get('streams')
+        if streams is not None:
+            stream_key = (d.get('info_dict') or {}).get('format_id') or temp_filename
+            with download_info['streams_lock']:
+                streams[stream_key] = d
+                d = combine_stream_progress(streams.values(), d)
         
         # Create progress info
         progress = self._create_progress_from_ydl(d, request_id)
         
         # Update active download info
-        self.active_downloads[request_id]['progress'] = progress
+        download_info['progress'] = progress
+        self.journal.record_checkpoint(request_id, progress.downloaded_bytes, progress.total_bytes)
+        self._publish_progress(request_id, progress)
         
-        # Call progress callback if registered
-        if request_id in self.progress_callbacks:
-            try:
-                self.progress_callbacks[request_id](progress)
-            except Exception as e:
-                logger.error(f"Error in progress callback: {e}")
+        # Written data now shows in the volume's free space, unless the
+        # file was preallocated and already taken off in full
+        if temp_filename not in download_info.get('preallocated', ()):
+            self.disk_space.consume(request_id, delta)
+        
+        # Hold the transfer back while it is over its bandwidth share
+        self.bandwidth.consume(request_id, delta)
+    
+    def _record_resume_state(self, request_id: str, info_dict: Dict[str, Any]):
+        """
+        Store a job's chosen formats and partial files in the resume index.
+        
+        Args:
+            request_id: Request ID of the download
+            info_dict: Info dict of the format being downloaded
+        """
+        download_info = self.active_downloads[request_id]
+        
+        # Merged downloads report one stream at a time; keep the full selection
+        requested_formats = info_dict.get('requested_formats')
+        if requested_formats:
+            format_id = '+'.join(str(f.get('format_id')) for f in requested_formats)
+        else:
+            format_id = info_dict.get('format_id')
+        
+        if format_id:
+            download_info['format_id'] = format_id
+        
+        request = download_info['request']
+        self.resume_index.record(
+            request_id,
+            json.loads(request.json()),
+            format_id=download_info['format_id'],
+            partial_files=download_info['partial_files']
+        )
     
-    def _create_progress_from_ydl(self, d: Dict[str, Any], request_id: str) -> ProgressInfo:
+    def _create_progress_from_ydl(self, d: Dict[str, Any], request_id: str) -> ProgressRecord:
         """
-        Create ProgressInfo from yt-dlp progress dictionary.
+        Create a progress record from yt-dlp progress dictionary.
         
         Args:
             d: Progress dictionary from yt-dlp
             request_id: Associated request ID
             
         Returns:
-            ProgressInfo object
+            ProgressRecord object
         """
         status_map = {
             'downloading': ProgressStatus.DOWNLOADING,
-            'finished': ProgressStatus.COMPLETED,
+            # The worker reports COMPLETED once post-processing is done
+            'finished': ProgressStatus.PROCESSING,
             'error': ProgressStatus.FAILED,
         }
         
@@ -261,14 +504,36 @@ class YouTubeDownloader:
         if total_bytes and total_bytes > 0:
             percentage = min(100.0, (downloaded_bytes / total_bytes) * 100.0)
         
+        # Fragmented formats: fragments finish out of order when fetched
+        # concurrently and the size is only estimated, so keep both the
+        # fragment index and the percentage from moving backwards
+        fragment_index = d.get('fragment_index')
+        fragment_count = d.get('fragment_count')
+        if fragment_count:
+            download_info = self.active_downloads.get(request_id) or {}
+            previous = download_info.get('progress')
+            same_file = (previous is not None and previous.status == ProgressStatus.DOWNLOADING
+                         and previous.temp_filename == d.get('tmpfilename'))
+            
+            if same_file and previous.fragment_index:
+                fragment_index = max(fragment_index or 0, previous.fragment_index)
+            if not total_bytes and fragment_index:
+                percentage = min(100.0, fragment_index / fragment_count * 100.0)
+            if same_file:
+                percentage = max(percentage, previous.percentage)
+        
         # Get current operation
         current_operation = None
-        if d.get('status') == 'downloading':
+        if d.get('status') == 'downloading' and fragment_count:
+            current_operation = f"Downloading fragment {fragment_index or 0}/{fragment_count}"
+        elif d.get('status') == 'downloading' and d.get('converted_percentage') is not None:
+            current_operation = f"Downloading and converting ({d['converted_percentage']:.0f}% converted)"
+        elif d.get('status') == 'downloading':
             current_operation = f"Downloading {d.get('filename', 'video')}"
         elif d.get('status') == 'finished':
-            current_operation = "Download completed"
+            current_operation = "Processing downloaded file"
         
-        return ProgressInfo(
+        return ProgressRecord(
             request_id=request_id,
             status=status,
             percentage=percentage,
@@ -279,20 +544,23 @@ class YouTubeDownloader:
             filename=d.get('filename'),
             temp_filename=d.get('tmpfilename'),
             current_operation=current_operation,
-            fragment_index=d.get('fragment_index'),
-            fragment_count=d.get('fragment_count'),
-            updated_at=datetime.now()
+            fragment_index=fragment_index,
+            fragment_count=fragment_count
         )
     
-    async def extract_video_info(self, url: str) -> VideoInfo:
+    def extract_info_dict(self, url: str) -> Dict[str, Any]:
         """
-        Extract video metadata from URL.
+        Extract the raw yt-dlp info dictionary for a URL.
+        
+        Results are served from the metadata cache when a fresh entry
+        exists for the video ID; otherwise yt-dlp is queried and the
+        sanitized result is cached.
         
         Args:
             url: YouTube video URL
             
         Returns:
-            VideoInfo object with metadata
+            JSON-serializable info dictionary (shared with the cache)
             
         Raises:
             Exception: If extraction fails
@@ -300,31 +568,24 @@ class YouTubeDownloader:
         if not yt_dlp:
             raise Exception("yt-dlp not available. Run setup.py to install dependencies.")
         
-        logger.info(f"Extracting video info for: {url}")
-        
-        # Create temporary request for options
-        temp_request = DownloadRequest(
-            url=url,
-            download_type=DownloadType.VIDEO,
-            output_path=self.temp_dir,
-            request_id="temp_info"
-        )
+        video_id = extract_video_id(url)
+        if video_id:
+            cached_info = self.metadata_cache.get(video_id)
+            if cached_info is not None:
+                logger.info(f"Using cached video info for: {video_id}")
+                return cached_info
         
-        ydl_opts = self._get_ydl_opts(temp_request, for_info=True)
+        logger.info(f"Extracting video info for: {url}")
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with self.host_limiter.slot(url), self.info_pool.acquire() as ydl:
                 info = ydl.extract_info(url, download=False)
-                
-                if not info:
-                    raise Exception("Failed to extract video information")
-                
-                # Convert to VideoInfo model
-                video_info = self._convert_to_video_info(info)
-                
-                logger.info(f"Successfully extracted info for: {video_info.title}")
-                return video_info
-                
+            
+            if not info:
+                raise Exception("Failed to extract video information")
+            
+            info = yt_dlp.YoutubeDL.sanitize_info(info)
+            
         except ExtractorError as e:
             logger.error(f"Extractor error: {e}")
             raise Exception(f"Failed to extract video info: {str(e)}")
@@ -334,6 +595,78 @@ class YouTubeDownloader:
         except Exception as e:
             logger.error(f"Unexpected error during info extraction: {e}")
             raise Exception(f"Failed to extract video info: {str(e)}")
+        
+        cache_key = info.get('id') if info.get('_type', 'video') == 'video' else None
+        if cache_key:
+            self.metadata_cache.put(cache_key, info)
+        
+        return info
+    
+    async def extract_video_info(self, url: str) -> VideoInfo:
+        """
+        Extract video metadata from URL.
+        
+        The blocking yt-dlp work runs on the downloader's extraction
+        executor, so many calls can be awaited concurrently. Cancelling
+        the awaiting task drops the request if it has not started yet;
+        an extraction already in progress finishes in the background.
+        
+        Args:
+            url: YouTube video URL
+            
+        Returns:
+            VideoInfo object with metadata
+            
+        Raises:
+            Exception: If extraction fails
+        """
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(self.extract_executor, self.extract_info_dict, url)
+        
+        # Convert to VideoInfo model
+        video_info = self._convert_to_video_info(info)
+        
+        logger.info(f"Successfully extracted info for: {video_info.title}")
+        return video_info
+    
+    async def extract_video_infos(self, urls: List[str], return_exceptions: bool = True) -> List[Any]:
+        """
+        Extract metadata for several URLs concurrently.
+        
+        Args:
+            urls: YouTube video URLs
+            return_exceptions: Return failures in place instead of raising
+            
+        Returns:
+            VideoInfo objects (or exceptions) in the order of the URLs
+        """
+        return await asyncio.gather(
+            *(self.extract_video_info(url) for url in urls),
+            return_exceptions=return_exceptions
+        )
+    
+    def submit_video_info(self, url: str) -> Future:
+        """
+        Schedule metadata extraction for callers without an event loop.
+        
+        Args:
+            url: YouTube video URL
+            
+        Returns:
+            Future resolving to a VideoInfo object
+        """
+        return self.extract_executor.submit(
+            lambda: self._convert_to_video_info(self.extract_info_dict(url))
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get metadata cache statistics.
+        
+        Returns:
+            Dictionary with hit/miss counters and cache sizes
+        """
+        return self.metadata_cache.get_stats()
     
     def _convert_to_video_info(self, info: Dict[str, Any]) -> VideoInfo:
         """
@@ -383,125 +716,1083 @@ class YouTubeDownloader:
         return VideoInfo(**video_data)
     
     def start_download(self, request: DownloadRequest, 
-                      progress_callback: Optional[Callable[[ProgressInfo], None]] = None) -> str:
+                      progress_callback: Optional[Callable[[ProgressInfo], None]] = None,
+                      video_info: Optional[Any] = None) -> str:
         """
-        Start a download asynchronously.
+        Queue a download for asynchronous execution.
+        
+        The request is held in the scheduler queue with PENDING status
+        until a download slot becomes available.
         
         Args:
             request: Download request parameters
             progress_callback: Optional callback for progress updates
+            video_info: Optional previously extracted VideoInfo or info dict
+                to download from instead of extracting again
             
         Returns:
             Request ID for tracking the download
+            
+        Raises:
+            Exception: If yt-dlp is missing or the download queue is full
         """
         if not yt_dlp:
             raise Exception("yt-dlp not available. Run setup.py to install dependencies.")
         
-        logger.info(f"Starting download: {request.url}")
+        if self.is_playlist_url(str(request.url)):
+            return self.start_playlist_download(request, progress_callback)
+        
+        logger.info(f"Queueing download: {request.url}")
         
         # Register progress callback
         if progress_callback:
             self.progress_callbacks[request.request_id] = progress_callback
         
         # Initialize download tracking
+        initial_progress = ProgressRecord(
+            request_id=request.request_id,
+            status=ProgressStatus.PENDING,
+            current_operation="Waiting for download slot"
+        )
         self.active_downloads[request.request_id] = {
             'request': request,
-            'started_at': datetime.now(),
-            'progress': ProgressInfo(
-                request_id=request.request_id,
-                status=ProgressStatus.PENDING,
-                started_at=datetime.now()
+            'queued_at': datetime.now(),
+            'progress': initial_progress,
+            'info': video_info,
+            'cancel_event': threading.Event(),
+            'partial_files': set(),
+            'format_id': request.format_id,
+            'worker_idle': threading.Event()
+        }
+        self.active_downloads[request.request_id]['worker_idle'].set()
+        
+        if self.progress_manager:
+            self.progress_manager.register_progress(request.request_id, initial_progress)
+        
+        self.journal.record_enqueue(request.request_id, json.loads(request.json()))
+        
+        # Hand over to the scheduler
+        if not self.scheduler.submit(request):
+            self._update_progress(
+                request.request_id,
+                status=ProgressStatus.FAILED,
+                error_message="Download queue is full"
             )
+            self.progress_callbacks.pop(request.request_id, None)
+            raise Exception("Download queue is full. Try again when some downloads have finished.")
+        
+        return request.request_id
+    
+    @staticmethod
+    def is_playlist_url(url: str) -> bool:
+        """
+        Check whether a URL lists several videos (playlist or channel).
+        
+        Args:
+            url: YouTube URL
+            
+        Returns:
+            True if the URL should be expanded into individual downloads
+        """
+        url = str(url)
+        return extract_video_id(url) is None and bool(_PLAYLIST_URL_PATTERN.search(url))
+    
+    def iter_playlist_entries(self, url: str, max_depth: int = 2) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily list the videos of a playlist or channel.
+        
+        Entries are produced with flat extraction as yt-dlp pages through
+        the listing, so no per-video formats are resolved here.
+        
+        Args:
+            url: Playlist or channel URL
+            max_depth: How many levels of nested playlists (channel tabs) to follow
+            
+        Yields:
+            Flat entry dictionaries with at least 'id' and 'url'
+        """
+        if not yt_dlp:
+            raise Exception("yt-dlp not available. Run setup.py to install dependencies.")
+        
+        temp_request = DownloadRequest(
+            url="https://www.youtube.com/watch?v=info",
+            download_type=DownloadType.VIDEO,
+            output_path=self.temp_dir,
+            request_id="temp_playlist"
+        )
+        ydl_opts = self._get_ydl_opts(temp_request, for_info=True)
+        ydl_opts.update({
+            'extract_flat': 'in_playlist',
+            'noplaylist': False,
+        })
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            result = ydl.extract_info(url, download=False, process=False)
+            
+            # Follow redirects such as a channel URL pointing at its videos tab
+            for _ in range(3):
+                if not result or result.get('_type') not in ('url', 'url_transparent'):
+                    break
+                if extract_video_id(result.get('url', '')):
+                    break
+                result = ydl.extract_info(result['url'], download=False, process=False)
+            
+            if result:
+                yield from self._iter_flat_entries(ydl, result, max_depth)
+    
+    def _iter_flat_entries(self, ydl, result: Dict[str, Any], depth: int) -> Iterator[Dict[str, Any]]:
+        """
+        Walk a flat extraction result, expanding nested playlists.
+        
+        Args:
+            ydl: YoutubeDL instance used for nested listings
+            result: Unprocessed extraction result
+            depth: Remaining nesting levels to follow
+            
+        Yields:
+            Flat video entries
+        """
+        if 'entries' not in result:
+            yield result
+            return
+        
+        for entry in result.get('entries') or []:
+            if not entry:
+                continue
+            
+            entry_type = entry.get('_type', 'video')
+            entry_url = entry.get('url') or entry.get('webpage_url') or ''
+            
+            if entry_type == 'playlist':
+                if depth > 0:
+                    yield from self._iter_flat_entries(ydl, entry, depth - 1)
+            elif entry_type in ('url', 'url_transparent') and self.is_playlist_url(entry_url):
+                if depth > 0:
+                    nested = ydl.extract_info(entry_url, download=False, process=False)
+                    if nested:
+                        yield from self._iter_flat_entries(ydl, nested, depth - 1)
+            else:
+                yield entry
+    
+    def start_playlist_download(self, request: DownloadRequest,
+                                progress_callback: Optional[Callable[[ProgressInfo], None]] = None,
+                                entry_callback: Optional[Callable[[DownloadRequest, Dict[str, Any]], None]] = None) -> str:
+        """
+        Expand a playlist or channel and queue each video as it is listed.
+        
+        The playlist itself is tracked under the request ID with
+        FETCHING_INFO status while entries are listed. Each video gets its
+        own request ID derived from it and resolves its formats only when
+        its download slot comes up.
+        
+        Args:
+            request: Download request for the playlist URL
+            progress_callback: Optional callback for progress of all entries
+            entry_callback: Optional callback invoked for every queued entry
+            
+        Returns:
+            Request ID of the playlist
+        """
+        logger.info(f"Expanding playlist: {request.url}")
+        
+        if progress_callback:
+            self.progress_callbacks[request.request_id] = progress_callback
+        
+        initial_progress = ProgressRecord(
+            request_id=request.request_id,
+            status=ProgressStatus.FETCHING_INFO,
+            current_operation="Listing playlist entries"
+        )
+        self.active_downloads[request.request_id] = {
+            'request': request,
+            'queued_at': datetime.now(),
+            'progress': initial_progress,
+            'entry_ids': [],
+            'cancel_event': threading.Event(),
         }
         
-        # Start download in separate thread
-        download_thread = threading.Thread(
-            target=self._download_worker,
-            args=(request,),
+        if self.progress_manager:
+            self.progress_manager.register_progress(request.request_id, initial_progress)
+        
+        expansion_thread = threading.Thread(
+            target=self._playlist_worker,
+            args=(request, progress_callback, entry_callback),
+            name=f"playlist-{request.request_id}",
             daemon=True
         )
-        download_thread.start()
+        expansion_thread.start()
         
         return request.request_id
     
-    def _download_worker(self, request: DownloadRequest):
+    def _playlist_worker(self, request: DownloadRequest,
+                         progress_callback: Optional[Callable[[ProgressInfo], None]],
+                         entry_callback: Optional[Callable[[DownloadRequest, Dict[str, Any]], None]]):
         """
-        Worker function for downloading in separate thread.
+        Worker function that streams playlist entries into the queue.
         
         Args:
-            request: Download request parameters
+            request: Download request for the playlist URL
+            progress_callback: Callback passed on to every entry
+            entry_callback: Optional callback invoked for every queued entry
         """
+        playlist_info = self.active_downloads[request.request_id]
+        cancelled = playlist_info['cancel_event']
+        queued = 0
+        
         try:
-            # Update status to downloading
-            self._update_progress(request.request_id, status=ProgressStatus.DOWNLOADING)
-            
-            # Get yt-dlp options
-            ydl_opts = self._get_ydl_opts(request, for_info=False)
+            for entry in self.iter_playlist_entries(str(request.url)):
+                if cancelled.is_set():
+                    break
+                
+                entry_url = entry.get('url') or entry.get('webpage_url') or ''
+                if not entry_url.startswith('http'):
+                    entry_url = f"https://www.youtube.com/watch?v={entry.get('id')}"
+                
+                entry_request = request.copy(update={
+                    'url': entry_url,
+                    'request_id': f"{request.request_id}_{queued + 1:04d}",
+                })
+                
+                # Apply backpressure instead of failing when the queue is bounded
+                while not self.scheduler.wait_for_capacity(timeout=1.0):
+                    if cancelled.is_set():
+                        break
+                if cancelled.is_set():
+                    break
+                
+                self.start_download(entry_request, progress_callback)
+                playlist_info['entry_ids'].append(entry_request.request_id)
+                queued += 1
+                
+                self._update_progress(
+                    request.request_id,
+                    current_operation=f"Queued {queued} videos"
+                )
+                
+                if entry_callback:
+                    try:
+                        entry_callback(entry_request, entry)
+                    except Exception as e:
+                        logger.error(f"Error in playlist entry callback: {e}")
             
-            # Perform download
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([str(request.url)])
+            if cancelled.is_set():
+                return
             
-            # Update status to completed
             self._update_progress(
                 request.request_id,
                 status=ProgressStatus.COMPLETED,
                 percentage=100.0,
+                current_operation=f"Queued {queued} videos",
                 completed_at=datetime.now()
             )
-            
-            logger.info(f"Download completed: {request.request_id}")
+            logger.info(f"Playlist expanded into {queued} downloads: {request.request_id}")
             
         except Exception as e:
-            logger.error(f"Download failed for {request.request_id}: {e}")
+            logger.error(f"Playlist expansion failed for {request.request_id}: {e}")
             self._update_progress(
                 request.request_id,
                 status=ProgressStatus.FAILED,
-                error_message=str(e)
+                error_message=f"Failed to list playlist after {queued} videos: {str(e)}"
             )
         finally:
-            # Clean up
-            if request.request_id in self.progress_callbacks:
-                del self.progress_callbacks[request.request_id]
+            self.progress_callbacks.pop(request.request_id, None)
     
-    def _update_progress(self, request_id: str, **kwargs):
+    def set_max_concurrent_downloads(self, max_concurrent: int):
         """
-        Update progress information for a download.
+        Change the number of simultaneous downloads at runtime.
         
         Args:
-            request_id: Request ID to update
-            **kwargs: Progress fields to update
+            max_concurrent: Maximum number of concurrent downloads
         """
-        if request_id not in self.active_downloads:
-            return
-        
-        current_progress = self.active_downloads[request_id]['progress']
-        updated_progress = current_progress.update_progress(**kwargs)
-        
-        self.active_downloads[request_id]['progress'] = updated_progress
-        
-        # Call progress callback
-        if request_id in self.progress_callbacks:
-            try:
-                self.progress_callbacks[request_id](updated_progress)
-            except Exception as e:
-                logger.error(f"Error in progress callback: {e}")
+        self.scheduler.set_max_concurrent(max_concurrent)
     
-    def cancel_download(self, request_id: str) -> bool:
+    def set_bandwidth_limit(self, rate: float):
         """
-        Cancel an active download.
+        Change the total bandwidth limit at runtime.
         
         Args:
-            request_id: Request ID to cancel
-            
-        Returns:
-            True if cancelled successfully, False otherwise
+            rate: Limit in bytes per second shared by all downloads (0 for unlimited)
         """
-        if request_id not in self.active_downloads:
+        self.bandwidth.set_rate(rate)
+    
+    def _download_worker(self, request: DownloadRequest):
+        """
+        Worker function for downloading in separate thread.
+        
+        Args:
+            request: Download request parameters
+        """
+        download_info = self.active_downloads.get(request.request_id)
+        if download_info is None:
+            return
+        
+        cancel_event = download_info['cancel_event']
+        download_info['worker_idle'].clear()
+        if cancel_event.is_set():
+            self.disk_space.release(request.request_id)
+            download_info['worker_idle'].set()
+            return
+        
+        download_info['started_at'] = datetime.now()
+        download_info.pop('transferred', None)
+        self.bandwidth.register(request.request_id)
+        postprocessing = False
+        
+        try:
+            # Update status to downloading
+            self._update_progress(
+                request.request_id,
+                status=ProgressStatus.DOWNLOADING,
+                started_at=datetime.now(),
+                current_operation="Starting download"
+            )
+            
+            # Audio conversion needs ffmpeg; fail before anything is downloaded
+            if (request.download_type == DownloadType.AUDIO or request.extract_audio) and not find_ffmpeg(self.ffmpeg_path):
+                raise Exception("ffmpeg is required to extract audio")
+            
+            # Get yt-dlp options
+            ydl_opts = self._get_ydl_opts(request, for_info=False)
+            
+            # Reuse metadata from the preview when it is still valid
+            info = self.get_reusable_info(download_info.get('info') or str(request.url))
+            
+            # Perform download, retrying throttled attempts through the host limiter
+            attempt = 0
+            while True:
+                try:
+                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                        download_info.pop('pending_remux', None)
+                        download_info.pop('audio_converted', None)
+                        download_info.pop('media_url', None)
+                        
+                        # Only extraction counts against the page host, so
+                        # running transfers do not hold up previews
+                        with self.host_limiter.slot(str(request.url), cancel_event):
+                            selected = self._select_formats(ydl, request, ydl_opts, info)
+                            source = info
+                            if source is None:
+                                source = selected or ydl.extract_info(str(request.url), download=False)
+                        
+                        download_info['media_url'] = self._media_url(source, str(request.url))
+                        with self.host_limiter.slot(download_info['media_url'], cancel_event):
+                            output_path = None
+                            if selected is not None:
+                                output_path = (
+                                    self._download_transcoded_stream(ydl, request, selected)
+                                    or self._download_streams_parallel(ydl, request, ydl_opts, selected)
+                                    or self._download_segmented(ydl, request, selected)
+                                )
+                            if output_path is None:
+                                selected = self.download_with_info(ydl, str(request.url), source)
+                                output_path = self._get_downloaded_path(ydl, selected)
+                    break
+                except Exception as e:
+                    if not cancel_event.is_set() and info is not None and is_forbidden_error(e):
+                        # Format URLs of the reused info were rejected: extract the video again
+                        logger.warning(f"Reused info was rejected, re-extracting: {request.request_id}")
+                        self.metadata_cache.invalidate(info.get('id'))
+                        info = None
+                        continue
+                    if cancel_event.is_set() or not is_throttling_error(e) or attempt >= request.retry_count:
+                        raise
+                    
+                    attempt += 1
+                    delay = self.host_limiter.retry_delay(download_info.get('media_url') or str(request.url), attempt)
+                    logger.warning(f"Download throttled, retry {attempt}/{request.retry_count} "
+                                   f"in {delay:.1f}s: {request.request_id}")
+                    self._update_progress(
+                        request.request_id,
+                        current_operation=f"Throttled by server, retrying in {delay:.0f}s"
+                    )
+                    cancel_event.wait(delay)
+            
+            if cancel_event.is_set():
+                raise DownloadCancelledError(f"Download cancelled: {request.request_id}")
+            
+            # Hand ffmpeg work to the post-processing pool and free the download slot
+            steps = self._get_postprocessing_steps(request, output_path, selected)
+            if steps:
+                self._update_progress(
+                    request.request_id,
+                    status=ProgressStatus.POSTPROCESSING,
+                    current_operation="Waiting for post-processing"
+                )
+                self.postprocess_executor.submit(self._postprocess_worker, request, steps)
+                postprocessing = True
+            else:
+                self._complete_download(request.request_id)
+            
+        except Exception as e:
+            if cancel_event.is_set() and download_info.get('paused'):
+                logger.info(f"Download paused: {request.request_id}")
+            elif cancel_event.is_set():
+                logger.info(f"Download aborted after cancellation: {request.request_id}")
+                if download_info.get('delete_partial'):
+                    self._delete_partial_files(download_info['partial_files'])
+            else:
+                logger.error(f"Download failed for {request.request_id}: {e}")
+                self._update_progress(
+                    request.request_id,
+                    status=ProgressStatus.FAILED,
+                    error_message=str(e)
+                )
+        finally:
+            # Clean up (paused and post-processing jobs keep their callback)
+            if (request.request_id in self.progress_callbacks and not download_info.get('paused')
+                    and not postprocessing):
+                del self.progress_callbacks[request.request_id]
+            if not postprocessing:
+                self.disk_space.release(request.request_id)
+            self.bandwidth.unregister(request.request_id)
+            download_info['worker_idle'].set()
+    
+    def _complete_download(self, request_id: str):
+        """
+        Mark a download as completed and forget its resume state.
+        
+        Args:
+            request_id: Request ID of the download
+        """
+        self._update_progress(
+            request_id,
+            status=ProgressStatus.COMPLETED,
+            percentage=100.0,
+            completed_at=datetime.now()
+        )
+        self.resume_index.remove(request_id)
+        
+        logger.info(f"Download completed: {request_id}")
+    
+    def _get_downloaded_path(self, ydl, result: Optional[Dict[str, Any]]) -> Optional[Path]:
+        """
+        Get the file yt-dlp wrote for a download.
+        
+        Args:
+            ydl: YoutubeDL instance that performed the download
+            result: Info dictionary returned by the download
+        
+        Returns:
+            Path of the downloaded file or None if unknown
+        """
+        if not result:
+            return None
+        
+        downloads = result.get('requested_downloads') or []
+        if downloads and downloads[0].get('filepath'):
+            return Path(downloads[0]['filepath'])
+        return Path(ydl.prepare_filename(result))
+    
+    def _get_postprocessing_steps(self, request: DownloadRequest, output_path: Optional[Path],
+                                  media_info: Optional[Dict[str, Any]]) -> List[tuple]:
+        """
+        Collect the ffmpeg work left to do after a download.
+        
+        Args:
+            request: Download request parameters
+            output_path: File produced by the download
+            media_info: Info dictionary of the downloaded video
+        
+        Returns:
+            List of (operation, step) pairs; each step is called with
+            cancel_event and progress_callback keyword arguments
+        """
+        download_info = self.active_downloads[request.request_id]
+        duration = (media_info or {}).get('duration')
+        steps = []
+        
+        remux = download_info.pop('pending_remux', None)
+        if remux is not None:
+            steps.append(("Merging video and audio", functools.partial(remux_streams, *remux, duration=duration)))
+        
+        converted = download_info.pop('audio_converted', False)
+        if (request.download_type == DownloadType.AUDIO or request.extract_audio) and not converted:
+            if output_path is None:
+                raise Exception("Downloaded file not found for audio extraction")
+            
+            codec = self._get_audio_codec(request)
+            source_codec = (media_info or {}).get('acodec')
+            operation = "Remuxing audio" if can_copy_audio(source_codec, codec) else "Converting audio"
+            
+            steps.append((operation, functools.partial(
+                extract_audio,
+                find_ffmpeg(self.ffmpeg_path),
+                output_path,
+                codec=codec,
+                quality='192',
+                source_codec=source_codec,
+                keep_source=request.keep_video and request.download_type != DownloadType.AUDIO,
+                overwrite=request.overwrite,
+                duration=duration
+            )))
+        
+        return steps
+    
+    def _postprocess_worker(self, request: DownloadRequest, steps: List[tuple]):
+        """
+        Run the ffmpeg steps of a finished download on the post-processing pool.
+        
+        Args:
+            request: Download request parameters
+            steps: Steps from _get_postprocessing_steps
+        """
+        request_id = request.request_id
+        download_info = self.active_downloads.get(request_id)
+        if download_info is None:
+            return
+        
+        cancel_event = download_info['cancel_event']
+        
+        try:
+            for operation, step in steps:
+                if cancel_event.is_set():
+                    raise DownloadCancelledError(f"Download cancelled: {request_id}")
+                
+                self._update_progress(request_id, percentage=0.0, current_operation=operation)
+                step(
+                    cancel_event=cancel_event,
+                    progress_callback=lambda percentage: self._update_progress(request_id, percentage=percentage)
+                )
+            
+            self._complete_download(request_id)
+            
+        except Exception as e:
+            if cancel_event.is_set():
+                logger.info(f"Post-processing aborted after cancellation: {request_id}")
+            else:
+                logger.error(f"Post-processing failed for {request_id}: {e}")
+                self._update_progress(
+                    request_id,
+                    status=ProgressStatus.FAILED,
+                    error_message=str(e)
+                )
+        finally:
+            self.progress_callbacks.pop(request_id, None)
+            # The download slot is long gone; let held downloads use the space
+            if self.disk_space.release(request_id):
+                self.scheduler.recheck_held()
+    
+    def _admit_download(self, request: DownloadRequest) -> bool:
+        """
+        Reserve disk space for a download about to leave the queue.
+        
+        Downloads whose estimated size does not fit on the output volume
+        next to the running ones stay queued until space is released.
+        Downloads of unknown size only need the configured margin.
+        
+        Args:
+            request: Download request the scheduler wants to start
+        
+        Returns:
+            True if the download may start
+        """
+        download_info = self.active_downloads.get(request.request_id)
+        if download_info is None:
+            return True
+        
+        # Sizes stay valid after the format URLs expire, so any cached info will
+        # do; held downloads come back here often and must not skew the cache stats
+        info = download_info.get('info') or self.metadata_cache.peek(extract_video_id(str(request.url)),
+                                                                     ignore_ttl=True)
+        audio_only = request.download_type == DownloadType.AUDIO
+        size = estimate_download_size(info, request.format_id, audio_only) or 0
+        # Resumed downloads already have part of the data on disk
+        size = max(0, size - download_info['progress'].downloaded_bytes)
+        
+        if self.disk_space.reserve(request.request_id, request.output_path, size):
+            if download_info.pop('disk_held', False):
+                logger.info(f"Disk space available, starting: {request.request_id}")
+            return True
+        
+        if not download_info.get('disk_held'):
+            download_info['disk_held'] = True
+            logger.warning(f"Not enough disk space in {request.output_path}, holding: {request.request_id}")
+            self._update_progress(request.request_id, current_operation="Waiting for disk space")
+        return False
+    
+    @staticmethod
+    def _media_url(info: Optional[Dict[str, Any]], page_url: str) -> str:
+        """
+        Get the URL the media of a download is transferred from.
+        
+        Args:
+            info: Info dictionary of the video
+            page_url: URL used when the info names no selected format
+        
+        Returns:
+            URL of the (first) selected format, or page_url
+        """
+        formats = (info or {}).get('requested_formats') or [info or {}]
+        return formats[0].get('url') or page_url
+    
+    def _select_formats(self, ydl, request: DownloadRequest, ydl_opts: Dict[str, Any],
+                        info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Resolve the formats yt-dlp would download for the built-in download paths.
+        
+        Args:
+            ydl: YoutubeDL instance used for format selection
+            request: Download request parameters
+            ydl_opts: Options the download was configured with
+            info: Reusable info dictionary or None to extract afresh
+        
+        Returns:
+            Processed info dictionary, or None if the download has to go
+            through yt-dlp's own download path
+        """
+        # Post-processing and subtitles are only handled by yt-dlp itself
+        if ydl_opts.get('postprocessors') or request.embed_subs:
+            return None
+        
+        can_merge = request.merge_streams and find_ffmpeg(self.ffmpeg_path)
+        if not can_merge and self.segmented is None:
+            return None
+        
+        if info is None:
+            return ydl.extract_info(str(request.url), download=False)
+        return ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=False)
+    
+    def _download_streams_parallel(self, ydl, request: DownloadRequest, ydl_opts: Dict[str, Any],
+                                   selected: Dict[str, Any]) -> Optional[Path]:
+        """
+        Download separate video and audio streams at the same time and remux them.
+        
+        yt-dlp fetches the formats of a merged selection one after another;
+        here each stream gets its own thread and YoutubeDL instance. Joining
+        the results with an ffmpeg stream copy is left to the post-processing
+        stage.
+        
+        Args:
+            ydl: YoutubeDL instance used for format selection
+            request: Download request parameters
+            ydl_opts: Options the stream downloaders are created with
+            selected: Processed info dictionary from _select_formats
+        
+        Returns:
+            Path the merged file will have, or None if the selection does not
+            consist of two separate streams and the regular path should be used
+        """
+        if not request.merge_streams:
+            return None
+        
+        ffmpeg = find_ffmpeg(self.ffmpeg_path)
+        if not ffmpeg:
+            return None
+        
+        formats = (selected or {}).get('requested_formats') or []
+        if len(formats) != 2:
+            return None
+        
+        output_path = Path(ydl.prepare_filename(selected))
+        if output_path.exists() and not request.overwrite:
+            logger.info(f"Already downloaded: {output_path}")
+            return output_path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        download_info = self.active_downloads[request.request_id]
+        download_info['streams'] = {
+            f['format_id']: {
+                'status': 'downloading',
+                'downloaded_bytes': 0,
+                'total_bytes': f.get('filesize') or f.get('filesize_approx')
+            }
+            for f in formats
+        }
+        download_info['streams_lock'] = threading.Lock()
+        download_info['abort_streams'] = False
+        
+        inputs = [
+            {'format': f, 'path': output_path.with_name(f"{output_path.stem}.f{f['format_id']}.{f['ext']}")}
+            for f in formats
+        ]
+        
+        logger.info(f"Downloading {len(inputs)} streams in parallel: {selected.get('format_id')}")
+        
+        try:
+            with ThreadPoolExecutor(max_workers=len(inputs), thread_name_prefix=f"stream-{request.request_id}") as pool:
+                futures = [
+                    pool.submit(self._download_stream, request, ydl_opts, selected, stream['format'], stream['path'])
+                    for stream in inputs
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except Exception:
+                    # Stop the sibling stream at its next progress update
+                    download_info['abort_streams'] = True
+                    raise
+        finally:
+            download_info.pop('streams', None)
+        
+        # The remux runs in the post-processing stage
+        download_info['pending_remux'] = (ffmpeg, inputs, output_path)
+        return output_path
+    
+    def _download_stream(self, request: DownloadRequest, ydl_opts: Dict[str, Any], info: Dict[str, Any],
+                         stream_format: Dict[str, Any], path: Path):
+        """
+        Download a single stream of a merged selection.
+        
+        Args:
+            request: Download request parameters
+            ydl_opts: yt-dlp options including the progress hook
+            info: Processed info dictionary of the video
+            stream_format: Format dictionary of the stream
+            path: Destination file of the stream
+        
+        Raises:
+            Exception: If the stream could not be downloaded
+        """
+        stream_info = dict(info)
+        stream_info.update(stream_format)
+        
+        if self.segmented is not None and self.segmented.connections > 1 and is_segmentable(stream_format):
+            self._fetch_segmented(request, stream_info, path)
+            return
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as stream_ydl:
+            success, _ = stream_ydl.dl(str(path), stream_info)
+        
+        if not success:
+            raise Exception(f"Failed to download stream {stream_format.get('format_id')}")
+    
+    def _download_segmented(self, ydl, request: DownloadRequest, selected: Dict[str, Any]) -> Optional[Path]:
+        """
+        Download a single progressive format over several connections.
+        
+        Args:
+            ydl: YoutubeDL instance used for format selection
+            request: Download request parameters
+            selected: Processed info dictionary from _select_formats
+        
+        Returns:
+            Path of the downloaded file, or None if the format cannot be
+            fetched in byte ranges and the regular path should be used
+        """
+        if self.segmented is None or self.segmented.connections <= 1:
+            return None
+        if selected.get('requested_formats') or not is_segmentable(selected):
+            return None
+        
+        # Small files are not worth the extra connections
+        if selected['filesize'] < 2 * self.segmented.min_segment_size:
+            return None
+        
+        output_path = Path(ydl.prepare_filename(selected))
+        if output_path.exists() and not request.overwrite:
+            logger.info(f"Already downloaded: {output_path}")
+            return output_path
+        
+        self._fetch_segmented(request, selected, output_path)
+        return output_path
+    
+    def _download_transcoded_stream(self, ydl, request: DownloadRequest, selected: Dict[str, Any]) -> Optional[Path]:
+        """
+        Pipe downloaded audio straight into ffmpeg, converting while it arrives.
+        
+        Only used when stream_transcode is enabled and the audio has to be
+        transcoded anyway. If streaming fails the download falls back to the
+        regular file-based path.
+        
+        Args:
+            ydl: YoutubeDL instance used for format selection
+            request: Download request parameters
+            selected: Processed info dictionary from _select_formats
+        
+        Returns:
+            Path of the converted audio file, or None if the regular path should be used
+        """
+        if not self.stream_transcode or self.segmented is None:
+            return None
+        if request.download_type != DownloadType.AUDIO and (not request.extract_audio or request.keep_video):
+            return None
+        if selected.get('requested_formats') or selected.get('protocol', 'https') not in ('http', 'https'):
+            return None
+        
+        codec = self._get_audio_codec(request)
+        ffmpeg = find_ffmpeg(self.ffmpeg_path)
+        if not ffmpeg or not selected.get('url') or can_copy_audio(selected.get('acodec'), codec):
+            return None
+        
+        output_path = audio_output_path(Path(ydl.prepare_filename(selected)), codec)
+        download_info = self.active_downloads[request.request_id]
+        download_info['audio_converted'] = True
+        if output_path.exists() and not request.overwrite:
+            logger.info(f"Already downloaded: {output_path}")
+            return output_path
+        
+        # Both sides report progress; the conversion shows up in the operation text
+        converted = {'percentage': 0.0}
+        
+        def report(d: Dict[str, Any]):
+            d['info_dict'] = selected
+            d['converted_percentage'] = converted['percentage']
+            self._progress_hook(request.request_id, d)
+        
+        def report_conversion(percentage: float):
+            converted['percentage'] = percentage
+        
+        logger.info(f"Streaming audio into ffmpeg: {request.request_id}")
+        chunks = self.segmented.stream(
+            selected['url'],
+            headers=selected.get('http_headers'),
+            progress_callback=report,
+            cancel_event=download_info['cancel_event'],
+            name=str(output_path)
+        )
+        
+        try:
+            transcode_stream(
+                ffmpeg,
+                chunks,
+                output_path,
+                codec=codec,
+                quality='192',
+                duration=selected.get('duration'),
+                cancel_event=download_info['cancel_event'],
+                progress_callback=report_conversion
+            )
+        except Exception as e:
+            if download_info['cancel_event'].is_set() or is_throttling_error(e) or is_forbidden_error(e):
+                raise
+            logger.warning(f"Streaming conversion failed, falling back to file mode: {e}")
+            download_info['audio_converted'] = False
+            download_info.pop('transferred', None)
+            return None
+        
+        return output_path
+    
+    def _fetch_segmented(self, request: DownloadRequest, format_info: Dict[str, Any], path: Path):
+        """
+        Fetch a format with the segmented downloader, reporting through the progress hook.
+        
+        Args:
+            request: Download request parameters
+            format_info: Info dictionary of the format to fetch
+            path: Destination file
+        """
+        download_info = self.active_downloads[request.request_id]
+        
+        def report(d: Dict[str, Any]):
+            d['info_dict'] = format_info
+            self._progress_hook(request.request_id, d)
+        
+        def preallocated(temp_path: Path, size: int):
+            download_info.setdefault('preallocated', set()).add(str(temp_path))
+            self.disk_space.consume(request.request_id, size)
+        
+        logger.info(f"Downloading format {format_info.get('format_id')} over "
+                    f"{self.segmented.connections} connections: {request.request_id}")
+        self.segmented.download(
+            format_info['url'],
+            path,
+            headers=format_info.get('http_headers'),
+            progress_callback=report,
+            cancel_event=download_info['cancel_event'],
+            resume=request.continue_partial,
+            retries=request.retry_count,
+            request_size=(format_info.get('downloader_options') or {}).get('http_chunk_size'),
+            preallocated_callback=preallocated
+        )
+    
+    def _delete_partial_files(self, partial_files):
+        """
+        Remove the partial files left behind by an aborted download.
+        
+        Args:
+            partial_files: Temporary filenames reported by yt-dlp
+        """
+        for temp_filename in partial_files:
+            temp_path = Path(temp_filename)
+            
+            # yt-dlp keeps fragments and resume state next to the .part file
+            candidates = [temp_path, Path(f"{temp_path}.ytdl"), Path(f"{temp_path}.segments")]
+            candidates.extend(temp_path.parent.glob(f"{temp_path.name}-Frag*"))
+            if temp_path.suffix == '.part':
+                candidates.append(temp_path.with_suffix('.ytdl'))
+            
+            for candidate in candidates:
+                try:
+                    if candidate.exists():
+                        candidate.unlink()
+                        logger.info(f"Removed partial file: {candidate}")
+                except OSError as e:
+                    logger.warning(f"Failed to remove partial file {candidate}: {e}")
+    
+    def get_reusable_info(self, source: Any) -> Optional[Dict[str, Any]]:
+        """
+        Find an extracted info dict that can be used to start a download.
+        
+        Args:
+            source: Info dict, VideoInfo, or video URL to look up in the cache
+            
+        Returns:
+            Fresh info dict or None if the video has to be extracted again
+        """
+        if isinstance(source, dict):
+            info = source
+        elif isinstance(source, VideoInfo):
+            info = self.metadata_cache.get(source.id)
+        elif source:
+            info = self.metadata_cache.get(extract_video_id(str(source)))
+        else:
+            info = None
+        
+        if not info or info.get('_type', 'video') != 'video' or not info.get('formats'):
+            return None
+        
+        if not self._is_info_fresh(info):
+            logger.info(f"Extracted info for {info.get('id')} has expired, re-extracting")
+            return None
+        
+        return info
+    
+    def _is_info_fresh(self, info: Dict[str, Any]) -> bool:
+        """
+        Check whether the format URLs in an info dict are still usable.
+        
+        Args:
+            info: yt-dlp info dictionary
+            
+        Returns:
+            True if no format URL expires within the safety margin
+        """
+        download_settings = self.config.get("download_settings", {})
+        margin = download_settings.get("info_expiry_margin", 300)
+        max_age = download_settings.get("info_reuse_max_age", 1800)
+        now = time.time()
+        
+        expiries = []
+        for fmt in info.get('formats') or []:
+            for key in ('url', 'manifest_url', 'fragment_base_url'):
+                match = _EXPIRE_PATTERN.search(str(fmt.get(key) or ''))
+                if match:
+                    expiries.append(int(match.group(1)))
+                    break
+        
+        if expiries:
+            return min(expiries) - margin > now
+        
+        # No signed URLs: fall back to the age of the extraction
+        epoch = info.get('epoch')
+        return epoch is not None and now - epoch < max_age
+    
+    def download_with_info(self, ydl, url: str, info: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Download a video, reusing an extracted info dict when available.
+        
+        The info dict is fed straight into yt-dlp's processing stage so
+        the extraction round trip is skipped. If the download fails, for
+        example because a format URL was rejected, the video is extracted
+        again from its URL.
+        
+        Args:
+            ydl: Configured YoutubeDL instance
+            url: Video URL used when no reusable info is available
+            info: Optional info dict from get_reusable_info
+        
+        Returns:
+            Info dict of the downloaded video
+        """
+        if info is None:
+            return ydl.extract_info(url, download=True)
+        
+        try:
+            # sanitize_info returns a cleaned copy, leaving the cached dict untouched
+            return ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=True)
+        except DownloadError as e:
+            logger.warning(f"Download from extracted info failed, re-extracting: {e}")
+            self.metadata_cache.invalidate(info.get('id'))
+            return ydl.extract_info(info.get('webpage_url') or url, download=True)
+    
+    def _update_progress(self, request_id: str, **kwargs):
+        """
+        Update progress information for a download.
+        
+        Args:
+            request_id: Request ID to update
+            **kwargs: Progress fields to update
+        """
+        if request_id not in self.active_downloads:
+            return
+        
+        # Copy so a record that is being published never changes
+        current_progress = self.active_downloads[request_id]['progress']
+        updated_progress = current_progress.copy().update(**kwargs)
+        
+        self.active_downloads[request_id]['progress'] = updated_progress
+        
+        if 'status' in kwargs:
+            self.journal.record_status(request_id, updated_progress.status)
+        
+        self._publish_progress(request_id, updated_progress)
+    
+    def _publish_progress(self, request_id: str, progress: ProgressRecord):
+        """
+        Pass a progress update to the progress manager and the callback.
+        
+        The progress manager keeps the record and converts it when its
+        events are delivered, so only a registered callback needs a
+        ProgressInfo for every update. Both share the record's cached model.
+        
+        Args:
+            request_id: Request ID of the download
+            progress: Current progress record, which is not changed afterwards
+        """
+        if self.progress_manager:
+            self.progress_manager.update_progress(request_id, progress)
+        
+        # Call progress callback if registered
+        callback = self.progress_callbacks.get(request_id)
+        if callback:
+            try:
+                callback(progress.to_info())
+            except Exception as e:
+                logger.error(f"Error in progress callback: {e}")
+    
+    def cancel_download(self, request_id: str, delete_partial: Optional[bool] = None) -> bool:
+        """
+        Cancel a queued or active download.
+        
+        Queued requests are removed from the scheduler. Running transfers
+        are aborted from their progress hook and their download slot is
+        handed to the next queued request immediately.
+        
+        Args:
+            request_id: Request ID to cancel
+            delete_partial: Remove .part files of the aborted transfer;
+                defaults to download_settings.delete_partial_on_cancel
+            
+        Returns:
+            True if cancelled successfully, False otherwise
+        """
+        download_info = self.active_downloads.get(request_id)
+        if download_info is None or download_info['progress'].status in _FINAL_STATES:
             return False
         
         logger.info(f"Cancelling download: {request_id}")
         
+        if delete_partial is None:
+            delete_partial = self.config.get("download_settings", {}).get("delete_partial_on_cancel", False)
+        download_info['delete_partial'] = delete_partial
+        download_info['cancel_event'].set()
+        self.bandwidth.unregister(request_id)
+        self.resume_index.remove(request_id)
+        
+        # A paused job has no worker left to clean up after it
+        if download_info['progress'].status == ProgressStatus.PAUSED:
+            download_info['paused'] = False
+            if delete_partial:
+                self._delete_partial_files(download_info.get('partial_files', ()))
+        
+        # Cancelling a playlist stops its expansion and all of its entries
+        for entry_id in list(download_info.get('entry_ids', [])):
+            self.cancel_download(entry_id, delete_partial)
+        
+        # Drop the request from the queue, or free its slot right away
+        if not self.scheduler.remove_pending(request_id):
+            self.scheduler.release(request_id)
+        
         # Update status
         self._update_progress(request_id, status=ProgressStatus.CANCELLED)
         
@@ -511,6 +1802,167 @@ class YouTubeDownloader:
         
         return True
     
+    def pause_download(self, request_id: str) -> bool:
+        """
+        Pause a queued or active download, keeping its partial files.
+        
+        Args:
+            request_id: Request ID to pause
+        
+        Returns:
+            True if the download was paused, False otherwise
+        """
+        download_info = self.active_downloads.get(request_id)
+        
+        # Post-processing works on complete files and cannot be paused
+        unpausable = _FINAL_STATES + (ProgressStatus.PAUSED, ProgressStatus.POSTPROCESSING)
+        if (download_info is None or 'worker_idle' not in download_info
+                or download_info['progress'].status in unpausable):
+            return False
+        
+        logger.info(f"Pausing download: {request_id}")
+        
+        download_info['paused'] = True
+        download_info['cancel_event'].set()
+        self.bandwidth.unregister(request_id)
+        
+        # Resume with the formats already on disk
+        if download_info['format_id']:
+            download_info['request'] = download_info['request'].copy(
+                update={'format_id': download_info['format_id']}
+            )
+            self.journal.record_enqueue(request_id, json.loads(download_info['request'].json()))
+        
+        if not self.scheduler.remove_pending(request_id):
+            self.scheduler.release(request_id)
+        
+        self._update_progress(
+            request_id,
+            status=ProgressStatus.PAUSED,
+            speed=None,
+            eta=None,
+            current_operation="Paused"
+        )
+        return True
+    
+    def resume_download(self, request_id: str) -> bool:
+        """
+        Queue a paused download again, continuing its partial files.
+        
+        Args:
+            request_id: Request ID to resume
+        
+        Returns:
+            True if the download was queued, False otherwise
+        """
+        download_info = self.active_downloads.get(request_id)
+        if download_info is None or download_info['progress'].status != ProgressStatus.PAUSED:
+            return False
+        
+        # Wait for the aborted transfer to let go of its .part file
+        if not download_info['worker_idle'].wait(timeout=10):
+            logger.warning(f"Previous transfer still running, cannot resume yet: {request_id}")
+            return False
+        
+        logger.info(f"Resuming download: {request_id}")
+        
+        request = download_info['request'].copy(update={'continue_partial': True})
+        download_info['request'] = request
+        download_info['paused'] = False
+        download_info['cancel_event'] = threading.Event()
+        
+        self._update_progress(
+            request_id,
+            status=ProgressStatus.PENDING,
+            current_operation="Waiting for download slot"
+        )
+        
+        if not self.scheduler.submit(request):
+            download_info['paused'] = True
+            download_info['cancel_event'].set()
+            self._update_progress(request_id, status=ProgressStatus.PAUSED, current_operation="Paused")
+            return False
+        
+        return True
+    
+    def restore_interrupted_downloads(self, progress_callback: Optional[Callable[[ProgressInfo], None]] = None,
+                                      auto_resume: bool = True) -> List[str]:
+        """
+        Rebuild the download queue left unfinished by the last run.
+        
+        Unfinished jobs are taken from the queue journal in their original
+        order. Jobs with partial files on disk continue from them using the
+        format IDs stored in the resume index; resume entries of jobs that
+        are no longer unfinished are dropped.
+        
+        Args:
+            progress_callback: Optional callback for progress updates
+            auto_resume: Queue the downloads right away instead of leaving them paused;
+                downloads paused by the user always stay paused
+        
+        Returns:
+            Request IDs of the restored downloads
+        """
+        restored = []
+        unfinished = self.journal.get_unfinished()
+        partials = {entry['request_id']: entry for entry in self.resume_index.reconcile()}
+        
+        for job in unfinished:
+            request_id = job['request_id']
+            if request_id in self.active_downloads:
+                continue
+            
+            try:
+                request = DownloadRequest.parse_obj(job['request'])
+            except Exception as e:
+                logger.warning(f"Dropping unusable journal entry {request_id}: {e}")
+                self.journal.record_status(request_id, ProgressStatus.FAILED.value)
+                continue
+            
+            entry = partials.pop(request_id, {})
+            if entry.get('format_id'):
+                request = request.copy(update={'format_id': entry['format_id'], 'continue_partial': True})
+            
+            if progress_callback:
+                self.progress_callbacks[request_id] = progress_callback
+            
+            user_paused = job.get('status') == ProgressStatus.PAUSED.value
+            progress = ProgressRecord(
+                request_id=request_id,
+                status=ProgressStatus.PAUSED,
+                downloaded_bytes=job.get('downloaded_bytes') or 0,
+                total_bytes=job.get('total_bytes'),
+                current_operation="Paused" if user_paused else "Interrupted, ready to resume"
+            )
+            self.active_downloads[request_id] = {
+                'request': request,
+                'queued_at': datetime.now(),
+                'progress': progress,
+                'info': None,
+                'cancel_event': threading.Event(),
+                'partial_files': set(entry.get('partial_files', [])),
+                'format_id': request.format_id,
+                'worker_idle': threading.Event(),
+                'paused': True
+            }
+            self.active_downloads[request_id]['worker_idle'].set()
+            
+            if self.progress_manager:
+                self.progress_manager.register_progress(request_id, progress)
+            
+            restored.append(request_id)
+            if auto_resume and not user_paused:
+                self.resume_download(request_id)
+        
+        # Partial files of finished jobs are not resumed
+        for request_id in partials:
+            self.resume_index.remove(request_id)
+        
+        if restored:
+            logger.info(f"Restored {len(restored)} interrupted downloads")
+        
+        return restored
+    
     def get_download_progress(self, request_id: str) -> Optional[ProgressInfo]:
         """
         Get current progress for a download.
@@ -524,7 +1976,7 @@ class YouTubeDownloader:
         if request_id not in self.active_downloads:
             return None
         
-        return self.active_downloads[request_id]['progress']
+        return self.active_downloads[request_id]['progress'].to_info()
     
     def get_active_downloads(self) -> List[str]:
         """
@@ -539,7 +1991,7 @@ class YouTubeDownloader:
         """Remove completed downloads from active tracking."""
         completed_ids = []
         
-        for request_id, download_info in self.active_downloads.items():
+        for request_id, download_info in list(self.active_downloads.items()):
             progress = download_info['progress']
             if progress.status in [ProgressStatus.COMPLETED, ProgressStatus.FAILED, ProgressStatus.CANCELLED]:
                 completed_ids.append(request_id)
@@ -550,4 +2002,23 @@ class YouTubeDownloader:
             if request_id in self.progress_callbacks:
                 del self.progress_callbacks[request_id]
         
-        logger.info(f"Cleaned up {len(completed_ids)} completed downloads")
\ No newline at end of file
+        logger.info(f"Cleaned up {len(completed_ids)} completed downloads")
+    
+    def shutdown(self):
+        """
+        Stop dispatching queued downloads and mark them as cancelled.
+        
+        The queue journal is closed first, so unfinished downloads stay
+        journaled and are restored on the next start.
+        """
+        self.journal.close()
+        
+        for request in self.scheduler.shutdown():
+            self._update_progress(request.request_id, status=ProgressStatus.CANCELLED)
+            self.progress_callbacks.pop(request.request_id, None)
+        
+        self.extract_executor.shutdown(wait=False, cancel_futures=True)
+        self.postprocess_executor.shutdown(wait=False, cancel_futures=True)
+        self.info_pool.close()
+        if self.segmented is not None:
+            self.segmented.close()
\ No newline at end of file
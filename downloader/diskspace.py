@@ -0,0 +1,208 @@
+"""
+Disk space reservations for queued downloads.
+
+This module estimates how much space a download will take and keeps
+per-volume reservations for running jobs, so the scheduler only starts a
+job when the output volume can hold it next to everything already in
+flight. Reservations shrink as the data is written and are released when
+the job ends.
+"""
+
+import os
+import shutil
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _field(info: Any, key: str) -> Any:
+    """Read a field from an info dictionary or a VideoInfo."""
+    if isinstance(info, dict):
+        return info.get(key)
+    return getattr(info, key, None)
+
+
+def _format_size(fmt: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Get the exact or approximate size of a yt-dlp format."""
+    if not fmt:
+        return None
+    return fmt.get('filesize') or fmt.get('filesize_approx')
+
+
+def estimate_download_size(info: Any, format_id: Optional[str] = None,
+                           audio_only: bool = False) -> Optional[int]:
+    """
+    Estimate the disk space a download needs at its peak.
+    
+    Explicitly chosen formats are looked up in the format list; otherwise
+    the formats yt-dlp selected or the video's own size estimate is used.
+    Separate streams are counted twice because the remuxed output is
+    written before the stream files are removed.
+    
+    Args:
+        info: VideoInfo or yt-dlp info dictionary, or None
+        format_id: Explicit yt-dlp format ID(s) such as '137+140'
+        audio_only: Only the audio will be downloaded
+    
+    Returns:
+        Size in bytes, or None if nothing is known about the size
+    """
+    if info is None or isinstance(info, str):
+        return None
+    
+    formats = _field(info, 'formats') or []
+    
+    sizes = None
+    if format_id:
+        by_id = {f.get('format_id'): f for f in formats}
+        sizes = [_format_size(by_id.get(part)) for part in format_id.split('+')]
+    elif audio_only:
+        # Storyboards have neither a video nor an audio codec
+        audio_sizes = [_format_size(f) for f in formats
+                       if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')]
+        audio_sizes = [size for size in audio_sizes if size]
+        sizes = [max(audio_sizes)] if audio_sizes else None
+    elif _field(info, 'requested_formats'):
+        sizes = [_format_size(f) for f in _field(info, 'requested_formats')]
+    
+    if sizes and all(sizes):
+        return sum(sizes) * (2 if len(sizes) > 1 else 1)
+    
+    return _field(info, 'filesize') or _field(info, 'filesize_approx')
+
+
+def _existing_path(path: Path) -> Path:
+    """Get the nearest existing directory of a path that may not exist yet."""
+    path = Path(path).absolute()
+    while not path.exists() and path.parent != path:
+        path = path.parent
+    return path
+
+
+class _Reservation:
+    """Space held by one job."""
+    
+    __slots__ = ('volume', 'size', 'written')
+    
+    def __init__(self, volume: int, size: int):
+        self.volume = volume
+        self.size = size
+        self.written = 0
+    
+    @property
+    def outstanding(self) -> int:
+        """Reserved bytes not written to disk yet."""
+        return max(0, self.size - self.written)
+
+
+class DiskSpaceReserver:
+    """
+    Per-volume space reservations for running downloads.
+    
+    A job is admitted when the volume's free space, minus what running
+    jobs on that volume still have to allocate and a safety margin, covers
+    its estimated size. Bytes a job has written or preallocated are already
+    missing from the free space, so they are taken off its reservation.
+    """
+    
+    def __init__(self, margin: int = 536870912):
+        """
+        Initialize the reserver.
+        
+        Args:
+            margin: Bytes kept free on every volume
+        """
+        self.margin = max(0, int(margin))
+        self._reservations: Dict[str, _Reservation] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def volume_of(path: Path) -> int:
+        """
+        Identify the volume a path is stored on.
+        
+        Args:
+            path: File or directory, which need not exist yet
+        
+        Returns:
+            Device number of the volume
+        """
+        return os.stat(_existing_path(path)).st_dev
+    
+    def reserved(self, path: Path) -> int:
+        """
+        Get the space running jobs still need on a path's volume.
+        
+        Args:
+            path: File or directory on the volume
+        
+        Returns:
+            Outstanding reserved bytes
+        """
+        volume = self.volume_of(path)
+        with self._lock:
+            return sum(r.outstanding for r in self._reservations.values() if r.volume == volume)
+    
+    def reserve(self, request_id: str, path: Path, size: int) -> bool:
+        """
+        Reserve space for a job if its volume can hold it.
+        
+        Args:
+            request_id: Job holding the reservation
+            path: Output directory of the job
+            size: Estimated size in bytes (0 if unknown)
+        
+        Returns:
+            True if the space was reserved, False if the job has to wait
+        """
+        try:
+            location = _existing_path(path)
+            volume = os.stat(location).st_dev
+            free = shutil.disk_usage(location).free
+        except OSError as e:
+            # Let the download itself report an unusable output path
+            logger.warning(f"Cannot check free space for {path}: {e}")
+            return True
+        
+        size = max(0, int(size or 0))
+        with self._lock:
+            self._reservations.pop(request_id, None)
+            outstanding = sum(r.outstanding for r in self._reservations.values() if r.volume == volume)
+            if free - outstanding - self.margin < size:
+                logger.debug(f"Not enough space for {request_id}: needs {size}, "
+                             f"{free - outstanding} available on volume {volume}")
+                return False
+            
+            self._reservations[request_id] = _Reservation(volume, size)
+            return True
+    
+    def consume(self, request_id: str, nbytes: int):
+        """
+        Account for bytes a job has written.
+        
+        Args:
+            request_id: Job that wrote the data
+            nbytes: Bytes written since the previous call
+        """
+        if nbytes <= 0:
+            return
+        with self._lock:
+            reservation = self._reservations.get(request_id)
+            if reservation is not None:
+                reservation.written += nbytes
+    
+    def release(self, request_id: str) -> bool:
+        """
+        Release the space held by a job.
+        
+        Args:
+            request_id: Job whose reservation ends
+        
+        Returns:
+            True if the job held a reservation
+        """
+        with self._lock:
+            return self._reservations.pop(request_id, None) is not None
@@ -0,0 +1,366 @@
+"""
+Per-host concurrency limiting and throttling backoff.
+
+This module provides a limiter shared by extraction and download threads.
+It caps how many requests run against a host at once, shrinks that cap
+when the host answers with HTTP 429 or 503 and opens a circuit breaker with
+jittered backoff when throttling persists, so concurrent workers back off
+together instead of retrying independently.
+"""
+
+import re
+import time
+import random
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+_THROTTLE_PATTERN = re.compile(r'HTTP Error (?:429|503)|Too Many Requests|Service Unavailable', re.IGNORECASE)
+_FORBIDDEN_PATTERN = re.compile(r'HTTP Error 403', re.IGNORECASE)
+
+
+class HostSlotCancelled(Exception):
+    """Raised when a caller gives up waiting for a host slot."""
+
+
+def host_key(url: str) -> str:
+    """
+    Get the limiter key for a URL.
+    
+    Args:
+        url: Request URL
+    
+    Returns:
+        Host name without www./m. prefixes, with youtu.be folded into youtube.com
+    """
+    host = (urlparse(str(url)).hostname or '').lower()
+    for prefix in ('www.', 'm.', 'music.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if host == 'youtu.be':
+        host = 'youtube.com'
+    return host
+
+
+def _has_status(error: BaseException, status_codes: Tuple[int, ...], pattern) -> bool:
+    """Check an error and the errors it wraps for one of the HTTP statuses."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        
+        response = getattr(error, 'response', None)
+        status = (getattr(error, 'status', None) or getattr(response, 'status', None)
+                  or getattr(response, 'status_code', None))
+        if status in status_codes or pattern.search(str(error)):
+            return True
+        
+        # yt-dlp wraps the original error in DownloadError.exc_info
+        exc_info = getattr(error, 'exc_info', None)
+        error = exc_info[1] if exc_info else error.__cause__
+    return False
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Check whether an error means the host is throttling us.
+    
+    Args:
+        error: Exception raised by yt-dlp or the network stack
+    
+    Returns:
+        True for HTTP 429 and 503 responses
+    """
+    return _has_status(error, (429, 503), _THROTTLE_PATTERN)
+
+
+def is_forbidden_error(error: BaseException) -> bool:
+    """
+    Check whether an error is an HTTP 403 response.
+    
+    Signed format URLs answer 403 once they expire, which waiting does not
+    fix; the video has to be extracted again instead.
+    
+    Args:
+        error: Exception raised by yt-dlp or the network stack
+    
+    Returns:
+        True for HTTP 403 responses
+    """
+    return _has_status(error, (403,), _FORBIDDEN_PATTERN)
+
+
+class RetryMonitor:
+    """
+    yt-dlp logger that remembers whether a retry was caused by throttling.
+    
+    yt-dlp reports the error of an internal retry through its logger right
+    before calling the retry sleep function, which only gets the retry
+    number. The outcome is kept per thread since fragments are retried
+    concurrently.
+    """
+    
+    def __init__(self, target: logging.Logger):
+        """
+        Initialize retry monitor.
+        
+        Args:
+            target: Logger the messages are passed on to
+        """
+        self.target = target
+        self._local = threading.local()
+    
+    @property
+    def throttled(self) -> bool:
+        """Whether the last retry reported by this thread was throttled."""
+        return getattr(self._local, 'throttled', False)
+    
+    def _observe(self, message: str):
+        """Remember whether a retry message names a throttling response."""
+        if 'Retrying' in message:
+            self._local.throttled = bool(_THROTTLE_PATTERN.search(message))
+    
+    def debug(self, message: str):
+        """Log a debug message."""
+        self._observe(message)
+        self.target.debug(message)
+    
+    def info(self, message: str):
+        """Log an info message."""
+        self.target.info(message)
+    
+    def warning(self, message: str):
+        """Log a warning message."""
+        self._observe(message)
+        self.target.warning(message)
+    
+    def error(self, message: str):
+        """Log an error message."""
+        self.target.error(message)
+
+
+class _HostState:
+    """Limiter state of a single host."""
+    
+    __slots__ = ('limit', 'in_flight', 'throttles', 'trips', 'open_until', 'half_open', 'last_decrease')
+    
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.throttles = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.half_open = False
+        self.last_decrease = 0.0
+
+
+class HostLimiter:
+    """
+    Adaptive per-host concurrency limiter with a circuit breaker.
+    
+    The allowed concurrency per host follows AIMD: it is halved when a
+    request is throttled and grows by roughly one slot per window of
+    successful requests. When requests keep being throttled at the minimum
+    concurrency the circuit opens and all callers wait out an exponentially
+    growing, jittered backoff; afterwards a single probe request decides
+    whether the circuit closes again.
+    """
+    
+    def __init__(self, max_per_host: int = 6, min_per_host: int = 1, failure_threshold: int = 3,
+                 base_backoff: float = 2.0, max_backoff: float = 120.0):
+        """
+        Initialize host limiter.
+        
+        Args:
+            max_per_host: Upper bound of concurrent requests per host
+            min_per_host: Lower bound the limit shrinks to under throttling
+            failure_threshold: Consecutive throttled requests at minimum concurrency that open the circuit
+            base_backoff: Backoff in seconds after the first trip
+            max_backoff: Maximum backoff in seconds
+        """
+        self.max_per_host = max(1, max_per_host)
+        self.min_per_host = max(1, min(min_per_host, self.max_per_host))
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        
+        self._hosts: Dict[str, _HostState] = {}
+        
+        # Thread safety
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+    
+    def _state(self, host: str) -> _HostState:
+        """Get or create the state of a host. Must hold _lock."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(float(self.max_per_host))
+        return state
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter."""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** max(0, attempt)))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def _acquire(self, host: str, cancel_event: Optional[threading.Event]) -> Tuple[float, bool]:
+        """Wait for a free slot on a host and return the admission time and whether it is the probe."""
+        with self._lock:
+            state = self._state(host)
+            
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise HostSlotCancelled(f"Gave up waiting for {host}")
+                
+                now = time.monotonic()
+                if state.open_until > now:
+                    wait = state.open_until - now
+                elif state.open_until and not state.half_open:
+                    # Backoff elapsed: let a single probe through, even
+                    # while requests admitted before the trip still run
+                    state.half_open = True
+                    state.in_flight += 1
+                    return now, True
+                elif state.half_open or state.open_until:
+                    wait = None
+                elif state.in_flight < int(state.limit):
+                    state.in_flight += 1
+                    return now, False
+                else:
+                    wait = None
+                
+                # Poll so cancellation is noticed while waiting
+                if cancel_event is not None:
+                    wait = 0.5 if wait is None else min(wait, 0.5)
+                self._changed.wait(wait)
+    
+    def _throttled(self, host: str, state: _HostState, admitted_at: float, probe: bool, now: float):
+        """Shrink a host's limit after a throttled request. Must hold _lock."""
+        state.throttles += 1
+        
+        # Halve once per round: requests admitted before the last
+        # decrease were sent under the old limit and do not count again
+        if admitted_at >= state.last_decrease:
+            state.limit = max(float(self.min_per_host), state.limit / 2)
+            state.last_decrease = now
+        
+        # Only back off entirely once minimal concurrency is throttled too
+        at_minimum = state.limit <= self.min_per_host
+        if (probe and state.half_open) or (at_minimum and state.throttles >= self.failure_threshold):
+            backoff = self._backoff(state.trips)
+            state.trips += 1
+            state.open_until = now + backoff
+            state.half_open = False
+            logger.warning(f"Host {host} is throttling, backing off for {backoff:.1f}s")
+    
+    def _release(self, host: str, admitted_at: float, probe: bool, throttled: bool, succeeded: bool):
+        """Return a slot and adapt the host's limit to the outcome."""
+        with self._lock:
+            state = self._state(host)
+            state.in_flight -= 1
+            now = time.monotonic()
+            
+            if throttled:
+                self._throttled(host, state, admitted_at, probe, now)
+            
+            elif succeeded:
+                state.throttles = 0
+                if probe and state.half_open:
+                    state.half_open = False
+                    state.open_until = 0.0
+                    state.trips = max(0, state.trips - 1)
+                    logger.info(f"Host {host} recovered, resuming with {int(state.limit)} slots")
+                
+                # Additive increase: about one slot per limit successes
+                state.limit = min(float(self.max_per_host), state.limit + 1.0 / state.limit)
+            
+            elif probe and state.half_open:
+                # Probe failed for another reason; let the next caller probe
+                state.half_open = False
+            
+            self._changed.notify_all()
+    
+    @contextmanager
+    def slot(self, url: str, cancel_event: Optional[threading.Event] = None):
+        """
+        Hold a concurrency slot on the URL's host for a with block.
+        
+        A throttling error leaving the block shrinks the host's limit and
+        may open its circuit; a clean exit counts as success.
+        
+        Args:
+            url: URL of the request
+            cancel_event: Optional event that aborts waiting for a slot
+        
+        Yields:
+            Host key of the slot
+        
+        Raises:
+            HostSlotCancelled: If cancel_event is set while waiting
+        """
+        host = host_key(url)
+        admitted_at, probe = self._acquire(host, cancel_event)
+        
+        throttled = False
+        succeeded = False
+        try:
+            yield host
+            succeeded = True
+        except BaseException as e:
+            throttled = is_throttling_error(e)
+            raise
+        finally:
+            self._release(host, admitted_at, probe, throttled, succeeded)
+    
+    def retry_delay(self, url: str, attempt: int, throttled: bool = False) -> float:
+        """
+        Get the sleep before a retry against a host.
+        
+        Suitable for yt-dlp's retry_sleep_functions. Waits at least until
+        an open circuit of the host would close. Only throttled retries
+        shrink the host's limit; other errors just back off.
+        
+        Args:
+            url: URL of the request
+            attempt: Zero-based retry number
+            throttled: Whether the host answered the failed attempt with 429 or 503
+        
+        Returns:
+            Delay in seconds
+        """
+        host = host_key(url)
+        delay = self._backoff(attempt)
+        with self._lock:
+            now = time.monotonic()
+            if throttled:
+                # A retried request went out at least one short backoff ago,
+                # so throttled retries reported together count as one round
+                self._throttled(host, self._state(host), now - self.base_backoff / 2, False, now)
+                self._changed.notify_all()
+            state = self._hosts.get(host)
+            if state is not None:
+                delay = max(delay, state.open_until - now)
+        return delay
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-host limiter state.
+        
+        Returns:
+            Dictionary mapping host to limit, in-flight count and circuit state
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    'limit': int(state.limit),
+                    'in_flight': state.in_flight,
+                    'circuit': 'half-open' if state.half_open else ('open' if state.open_until > now else 'closed'),
+                    'backoff_remaining': max(0.0, state.open_until - now),
+                }
+                for host, state in self._hosts.items()
+            }
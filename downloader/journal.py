@@ -0,0 +1,271 @@
+"""
+Persistent download queue journal.
+
+This module keeps an append-only JSON lines journal of queue events so
+the download queue survives crashes and restarts. Writes are buffered and
+synced to disk in batches by a background thread, and the journal is
+compacted into a snapshot of the unfinished jobs once it grows large.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Statuses after which a job is not run again
+_FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class QueueJournal:
+    """
+    Append-only journal of download queue events.
+    
+    Records are applied to an in-memory view of the unfinished jobs as
+    they are appended and written out by a background thread, which
+    flushes and fsyncs whole batches at once. A torn last line left by a
+    crash is ignored on replay.
+    """
+    
+    def __init__(self, journal_path: Path, flush_interval: float = 0.5, max_batch: int = 256,
+                 checkpoint_interval: float = 5.0, compact_threshold: int = 5000):
+        """
+        Initialize queue journal.
+        
+        Args:
+            journal_path: JSON lines file holding the journal
+            flush_interval: Maximum time in seconds a record stays unsynced
+            max_batch: Number of buffered records that triggers an early flush
+            checkpoint_interval: Minimum time in seconds between progress checkpoints of a job
+            compact_threshold: Number of records after which the journal is compacted
+        """
+        self.journal_path = Path(journal_path)
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.checkpoint_interval = checkpoint_interval
+        self.compact_threshold = max(1, compact_threshold)
+        
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buffer: List[str] = []
+        self._last_checkpoint: Dict[str, float] = {}
+        self._records_since_compaction = 0
+        self._closed = False
+        
+        # Thread safety: _lock guards state and buffer, _io_lock the file
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._replay()
+        
+        # Start from a compact file so finished jobs do not pile up
+        self._file = None
+        with self._io_lock:
+            self._compact()
+        
+        self._writer = threading.Thread(target=self._writer_loop, name="queue-journal", daemon=True)
+        self._writer.start()
+    
+    def _replay(self):
+        """Rebuild the job view from the journal on disk."""
+        if not self.journal_path.exists():
+            return
+        
+        skipped = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+        except OSError as e:
+            logger.error(f"Failed to read queue journal {self.journal_path}: {e}")
+            return
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} damaged records in queue journal")
+        logger.info(f"Queue journal replayed with {len(self._jobs)} unfinished jobs")
+    
+    def _apply(self, record: Dict[str, Any]):
+        """Apply a single record to the job view."""
+        event = record['event']
+        request_id = record['id']
+        
+        if event == 'enqueue':
+            job = self._jobs.setdefault(request_id, {'status': 'pending'})
+            job['request'] = record['request']
+            for key in ('status', 'downloaded_bytes', 'total_bytes'):
+                if key in record:
+                    job[key] = record[key]
+        elif request_id not in self._jobs:
+            return
+        elif event == 'status':
+            if record['status'] in _FINISHED_STATUSES:
+                del self._jobs[request_id]
+                self._last_checkpoint.pop(request_id, None)
+            else:
+                self._jobs[request_id]['status'] = record['status']
+        elif event == 'checkpoint':
+            self._jobs[request_id]['downloaded_bytes'] = record.get('downloaded_bytes')
+            self._jobs[request_id]['total_bytes'] = record.get('total_bytes')
+    
+    def _append(self, record: Dict[str, Any]):
+        """Apply a record and queue it for writing. Must hold _lock."""
+        if self._closed:
+            return
+        
+        record['ts'] = time.time()
+        self._apply(record)
+        self._buffer.append(json.dumps(record))
+        self._records_since_compaction += 1
+        
+        if len(self._buffer) >= self.max_batch:
+            self._flush_requested.set()
+    
+    def record_enqueue(self, request_id: str, request_data: Dict[str, Any]):
+        """
+        Record a queued job, or update the request of a known one.
+        
+        Args:
+            request_id: Request ID of the download
+            request_data: JSON-compatible download request
+        """
+        with self._lock:
+            self._append({'event': 'enqueue', 'id': request_id, 'request': request_data})
+    
+    def record_status(self, request_id: str, status: str):
+        """
+        Record a status transition of a journaled job.
+        
+        Args:
+            request_id: Request ID of the download
+            status: New status value
+        """
+        with self._lock:
+            if request_id not in self._jobs or self._jobs[request_id]['status'] == status:
+                return
+            self._append({'event': 'status', 'id': request_id, 'status': status})
+    
+    def record_checkpoint(self, request_id: str, downloaded_bytes: Optional[int],
+                          total_bytes: Optional[int] = None):
+        """
+        Record download progress, at most once per checkpoint interval.
+        
+        Args:
+            request_id: Request ID of the download
+            downloaded_bytes: Bytes downloaded so far
+            total_bytes: Total size if known
+        """
+        now = time.monotonic()
+        
+        with self._lock:
+            if request_id not in self._jobs:
+                return
+            if now - self._last_checkpoint.get(request_id, 0.0) < self.checkpoint_interval:
+                return
+            
+            self._last_checkpoint[request_id] = now
+            self._append({
+                'event': 'checkpoint',
+                'id': request_id,
+                'downloaded_bytes': downloaded_bytes,
+                'total_bytes': total_bytes
+            })
+    
+    def get_unfinished(self) -> List[Dict[str, Any]]:
+        """
+        Get jobs that have not completed, failed or been cancelled.
+        
+        Returns:
+            Jobs in enqueue order with their request ID under 'request_id'
+        """
+        with self._lock:
+            return [dict(job, request_id=request_id) for request_id, job in self._jobs.items()]
+    
+    def _writer_loop(self):
+        """Flush buffered records in batches until the journal is closed."""
+        while not self._closed:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+    
+    def flush(self):
+        """Write buffered records and sync them to disk."""
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                needs_compaction = self._records_since_compaction >= self.compact_threshold
+            
+            if needs_compaction:
+                # The snapshot already contains the drained records
+                self._compact()
+                return
+            
+            if not lines or self._file is None:
+                return
+            
+            try:
+                self._file.write('\n'.join(lines) + '\n')
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                logger.error(f"Failed to write queue journal: {e}")
+    
+    def _compact(self):
+        """Replace the journal with a snapshot of the unfinished jobs. Must hold _io_lock."""
+        with self._lock:
+            now = time.time()
+            snapshot = [
+                json.dumps(dict(job, event='enqueue', id=request_id, ts=now))
+                for request_id, job in self._jobs.items()
+            ]
+            self._buffer = []
+            self._records_since_compaction = 0
+        
+        temp_path = self.journal_path.with_suffix(".tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                if snapshot:
+                    f.write('\n'.join(snapshot) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            
+            if self._file is not None:
+                self._file.close()
+            os.replace(temp_path, self.journal_path)
+        except OSError as e:
+            logger.error(f"Failed to compact queue journal: {e}")
+        
+        if self._closed:
+            self._file = None
+            return
+        
+        try:
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+        except OSError as e:
+            logger.error(f"Failed to open queue journal: {e}")
+            self._file = None
+    
+    def close(self):
+        """Flush outstanding records and stop accepting new ones."""
+        self.flush()
+        
+        with self._lock:
+            self._closed = True
+        self._flush_requested.set()
+        
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,212 @@
+"""
+Pooling of long-lived YoutubeDL instances.
+
+This module provides a small pool of pre-initialized yt-dlp objects so
+that metadata extraction does not pay for extractor registration, opener
+and cookie jar construction on every call.
+"""
+
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled instance becomes available in time."""
+
+
+class _PooledInstance:
+    """Bookkeeping wrapper around a pooled object."""
+    
+    __slots__ = ('instance', 'created_at', 'uses')
+    
+    def __init__(self, instance: Any):
+        self.instance = instance
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class YoutubeDLPool:
+    """
+    Bounded pool of thread-confined YoutubeDL instances.
+    
+    An instance is handed to exactly one thread at a time through
+    acquire() and returned when the block exits. Instances are health
+    checked on checkout and recycled after a number of uses, after a
+    maximum age, or when a use raised an unexpected error.
+    """
+    
+    def __init__(self, factory: Callable[[], Any], max_size: int = 4, max_uses: int = 50,
+                 max_age: float = 3600.0, recoverable_errors: Tuple[Type[BaseException], ...] = ()):
+        """
+        Initialize YoutubeDL pool.
+        
+        Args:
+            factory: Callable creating a new configured YoutubeDL instance
+            max_size: Maximum number of instances alive at once
+            max_uses: Number of checkouts after which an instance is recycled
+            max_age: Age in seconds after which an instance is recycled
+            recoverable_errors: Exception types that leave an instance usable
+        """
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.max_uses = max(1, max_uses)
+        self.max_age = max_age
+        self._recoverable_errors = recoverable_errors
+        
+        self._idle: List[_PooledInstance] = []
+        self._size = 0
+        self._closed = False
+        
+        # Counters
+        self.created = 0
+        self.recycled = 0
+        
+        # Thread safety
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+    
+    def _is_healthy(self, pooled: _PooledInstance) -> bool:
+        """Check whether a pooled instance can be handed out again."""
+        if pooled.uses >= self.max_uses:
+            return False
+        if time.monotonic() - pooled.created_at >= self.max_age:
+            return False
+        return getattr(pooled.instance, 'params', None) is not None
+    
+    def _close_instance(self, pooled: _PooledInstance):
+        """Release resources held by an instance."""
+        instance = pooled.instance
+        try:
+            close = getattr(instance, 'close', None)
+            if close:
+                close()
+            else:
+                instance.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error closing pooled YoutubeDL instance: {e}")
+    
+    def _checkout(self, timeout: Optional[float]) -> _PooledInstance:
+        """Take a healthy idle instance or create a new one."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("YoutubeDL pool is closed")
+                
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if self._is_healthy(pooled):
+                        return pooled
+                    
+                    self._size -= 1
+                    self.recycled += 1
+                    self._close_instance(pooled)
+                
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError("Timed out waiting for a YoutubeDL instance")
+                self._available.wait(remaining)
+        
+        # Build the new instance outside the lock
+        try:
+            pooled = _PooledInstance(self._factory())
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._available.notify()
+            raise
+        
+        with self._lock:
+            self.created += 1
+        return pooled
+    
+    def _checkin(self, pooled: _PooledInstance, healthy: bool):
+        """Return an instance to the pool or retire it."""
+        with self._lock:
+            if healthy and not self._closed and self._is_healthy(pooled):
+                self._idle.append(pooled)
+            else:
+                self._size -= 1
+                self.recycled += 1
+                self._close_instance(pooled)
+            self._available.notify()
+    
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Check out an instance for the duration of a with block.
+        
+        Args:
+            timeout: Maximum time to wait for a free instance
+        
+        Yields:
+            YoutubeDL instance owned by the calling thread
+        """
+        pooled = self._checkout(timeout)
+        pooled.uses += 1
+        healthy = True
+        
+        try:
+            yield pooled.instance
+        except self._recoverable_errors:
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self._checkin(pooled, healthy)
+    
+    def prewarm(self, count: int = 1):
+        """
+        Create instances ahead of the first request.
+        
+        Args:
+            count: Number of idle instances to prepare
+        """
+        created = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                created.append(self._checkout(timeout=0))
+        except PoolTimeoutError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to prewarm YoutubeDL pool: {e}")
+        finally:
+            for pooled in created:
+                self._checkin(pooled, True)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get pool statistics.
+        
+        Returns:
+            Dictionary with instance counts
+        """
+        with self._lock:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'created': self.created,
+                'recycled': self.recycled,
+            }
+    
+    def close(self):
+        """Close all idle instances and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._available.notify_all()
+        
+        for pooled in idle:
+            self._close_instance(pooled)
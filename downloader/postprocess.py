@@ -0,0 +1,348 @@
+"""
+ffmpeg post-processing stage.
+
+This module runs the ffmpeg work that follows a download, such as audio
+extraction, as separate steps that can be scheduled on their own worker
+pool once the network transfer is done. ffmpeg progress is parsed from
+its -progress output and running jobs can be cancelled.
+"""
+
+import os
+import sys
+import threading
+import subprocess
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# ffmpeg encoder arguments, muxer arguments and file extension per target audio format
+_AUDIO_CODECS = {
+    'mp3': (['-c:a', 'libmp3lame'], [], 'mp3'),
+    'm4a': (['-c:a', 'aac'], ['-f', 'ipod'], 'm4a'),
+    'ogg': (['-c:a', 'libvorbis'], [], 'ogg'),
+    'wav': (['-c:a', 'pcm_s16le'], [], 'wav'),
+}
+
+# Source codecs each target container can hold without re-encoding
+_COPYABLE_CODECS = {
+    'mp3': ('mp3',),
+    'm4a': ('mp4a', 'aac'),
+    'ogg': ('opus', 'vorbis'),
+    'wav': (),
+}
+
+# Codecs without a bitrate setting
+_LOSSLESS_CODECS = ('wav',)
+
+
+class PostProcessingCancelled(Exception):
+    """Raised when a running ffmpeg job is cancelled."""
+
+
+class _FFmpegJob:
+    """
+    Running ffmpeg process with its progress and error output read in the background.
+    
+    Reading both pipes on their own threads keeps ffmpeg from blocking on
+    a full pipe while the caller is busy, e.g. feeding it input.
+    """
+    
+    def __init__(self, ffmpeg: str, args: List[str], duration: Optional[float] = None,
+                 progress_callback: Optional[Callable[[float], None]] = None, feed_stdin: bool = False):
+        """
+        Start ffmpeg.
+        
+        Args:
+            ffmpeg: ffmpeg executable
+            args: Arguments following the global options
+            duration: Media duration in seconds used to compute the percentage
+            progress_callback: Receives the percentage of the media processed
+            feed_stdin: Keep stdin open for input written by the caller
+        """
+        cmd = [ffmpeg, '-y', '-loglevel', 'error', '-nostats', '-progress', 'pipe:1'] + list(args)
+        creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+        
+        self.duration = duration
+        self.progress_callback = progress_callback
+        self.errors: List[bytes] = []
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if feed_stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=creationflags
+        )
+        
+        self._readers = [
+            threading.Thread(target=self._read_progress, daemon=True),
+            threading.Thread(target=lambda: self.errors.extend(self.process.stderr), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+    
+    def _read_progress(self):
+        """Parse the -progress output into percentages."""
+        for line in self.process.stdout:
+            key, _, value = line.decode('ascii', 'replace').strip().partition('=')
+            if key == 'out_time_us' and value.isdigit() and self.duration and self.progress_callback:
+                self.progress_callback(min(100.0, int(value) / 1e6 / self.duration * 100.0))
+    
+    def feed(self, data: bytes) -> bool:
+        """
+        Write input to ffmpeg's stdin.
+        
+        Args:
+            data: Next chunk of input
+        
+        Returns:
+            False if ffmpeg no longer accepts input
+        """
+        try:
+            self.process.stdin.write(data)
+            return True
+        except (BrokenPipeError, OSError):
+            return False
+    
+    def close_input(self):
+        """Signal the end of the input."""
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+    
+    def kill(self):
+        """Stop ffmpeg immediately."""
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+    
+    def finish(self, cancel_event: Optional[threading.Event] = None):
+        """
+        Wait for ffmpeg to exit.
+        
+        Args:
+            cancel_event: Optional event that terminates ffmpeg
+        
+        Raises:
+            PostProcessingCancelled: If cancel_event is set while ffmpeg runs
+            Exception: If ffmpeg fails
+        """
+        while True:
+            try:
+                self.process.wait(timeout=0.2)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    self.process.terminate()
+        
+        for reader in self._readers:
+            reader.join(timeout=5)
+        
+        if cancel_event is not None and cancel_event.is_set():
+            raise PostProcessingCancelled("Post-processing cancelled")
+        if self.process.returncode != 0:
+            message = b''.join(self.errors).decode('utf-8', 'replace').strip()
+            raise Exception(f"ffmpeg failed: {message}")
+
+
+def run_ffmpeg(ffmpeg: str, args: List[str], duration: Optional[float] = None,
+               cancel_event: Optional[threading.Event] = None,
+               progress_callback: Optional[Callable[[float], None]] = None):
+    """
+    Run ffmpeg, reporting progress and stopping it on cancellation.
+    
+    Args:
+        ffmpeg: ffmpeg executable
+        args: Arguments following the global options
+        duration: Media duration in seconds used to compute the percentage
+        cancel_event: Optional event that terminates ffmpeg
+        progress_callback: Receives the percentage of the media processed
+    
+    Raises:
+        PostProcessingCancelled: If cancel_event is set while ffmpeg runs
+        Exception: If ffmpeg fails
+    """
+    _FFmpegJob(ffmpeg, args, duration, progress_callback).finish(cancel_event)
+
+
+def build_audio_selector(codec: str) -> str:
+    """
+    Build a selector preferring audio streams the target format can copy.
+    
+    Args:
+        codec: Target audio format
+    
+    Returns:
+        yt-dlp format selector falling back to the best audio of any codec
+    """
+    selectors = [f"bestaudio[acodec^={source}]" for source in _COPYABLE_CODECS.get(codec, ())]
+    selectors += ['bestaudio', 'best']
+    return "/".join(selectors)
+
+
+def can_copy_audio(source_codec: Optional[str], codec: str) -> bool:
+    """
+    Check whether a source audio codec fits the target format as is.
+    
+    Args:
+        source_codec: yt-dlp acodec of the downloaded stream, e.g. 'mp4a.40.2'
+        codec: Target audio format
+    
+    Returns:
+        True if the audio can be stream-copied instead of transcoded
+    """
+    if not source_codec or source_codec == 'none':
+        return False
+    return source_codec.split('.')[0].lower() in _COPYABLE_CODECS.get(codec, ())
+
+
+def audio_output_path(source: Path, codec: str) -> Path:
+    """
+    Get the file audio extraction writes for a source file.
+    
+    Args:
+        source: Downloaded media file
+        codec: Target audio format
+    
+    Returns:
+        Source path with the extension of the target format
+    """
+    _, _, ext = _AUDIO_CODECS.get(codec, _AUDIO_CODECS['mp3'])
+    return Path(source).with_suffix(f".{ext}")
+
+
+def _audio_args(codec: str, quality: str, copy: bool) -> List[str]:
+    """Build the ffmpeg output arguments for a target audio format."""
+    encoder_args, muxer_args, _ = _AUDIO_CODECS.get(codec, _AUDIO_CODECS['mp3'])
+    
+    args = ['-vn']
+    if copy:
+        # Only the container changes
+        args += ['-c:a', 'copy']
+    else:
+        args += encoder_args
+        if codec not in _LOSSLESS_CODECS:
+            args += ['-b:a', f"{quality}k"]
+    return args + muxer_args
+
+
+def extract_audio(ffmpeg: str, source: Path, codec: str = 'mp3', quality: str = '192',
+                  source_codec: Optional[str] = None, keep_source: bool = False, overwrite: bool = False,
+                  duration: Optional[float] = None, cancel_event: Optional[threading.Event] = None,
+                  progress_callback: Optional[Callable[[float], None]] = None) -> Path:
+    """
+    Convert a downloaded file to an audio file.
+    
+    When the source codec already fits the target format the audio is
+    stream-copied into the target container; otherwise it is transcoded.
+    
+    Args:
+        ffmpeg: ffmpeg executable
+        source: Downloaded media file
+        codec: Target audio format (mp3, m4a, ogg or wav)
+        quality: Target bitrate in kbit/s for lossy formats
+        source_codec: yt-dlp acodec of the downloaded stream if known
+        keep_source: Keep the downloaded file after conversion
+        overwrite: Replace an existing audio file
+        duration: Media duration in seconds for progress reporting
+        cancel_event: Optional event that aborts the conversion
+        progress_callback: Receives the percentage converted
+    
+    Returns:
+        Path of the audio file
+    
+    Raises:
+        PostProcessingCancelled: If cancelled
+        Exception: If ffmpeg fails
+    """
+    source = Path(source)
+    output_path = audio_output_path(source, codec)
+    
+    copy = can_copy_audio(source_codec, codec)
+    
+    if output_path == source and copy:
+        logger.info(f"Audio is already in the target format: {output_path}")
+        return output_path
+    if output_path.exists() and output_path != source and not overwrite:
+        logger.info(f"Audio file already exists, skipping conversion: {output_path}")
+        return output_path
+    
+    args = ['-i', str(source)] + _audio_args(codec, quality, copy)
+    
+    temp_output = output_path.with_name(f"{output_path.stem}.temp{output_path.suffix}")
+    try:
+        run_ffmpeg(ffmpeg, args + [str(temp_output)], duration, cancel_event, progress_callback)
+    except Exception:
+        if temp_output.exists():
+            temp_output.unlink()
+        raise
+    
+    os.replace(temp_output, output_path)
+    
+    if not keep_source and source != output_path:
+        try:
+            source.unlink()
+        except OSError as e:
+            logger.warning(f"Failed to remove source file {source}: {e}")
+    
+    logger.info(f"{'Remuxed' if copy else 'Transcoded'} audio to {output_path}")
+    return output_path
+
+
+def transcode_stream(ffmpeg: str, chunks: Iterable[bytes], output_path: Path, codec: str = 'mp3',
+                     quality: str = '192', duration: Optional[float] = None,
+                     cancel_event: Optional[threading.Event] = None,
+                     progress_callback: Optional[Callable[[float], None]] = None) -> Path:
+    """
+    Convert audio fed to ffmpeg's stdin while it is still downloading.
+    
+    The source never touches the disk and conversion overlaps the
+    transfer. Any error raised while iterating the chunks stops ffmpeg
+    and is re-raised.
+    
+    Args:
+        ffmpeg: ffmpeg executable
+        chunks: Source data in download order
+        output_path: Audio file to write
+        codec: Target audio format (mp3, m4a, ogg or wav)
+        quality: Target bitrate in kbit/s for lossy formats
+        duration: Media duration in seconds for progress reporting
+        cancel_event: Optional event that aborts the conversion
+        progress_callback: Receives the percentage converted
+    
+    Returns:
+        Path of the audio file
+    
+    Raises:
+        PostProcessingCancelled: If cancelled
+        Exception: If ffmpeg fails
+    """
+    output_path = Path(output_path)
+    temp_output = output_path.with_name(f"{output_path.stem}.temp{output_path.suffix}")
+    args = ['-i', 'pipe:0'] + _audio_args(codec, quality, copy=False) + [str(temp_output)]
+    
+    job = _FFmpegJob(ffmpeg, args, duration, progress_callback, feed_stdin=True)
+    try:
+        for chunk in chunks:
+            if not job.feed(chunk):
+                # ffmpeg exited early; finish() reports its error output
+                break
+        job.close_input()
+        job.finish(cancel_event)
+    except BaseException:
+        job.kill()
+        if temp_output.exists():
+            temp_output.unlink()
+        raise
+    finally:
+        # Release the connection when the input is abandoned
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+    
+    os.replace(temp_output, output_path)
+    logger.info(f"Transcoded streamed audio to {output_path}")
+    return output_path
@@ -5,19 +5,26 @@ This module provides centralized tracking of download progress,
 statistics aggregation, and event-based notifications for the GUI.
 """
 
+import time
 import threading
 import logging
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import deque
+from itertools import chain
 from enum import Enum
 
-from .validation import ProgressInfo, ProgressStatus
+from .validation import ProgressInfo, ProgressRecord, ProgressStatus
 
 logger = logging.getLogger(__name__)
 
 
+def _as_info(progress: Union[ProgressInfo, ProgressRecord]) -> ProgressInfo:
+    """Get the progress model of a record or model."""
+    return progress.to_info() if isinstance(progress, ProgressRecord) else progress
+
+
 class ProgressEventType(str, Enum):
     """Types of progress events."""
     STARTED = "started"
@@ -64,31 +71,392 @@ class ProgressStatistics:
         self.session_duration = datetime.now() - self.session_start_time
 
 
+class _HistoryPoint:
+    """Compact snapshot of one progress update."""
+    
+    __slots__ = ('timestamp', 'status', 'percentage', 'downloaded_bytes', 'total_bytes', 'speed', 'eta')
+    
+    def __init__(self, progress: ProgressInfo):
+        self.timestamp = progress.updated_at.timestamp()
+        self.status = progress.status
+        self.percentage = progress.percentage
+        self.downloaded_bytes = progress.downloaded_bytes
+        self.total_bytes = progress.total_bytes or progress.total_bytes_estimate
+        self.speed = progress.speed
+        self.eta = progress.eta
+    
+    def to_progress(self, request_id: str) -> ProgressInfo:
+        """Rebuild the progress model of this point."""
+        return ProgressInfo(
+            request_id=request_id,
+            status=self.status,
+            percentage=self.percentage,
+            downloaded_bytes=self.downloaded_bytes,
+            total_bytes=self.total_bytes,
+            speed=self.speed,
+            eta=self.eta,
+            updated_at=datetime.fromtimestamp(self.timestamp)
+        )
+
+
+class ProgressHistory:
+    """
+    Fixed-size progress history of a single download.
+    
+    The latest updates are kept in full in a ring buffer. Points that fall
+    out of it are downsampled into a second ring buffer, so the history
+    still covers the start of a long download while its memory use stays
+    constant however many updates arrive.
+    """
+    
+    def __init__(self, recent_size: int = 256, archive_size: int = 256, downsample: int = 8):
+        """
+        Initialize the history.
+        
+        Args:
+            recent_size: Number of latest updates kept in full
+            archive_size: Number of older, downsampled points kept (0 to drop them)
+            downsample: Keep every n-th point that leaves the recent buffer
+        """
+        self._recent = deque(maxlen=max(1, recent_size))
+        self._archive = deque(maxlen=archive_size) if archive_size > 0 else None
+        self._downsample = max(1, downsample)
+        self._evicted = 0
+    
+    def append(self, progress: ProgressInfo):
+        """
+        Record a progress update.
+        
+        Args:
+            progress: Progress information to record
+        """
+        if len(self._recent) == self._recent.maxlen:
+            if self._archive is not None and self._evicted % self._downsample == 0:
+                self._archive.append(self._recent[0])
+            self._evicted += 1
+        self._recent.append(_HistoryPoint(progress))
+    
+    def __len__(self) -> int:
+        return len(self._recent) + (len(self._archive) if self._archive is not None else 0)
+    
+    def __iter__(self):
+        return chain(self._archive or (), self._recent)
+
+
+class SpeedEstimator:
+    """
+    Download speed estimate of a single download.
+    
+    Samples of the downloaded byte count are kept in a time window backed
+    by a deque, so old samples are dropped in amortized constant time. The
+    speed is an exponentially weighted moving average of the rate between
+    samples, weighted by the time each rate was observed. Its spread gives
+    a confidence for the ETA.
+    """
+    
+    def __init__(self, window: float = 10.0, half_life: float = 3.0):
+        """
+        Initialize the estimator.
+        
+        Args:
+            window: Seconds of samples used for the windowed average speed
+            half_life: Seconds after which a rate has lost half of its weight
+        """
+        self.window = window
+        self.half_life = max(0.001, half_life)
+        self._samples = deque()  # (monotonic time, downloaded bytes)
+        self._mean: Optional[float] = None
+        self._variance = 0.0
+    
+    def add(self, downloaded_bytes: int, timestamp: Optional[float] = None):
+        """
+        Record the downloaded byte count.
+        
+        Args:
+            downloaded_bytes: Bytes downloaded so far
+            timestamp: Monotonic time of the sample, defaults to now
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        samples = self._samples
+        
+        if samples:
+            last_time, last_bytes = samples[-1]
+            if downloaded_bytes < last_bytes:
+                # The transfer started over, e.g. with the next stream
+                self.reset()
+            elif now > last_time:
+                self._add_rate((downloaded_bytes - last_bytes) / (now - last_time), now - last_time)
+        
+        samples.append((now, downloaded_bytes))
+        
+        # Drop samples older than the window, keeping one as its start
+        cutoff = now - self.window
+        while len(samples) > 2 and samples[1][0] <= cutoff:
+            samples.popleft()
+    
+    def _add_rate(self, rate: float, duration: float):
+        """Fold a rate observed for a duration into the moving average and variance."""
+        if self._mean is None:
+            self._mean = rate
+            return
+        
+        alpha = 1.0 - 0.5 ** (duration / self.half_life)
+        difference = rate - self._mean
+        self._mean += alpha * difference
+        self._variance = (1.0 - alpha) * (self._variance + alpha * difference * difference)
+    
+    def reset(self):
+        """Forget all samples."""
+        self._samples.clear()
+        self._mean = None
+        self._variance = 0.0
+    
+    @property
+    def speed(self) -> Optional[float]:
+        """Smoothed speed in bytes per second, or None before two samples."""
+        return self._mean
+    
+    @property
+    def window_speed(self) -> Optional[float]:
+        """Average speed over the sample window in bytes per second."""
+        if len(self._samples) < 2:
+            return None
+        (first_time, first_bytes), (last_time, last_bytes) = self._samples[0], self._samples[-1]
+        if last_time <= first_time:
+            return None
+        return (last_bytes - first_bytes) / (last_time - first_time)
+    
+    def eta(self, remaining_bytes: int) -> Optional[int]:
+        """
+        Estimate the time left for the remaining bytes.
+        
+        Args:
+            remaining_bytes: Bytes still to download
+        
+        Returns:
+            Seconds left, or None without a usable speed
+        """
+        if not self._mean or self._mean <= 0:
+            return None
+        return int(max(0, remaining_bytes) / self._mean)
+    
+    def confidence(self) -> float:
+        """
+        Get how much the ETA can be trusted.
+        
+        Returns:
+            0.0 to 1.0; low while few samples cover little time or while
+            the speed fluctuates strongly
+        """
+        if not self._mean or self._mean <= 0 or len(self._samples) < 2:
+            return 0.0
+        
+        variation = self._variance ** 0.5 / self._mean
+        coverage = min(1.0, (self._samples[-1][0] - self._samples[0][0]) / self.window)
+        return coverage / (1.0 + variation)
+
+
+class ProgressEventDispatcher:
+    """
+    Coalescing, rate-limited delivery of progress events.
+    
+    Updates of a download that arrive within one frame are merged so
+    only its latest state is delivered. Events are delivered on a
+    dedicated thread at the configured frame rate; urgent events such as
+    status changes wake it immediately. Listeners therefore never run on
+    the thread that published the event.
+    """
+    
+    def __init__(self, get_listeners: Callable[[], List[Callable[[ProgressEvent], None]]], rate: float = 10.0):
+        """
+        Initialize the dispatcher.
+        
+        Args:
+            get_listeners: Returns the listeners to deliver events to
+            rate: Maximum number of deliveries per second
+        """
+        self._get_listeners = get_listeners
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        
+        # Sequence number and event per queued entry, keyed by request ID for
+        # coalescable updates and by sequence number for urgent events
+        self._updates: Dict[str, tuple] = {}
+        self._urgent: Dict[int, tuple] = {}
+        self._sequence = 0
+        self._urgent_pending = False
+        self._delivering = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+    
+    def publish(self, event: ProgressEvent, urgent: bool = False):
+        """
+        Queue an event for delivery.
+        
+        Args:
+            event: Progress event to deliver
+            urgent: Deliver without waiting for the next frame and without
+                merging it with other events
+        """
+        with self._lock:
+            self._sequence += 1
+            pending = self._updates.pop(event.request_id, None)
+            
+            if urgent:
+                # A queued update is older than the new state and is dropped
+                self._urgent[self._sequence] = (self._sequence, event)
+                self._urgent_pending = True
+            else:
+                if pending is not None:
+                    event = self._merge(pending[1], event)
+                self._updates[event.request_id] = (self._sequence, event)
+            
+            self._closed = False
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="progress-events", daemon=True)
+                self._thread.start()
+            
+            # An idle delivery thread waits without a timeout
+            if urgent or len(self._updates) == 1 and pending is None:
+                self._changed.notify_all()
+    
+    @staticmethod
+    def _merge(previous: ProgressEvent, current: ProgressEvent) -> ProgressEvent:
+        """Merge two updates of a download into one carrying the latest state."""
+        if current.event_type == ProgressEventType.UPDATED:
+            current.event_type = previous.event_type
+        current.data = {**previous.data, **current.data}
+        return current
+    
+    def _take(self) -> List[ProgressEvent]:
+        """Remove all queued events in the order they were published."""
+        entries = list(self._updates.values()) + list(self._urgent.values())
+        self._updates = {}
+        self._urgent = {}
+        self._urgent_pending = False
+        entries.sort(key=lambda entry: entry[0])
+        return [event for _, event in entries]
+    
+    def _run(self):
+        """Deliver queued events once per frame until closed."""
+        next_frame = time.monotonic()
+        while True:
+            with self._lock:
+                while not self._closed and not self._urgent_pending:
+                    timeout = next_frame - time.monotonic()
+                    if timeout <= 0 and self._updates:
+                        break
+                    self._changed.wait(timeout if timeout > 0 else None)
+                
+                events = self._take()
+                if not events and self._closed:
+                    self._thread = None
+                    self._changed.notify_all()
+                    return
+                self._delivering = True
+            
+            try:
+                self._deliver(events)
+            finally:
+                with self._lock:
+                    self._delivering = False
+                    self._changed.notify_all()
+            next_frame = time.monotonic() + self._interval
+    
+    def _deliver(self, events: List[ProgressEvent]):
+        """Pass events to every listener."""
+        listeners = self._get_listeners()
+        for event in events:
+            # Records become models here, once per delivered event
+            event.progress = _as_info(event.progress)
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    logger.error(f"Error in progress event listener: {e}")
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Deliver queued events now and wait until they have been delivered.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            True if all events were delivered, False on timeout
+        """
+        with self._lock:
+            if self._updates:
+                self._urgent_pending = True
+                self._changed.notify_all()
+            return self._changed.wait_for(
+                lambda: not self._updates and not self._urgent and not self._delivering,
+                timeout=timeout
+            )
+    
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        Deliver the remaining events and stop the delivery thread.
+        
+        Args:
+            timeout: Maximum time to wait for the thread in seconds
+        """
+        with self._lock:
+            thread = self._thread
+            self._closed = True
+            self._changed.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+
 class ProgressManager:
     """
     Centralized progress monitoring and management system.
     
     Tracks multiple download progress, provides statistics,
-    and handles event-based notifications for the GUI.
+    and handles event-based notifications for the GUI. Progress can be
+    passed as a ProgressRecord, which is only converted to a ProgressInfo
+    when it is read or an event carrying it is delivered.
     """
     
-    def __init__(self):
-        """Initialize progress manager."""
-        self.active_progress: Dict[str, ProgressInfo] = {}
-        self.progress_history: Dict[str, List[ProgressInfo]] = defaultdict(list)
+    def __init__(self, history_size: int = 256, history_archive_size: int = 256, history_downsample: int = 8,
+                 speed_window: float = 10.0, speed_half_life: float = 3.0, event_rate: float = 10.0):
+        """
+        Initialize progress manager.
+        
+        Args:
+            history_size: Latest updates kept in full per download
+            history_archive_size: Older, downsampled points kept per download
+            history_downsample: Keep every n-th of the older points
+            speed_window: Seconds of samples used for speed calculation
+            speed_half_life: Half-life in seconds of the smoothed speed
+            event_rate: Maximum number of event deliveries per second
+        """
+        self.active_progress: Dict[str, Union[ProgressInfo, ProgressRecord]] = {}
+        self.progress_history: Dict[str, ProgressHistory] = {}
+        self._history_settings = (history_size, history_archive_size, history_downsample)
         self.event_listeners: List[Callable[[ProgressEvent], None]] = []
+        self._dispatcher = ProgressEventDispatcher(lambda: list(self.event_listeners), rate=event_rate)
         self.statistics = ProgressStatistics()
         
+        # Running sums behind the statistics and each download's share of them
+        self._contributions: Dict[str, tuple] = {}
+        self._speed_sum = 0.0
+        self._speed_count = 0
+        
         # Thread safety
         self._lock = threading.RLock()
         
         # Speed tracking
-        self._speed_history: Dict[str, List[tuple]] = defaultdict(list)  # (timestamp, bytes)
-        self._speed_window = 10  # seconds for speed calculation
+        self._speed_estimators: Dict[str, SpeedEstimator] = {}
+        self._speed_settings = (speed_window, speed_half_life)
         
         logger.info("Progress manager initialized")
     
-    def register_progress(self, request_id: str, initial_progress: Optional[ProgressInfo] = None):
+    def register_progress(self, request_id: str,
+                          initial_progress: Optional[Union[ProgressInfo, ProgressRecord]] = None):
         """
         Register a new download for progress tracking.
         
@@ -104,12 +472,14 @@ class ProgressManager:
                 )
             
             self.active_progress[request_id] = initial_progress
-            self.progress_history[request_id] = [initial_progress]
+            history = ProgressHistory(*self._history_settings)
+            history.append(initial_progress)
+            self.progress_history[request_id] = history
             
             # Update statistics
             self.statistics.total_downloads += 1
             self.statistics.active_downloads += 1
-            self._update_statistics()
+            self._update_statistics(request_id, initial_progress)
             
             # Fire event
             event = ProgressEvent(
@@ -117,17 +487,18 @@ class ProgressManager:
                 request_id=request_id,
                 progress=initial_progress
             )
-            self._fire_event(event)
+            self._fire_event(event, urgent=True)
             
             logger.info(f"Registered progress tracking for: {request_id}")
     
-    def update_progress(self, request_id: str, progress: ProgressInfo):
+    def update_progress(self, request_id: str, progress: Union[ProgressInfo, ProgressRecord]):
         """
         Update progress for a download.
         
         Args:
             request_id: Download identifier
-            progress: Updated progress information
+            progress: Updated progress information; a record must not be
+                changed after it has been passed in
         """
         with self._lock:
             if request_id not in self.active_progress:
@@ -135,65 +506,100 @@ class ProgressManager:
                 return
             
             previous_progress = self.active_progress[request_id]
+            
+            # Update speed tracking (the caller's object is left as is)
+            progress = self._update_speed_tracking(request_id, progress)
+            
             self.active_progress[request_id] = progress
             self.progress_history[request_id].append(progress)
             
-            # Update speed tracking
-            self._update_speed_tracking(request_id, progress)
-            
             # Update statistics
-            self._update_statistics()
+            self._update_statistics(request_id, progress)
             
             # Determine event type
             event_type = self._determine_event_type(previous_progress, progress)
             
             # Fire appropriate events
+            data = self._get_event_data(previous_progress, progress)
+            estimator = self._speed_estimators.get(request_id)
+            if estimator is not None:
+                data['eta_confidence'] = estimator.confidence()
             event = ProgressEvent(
                 event_type=event_type,
                 request_id=request_id,
                 progress=progress,
-                data=self._get_event_data(previous_progress, progress)
+                data=data
             )
-            self._fire_event(event)
+            self._fire_event(event, urgent=previous_progress.status != progress.status)
             
-            # Handle completion/failure
-            if progress.status in [ProgressStatus.COMPLETED, ProgressStatus.FAILED, ProgressStatus.CANCELLED]:
+            # Handle completion/failure (only on the transition into a final state)
+            final_states = [ProgressStatus.COMPLETED, ProgressStatus.FAILED, ProgressStatus.CANCELLED]
+            if progress.status in final_states and previous_progress.status not in final_states:
                 self._handle_download_completion(request_id, progress)
     
-    def _update_speed_tracking(self, request_id: str, progress: ProgressInfo):
+    def _update_speed_tracking(self, request_id: str, progress: Union[ProgressInfo, ProgressRecord]
+                               ) -> Union[ProgressInfo, ProgressRecord]:
         """
-        Update speed tracking history for a download.
+        Feed a progress update to the download's speed estimator.
         
         Args:
             request_id: Download identifier
             progress: Current progress information
+        
+        Returns:
+            The progress itself, or a copy with the estimated speed and ETA
+            when it reports none or a speed far off the estimate
         """
-        now = datetime.now()
-        speed_history = self._speed_history[request_id]
-        
-        # Add current data point
-        speed_history.append((now, progress.downloaded_bytes))
-        
-        # Clean old data points (keep only last 'speed_window' seconds)
-        cutoff_time = now - timedelta(seconds=self._speed_window)
-        self._speed_history[request_id] = [
-            (timestamp, bytes_downloaded) 
-            for timestamp, bytes_downloaded in speed_history
-            if timestamp > cutoff_time
-        ]
-        
-        # Calculate current speed if we have enough data points
-        if len(speed_history) >= 2:
-            recent_points = self._speed_history[request_id][-5:]  # Last 5 points
-            if len(recent_points) >= 2:
-                time_diff = (recent_points[-1][0] - recent_points[0][0]).total_seconds()
-                bytes_diff = recent_points[-1][1] - recent_points[0][1]
-                
-                if time_diff > 0:
-                    calculated_speed = bytes_diff / time_diff
-                    # Update progress with calculated speed if not provided
-                    if progress.speed is None or abs(progress.speed - calculated_speed) > progress.speed * 0.5:
-                        progress.speed = calculated_speed
+        estimator = self._speed_estimators.get(request_id)
+        if estimator is None:
+            estimator = SpeedEstimator(*self._speed_settings)
+            self._speed_estimators[request_id] = estimator
+        estimator.add(progress.downloaded_bytes)
+        
+        estimated_speed = estimator.speed
+        if estimated_speed is None:
+            return progress
+        
+        updates = {}
+        if progress.speed is None or abs(progress.speed - estimated_speed) > progress.speed * 0.5:
+            updates['speed'] = max(0.0, estimated_speed)
+        
+        total = progress.total_bytes or progress.total_bytes_estimate
+        if progress.eta is None and total:
+            eta = estimator.eta(total - progress.downloaded_bytes)
+            if eta is not None:
+                updates['eta'] = eta
+        
+        if not updates:
+            return progress
+        if isinstance(progress, ProgressRecord):
+            return progress.copy().update(updated_at=progress.updated_at, **updates)
+        return progress.copy(update=updates)
+    
+    def get_speed_estimate(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the smoothed speed, ETA and ETA confidence of a download.
+        
+        Args:
+            request_id: Download identifier
+        
+        Returns:
+            Dictionary with 'speed', 'window_speed', 'eta' and
+            'eta_confidence', or None if no samples have been recorded
+        """
+        with self._lock:
+            estimator = self._speed_estimators.get(request_id)
+            progress = self.active_progress.get(request_id)
+            if estimator is None or progress is None:
+                return None
+            
+            total = progress.total_bytes or progress.total_bytes_estimate
+            return {
+                'speed': estimator.speed,
+                'window_speed': estimator.window_speed,
+                'eta': estimator.eta(total - progress.downloaded_bytes) if total else None,
+                'eta_confidence': estimator.confidence(),
+            }
     
     def _determine_event_type(self, previous: ProgressInfo, current: ProgressInfo) -> ProgressEventType:
         """
@@ -287,70 +693,113 @@ class ProgressManager:
         self.statistics.active_downloads = max(0, self.statistics.active_downloads - 1)
         
         # Clean up speed tracking
-        if request_id in self._speed_history:
-            del self._speed_history[request_id]
+        self._speed_estimators.pop(request_id, None)
         
         logger.info(f"Download completed with status {progress.status}: {request_id}")
     
-    def _update_statistics(self):
-        """Update aggregated statistics."""
+    @staticmethod
+    def _contribution(progress: ProgressInfo) -> tuple:
+        """
+        Get what a download adds to the aggregated statistics.
+        
+        Args:
+            progress: Progress of the download
+        
+        Returns:
+            Tuple of downloaded bytes, expected total bytes and speed
+            (0.0 when the speed is unknown)
+        """
+        speed = progress.speed if progress.speed and progress.speed > 0 else 0.0
+        return (
+            progress.downloaded_bytes,
+            progress.total_bytes or progress.total_bytes_estimate or 0,
+            speed
+        )
+    
+    def _update_statistics(self, request_id: str, progress: Optional[ProgressInfo]):
+        """
+        Update aggregated statistics with the change of one download.
+        
+        The running sums are adjusted by the difference between the
+        download's previous and current contribution, so the cost does not
+        depend on the number of tracked downloads.
+        
+        Args:
+            request_id: Download identifier
+            progress: Current progress, or None if the download is no longer tracked
+        """
         with self._lock:
-            # Reset calculated fields
-            self.statistics.total_bytes_downloaded = 0
-            self.statistics.total_bytes_to_download = 0
-            speeds = []
+            old_downloaded, old_total, old_speed = self._contributions.pop(request_id, (0, 0, 0.0))
+            new_downloaded, new_total, new_speed = (0, 0, 0.0)
+            if progress is not None:
+                new_downloaded, new_total, new_speed = self._contribution(progress)
+                self._contributions[request_id] = (new_downloaded, new_total, new_speed)
             
-            # Aggregate data from active downloads
-            for progress in self.active_progress.values():
-                self.statistics.total_bytes_downloaded += progress.downloaded_bytes
-                
-                if progress.total_bytes:
-                    self.statistics.total_bytes_to_download += progress.total_bytes
-                elif progress.total_bytes_estimate:
-                    self.statistics.total_bytes_to_download += progress.total_bytes_estimate
-                
-                if progress.speed and progress.speed > 0:
-                    speeds.append(progress.speed)
+            self.statistics.total_bytes_downloaded += new_downloaded - old_downloaded
+            self.statistics.total_bytes_to_download += new_total - old_total
             
-            # Calculate overall progress
-            if self.statistics.total_bytes_to_download > 0:
-                self.statistics.overall_progress = (
-                    self.statistics.total_bytes_downloaded / 
-                    self.statistics.total_bytes_to_download
-                ) * 100.0
+            self._speed_count += (new_speed > 0) - (old_speed > 0)
+            if self._speed_count:
+                self._speed_sum += new_speed - old_speed
             else:
-                self.statistics.overall_progress = 0.0
+                # Start from an exact zero instead of accumulated rounding errors
+                self._speed_sum = 0.0
             
-            # Calculate average and peak speeds
-            if speeds:
-                self.statistics.average_speed = sum(speeds) / len(speeds)
-                self.statistics.peak_speed = max(self.statistics.peak_speed, max(speeds))
-                
-                # Estimate remaining time
-                remaining_bytes = self.statistics.total_bytes_to_download - self.statistics.total_bytes_downloaded
-                if remaining_bytes > 0 and self.statistics.average_speed > 0:
-                    self.statistics.estimated_time_remaining = int(remaining_bytes / self.statistics.average_speed)
-                else:
-                    self.statistics.estimated_time_remaining = 0
+            self._update_derived_statistics()
+            self.statistics.peak_speed = max(self.statistics.peak_speed, new_speed)
+    
+    def _update_derived_statistics(self):
+        """Recompute the statistics derived from the running sums."""
+        statistics = self.statistics
+        
+        # Calculate overall progress
+        if statistics.total_bytes_to_download > 0:
+            statistics.overall_progress = (
+                statistics.total_bytes_downloaded /
+                statistics.total_bytes_to_download
+            ) * 100.0
+        else:
+            statistics.overall_progress = 0.0
+        
+        # Calculate average speed and estimate remaining time
+        if self._speed_count:
+            statistics.average_speed = self._speed_sum / self._speed_count
+            remaining_bytes = statistics.total_bytes_to_download - statistics.total_bytes_downloaded
+            if remaining_bytes > 0 and statistics.average_speed > 0:
+                statistics.estimated_time_remaining = int(remaining_bytes / statistics.average_speed)
             else:
-                self.statistics.average_speed = 0.0
-                self.statistics.estimated_time_remaining = 0
-            
-            # Update session duration
-            self.statistics.update_session_duration()
+                statistics.estimated_time_remaining = 0
+        else:
+            statistics.average_speed = 0.0
+            statistics.estimated_time_remaining = 0
+        
+        # Update session duration
+        statistics.update_session_duration()
     
-    def _fire_event(self, event: ProgressEvent):
+    def _fire_event(self, event: ProgressEvent, urgent: bool = False):
         """
-        Fire progress event to all registered listeners.
+        Queue progress event for delivery to all registered listeners.
+        
+        Listeners are called on the dispatcher thread, never while the
+        manager's lock is held.
         
         Args:
             event: Progress event to fire
+            urgent: Deliver immediately, e.g. for status changes
         """
-        for listener in self.event_listeners:
-            try:
-                listener(event)
-            except Exception as e:
-                logger.error(f"Error in progress event listener: {e}")
+        self._dispatcher.publish(event, urgent)
+    
+    def flush_events(self, timeout: Optional[float] = None) -> bool:
+        """
+        Deliver all queued progress events now.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            True if all events were delivered, False on timeout
+        """
+        return self._dispatcher.flush(timeout)
     
     def add_event_listener(self, listener: Callable[[ProgressEvent], None]):
         """
@@ -385,7 +834,8 @@ class ProgressManager:
             Current progress or None if not found
         """
         with self._lock:
-            return self.active_progress.get(request_id)
+            progress = self.active_progress.get(request_id)
+        return _as_info(progress) if progress is not None else None
     
     def get_all_progress(self) -> Dict[str, ProgressInfo]:
         """
@@ -395,7 +845,8 @@ class ProgressManager:
             Dictionary mapping request IDs to progress info
         """
         with self._lock:
-            return self.active_progress.copy()
+            progress = self.active_progress.copy()
+        return {request_id: _as_info(info) for request_id, info in progress.items()}
     
     def get_progress_history(self, request_id: str) -> List[ProgressInfo]:
         """
@@ -405,10 +856,15 @@ class ProgressManager:
             request_id: Download identifier
             
         Returns:
-            List of progress updates in chronological order
+            List of progress updates in chronological order; older
+            updates are downsampled
         """
         with self._lock:
-            return self.progress_history.get(request_id, []).copy()
+            history = self.progress_history.get(request_id)
+            points = list(history) if history is not None else []
+        
+        # Models are only built on request, outside the lock
+        return [point.to_progress(request_id) for point in points]
     
     def get_statistics(self) -> ProgressStatistics:
         """
@@ -461,10 +917,11 @@ class ProgressManager:
                 # Only remove if completed/failed/cancelled
                 if progress.status in [ProgressStatus.COMPLETED, ProgressStatus.FAILED, ProgressStatus.CANCELLED]:
                     del self.active_progress[request_id]
+                    self.progress_history.pop(request_id, None)
+                    self._update_statistics(request_id, None)
                     
                     # Clean up speed tracking
-                    if request_id in self._speed_history:
-                        del self._speed_history[request_id]
+                    self._speed_estimators.pop(request_id, None)
                     
                     logger.info(f"Unregistered progress tracking for: {request_id}")
                 else:
@@ -488,12 +945,16 @@ class ProgressManager:
         with self._lock:
             self.active_progress.clear()
             self.progress_history.clear()
-            self._speed_history.clear()
+            self._speed_estimators.clear()
+            self._contributions.clear()
+            self._speed_sum = 0.0
+            self._speed_count = 0
             self.statistics = ProgressStatistics()
             
             logger.info("Reset all progress statistics and tracking data")
     
     def cleanup(self):
         """Clean up progress manager resources."""
+        self._dispatcher.close()
         self.reset_statistics()
         logger.info("Progress manager cleanup completed")
\ No newline at end of file
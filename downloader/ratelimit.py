@@ -0,0 +1,245 @@
+"""
+Global bandwidth limiting.
+
+This module provides a token-bucket limiter shared by all running
+downloads. Every job is guaranteed an equal share of the configured rate
+and may borrow bandwidth left unused by the others, so the total stays
+under the cap however many downloads are active. The cap can follow a
+time-of-day schedule.
+"""
+
+import time
+import threading
+import logging
+from datetime import datetime, time as dt_time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+    
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+    
+    def __init__(self, rate: float, burst_seconds: float):
+        self.rate = rate
+        self.capacity = max(rate * burst_seconds, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def refill(self, now: float):
+        """Add the tokens accumulated since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def set_rate(self, rate: float, burst_seconds: float):
+        """Change the refill rate, keeping the current fill level."""
+        self.rate = rate
+        self.capacity = max(rate * burst_seconds, 1.0)
+        self.tokens = min(self.tokens, self.capacity)
+    
+    def time_until(self, amount: float) -> float:
+        """Seconds until the bucket holds the given amount."""
+        if self.tokens >= amount or self.rate <= 0:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+def _parse_time(value: str) -> dt_time:
+    """Parse an HH:MM time of day."""
+    hours, minutes = value.split(':')
+    return dt_time(int(hours), int(minutes))
+
+
+class BandwidthLimiter:
+    """
+    Hierarchical token bucket shared by concurrent downloads.
+    
+    A parent bucket enforces the global rate. Each registered job has a
+    child bucket refilled at its fair share (rate divided by the number of
+    jobs), which is rebalanced whenever a job starts or finishes. A job
+    spends its own tokens first and borrows from the parent only when the
+    parent has tokens to spare and the job is not in debt itself.
+    """
+    
+    def __init__(self, rate: float = 0, burst_seconds: float = 1.0,
+                 schedule: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize bandwidth limiter.
+        
+        Args:
+            rate: Global limit in bytes per second (0 for unlimited)
+            burst_seconds: Bucket depth expressed in seconds of traffic
+            schedule: Optional time-of-day rules, see set_schedule()
+        """
+        self.burst_seconds = burst_seconds
+        self._base_rate = max(0.0, float(rate))
+        self._schedule: List[Dict[str, Any]] = []
+        self._rate = 0.0
+        self._next_schedule_check = 0.0
+        
+        self._global = _TokenBucket(0.0, burst_seconds)
+        self._jobs: Dict[str, _TokenBucket] = {}
+        
+        # Thread safety
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        
+        self.set_schedule(schedule or [])
+    
+    @property
+    def rate(self) -> float:
+        """Limit in effect right now in bytes per second (0 for unlimited)."""
+        return self._rate
+    
+    def set_rate(self, rate: float):
+        """
+        Change the base limit at runtime.
+        
+        Args:
+            rate: Global limit in bytes per second (0 for unlimited)
+        """
+        with self._lock:
+            self._base_rate = max(0.0, float(rate))
+            self._apply_rate(self._scheduled_rate())
+    
+    def set_schedule(self, schedule: List[Dict[str, Any]]):
+        """
+        Replace the time-of-day rules.
+        
+        Each rule has 'start' and 'end' times as HH:MM and a 'rate' in
+        bytes per second (0 for unlimited). Rules may wrap past midnight.
+        The first matching rule wins; outside all rules the base limit
+        applies.
+        
+        Args:
+            schedule: List of rule dictionaries
+        """
+        rules = []
+        for rule in schedule:
+            try:
+                rules.append({
+                    'start': _parse_time(rule['start']),
+                    'end': _parse_time(rule['end']),
+                    'rate': max(0.0, float(rule.get('rate', 0)))
+                })
+            except (KeyError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring invalid bandwidth schedule rule {rule}: {e}")
+        
+        with self._lock:
+            self._schedule = rules
+            self._apply_rate(self._scheduled_rate())
+    
+    def _scheduled_rate(self, now: Optional[datetime] = None) -> float:
+        """Get the rate the schedule prescribes for the given time."""
+        current = (now or datetime.now()).time()
+        
+        for rule in self._schedule:
+            start, end = rule['start'], rule['end']
+            if start <= end:
+                active = start <= current < end
+            else:
+                active = current >= start or current < end
+            if active:
+                return rule['rate']
+        
+        return self._base_rate
+    
+    def _apply_rate(self, rate: float):
+        """Switch to a new global rate and rebalance the job shares. Must hold _lock."""
+        self._next_schedule_check = time.monotonic() + 30.0
+        if rate == self._rate:
+            return
+        
+        logger.info(f"Bandwidth limit set to {rate / 1024:.0f} KB/s" if rate else "Bandwidth limit disabled")
+        self._rate = rate
+        self._global.set_rate(rate, self.burst_seconds)
+        self._rebalance()
+    
+    def _rebalance(self):
+        """Give every registered job an equal share of the rate. Must hold _lock."""
+        if self._jobs:
+            share = self._rate / len(self._jobs)
+            for bucket in self._jobs.values():
+                bucket.set_rate(share, self.burst_seconds)
+        self._changed.notify_all()
+    
+    def register(self, job_id: str):
+        """
+        Add a job to the fair-share pool.
+        
+        Args:
+            job_id: Identifier of the download
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                self._jobs[job_id] = _TokenBucket(0.0, self.burst_seconds)
+                self._rebalance()
+    
+    def unregister(self, job_id: str):
+        """
+        Remove a job and wake it if it is waiting for bandwidth.
+        
+        Args:
+            job_id: Identifier of the download
+        """
+        with self._lock:
+            if self._jobs.pop(job_id, None) is not None:
+                self._rebalance()
+    
+    def consume(self, job_id: str, amount: int):
+        """
+        Account for transferred bytes, blocking while the job is over its budget.
+        
+        Chunks larger than a bucket are admitted once the bucket is full
+        and leave it in debt, which later calls pay back.
+        
+        Args:
+            job_id: Identifier of the download
+            amount: Number of bytes just transferred
+        """
+        if amount <= 0 or (not self._rate and not self._schedule):
+            return
+        
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                if now >= self._next_schedule_check:
+                    self._apply_rate(self._scheduled_rate())
+                
+                bucket = self._jobs.get(job_id)
+                if not self._rate or bucket is None:
+                    return
+                
+                bucket.refill(now)
+                self._global.refill(now)
+                
+                # Spend the guaranteed share first, then borrow spare capacity
+                if bucket.tokens >= min(amount, bucket.capacity):
+                    bucket.tokens -= amount
+                    self._global.tokens -= amount
+                    return
+                if bucket.tokens >= 0 and self._global.tokens >= min(amount, self._global.capacity):
+                    self._global.tokens -= amount
+                    return
+                
+                wait = bucket.time_until(min(amount, bucket.capacity))
+                if bucket.tokens >= 0:
+                    wait = min(wait, self._global.time_until(min(amount, self._global.capacity)))
+                self._changed.wait(max(wait, 0.001))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get limiter state.
+        
+        Returns:
+            Dictionary with the current rate and per-job shares
+        """
+        with self._lock:
+            return {
+                'rate': self._rate,
+                'base_rate': self._base_rate,
+                'jobs': len(self._jobs),
+                'share': self._rate / len(self._jobs) if self._jobs and self._rate else 0.0,
+            }
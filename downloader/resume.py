@@ -0,0 +1,142 @@
+"""
+Resume index for interrupted downloads.
+
+This module keeps a small JSON index of downloads that have partial
+files on disk, so paused or interrupted jobs can be picked up again with
+the same formats after the application restarts.
+"""
+
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeIndex:
+    """
+    Persistent index of resumable downloads.
+    
+    Each entry records the serialized download request, the chosen
+    yt-dlp format IDs and the partial files written so far. The index is
+    rewritten atomically whenever an entry changes.
+    """
+    
+    def __init__(self, index_path: Path):
+        """
+        Initialize resume index.
+        
+        Args:
+            index_path: JSON file holding the index
+        """
+        self.index_path = Path(index_path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        
+        # Thread safety
+        self._lock = threading.Lock()
+        
+        self._load()
+    
+    def _load(self):
+        """Load the index from disk."""
+        if not self.index_path.exists():
+            return
+        
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable resume index {self.index_path}: {e}")
+            self._entries = {}
+    
+    def _save(self):
+        """Write the index to disk atomically."""
+        temp_path = self.index_path.with_suffix(".tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"Failed to write resume index: {e}")
+    
+    def record(self, request_id: str, request_data: Dict[str, Any],
+               format_id: Optional[str] = None, partial_files: Iterable[str] = ()):
+        """
+        Add or update an entry.
+        
+        Args:
+            request_id: Request ID of the download
+            request_data: JSON-compatible download request
+            format_id: yt-dlp format selection that produced the partial files
+            partial_files: Temporary files written by the download
+        """
+        with self._lock:
+            entry = self._entries.get(request_id, {})
+            entry['request'] = request_data
+            if format_id:
+                entry['format_id'] = format_id
+            entry['partial_files'] = sorted(set(entry.get('partial_files', [])) | set(partial_files))
+            entry['updated_at'] = datetime.now().isoformat()
+            
+            self._entries[request_id] = entry
+            self._save()
+    
+    def remove(self, request_id: str):
+        """
+        Remove an entry.
+        
+        Args:
+            request_id: Request ID of the download
+        """
+        with self._lock:
+            if self._entries.pop(request_id, None) is not None:
+                self._save()
+    
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an entry.
+        
+        Args:
+            request_id: Request ID of the download
+        
+        Returns:
+            Entry dictionary or None if not indexed
+        """
+        with self._lock:
+            entry = self._entries.get(request_id)
+            return dict(entry) if entry else None
+    
+    def reconcile(self) -> List[Dict[str, Any]]:
+        """
+        Drop entries whose partial files are gone.
+        
+        Returns:
+            Remaining entries with their request ID under 'request_id'
+        """
+        with self._lock:
+            resumable = []
+            stale = []
+            
+            for request_id, entry in self._entries.items():
+                existing = [p for p in entry.get('partial_files', []) if Path(p).exists()]
+                if not existing:
+                    stale.append(request_id)
+                    continue
+                
+                entry['partial_files'] = existing
+                resumable.append(dict(entry, request_id=request_id))
+            
+            for request_id in stale:
+                del self._entries[request_id]
+            
+            self._save()
+            
+            if stale:
+                logger.info(f"Dropped {len(stale)} resume entries without partial files")
+            
+            return resumable
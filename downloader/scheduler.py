@@ -0,0 +1,283 @@
+"""
+Bounded download scheduling.
+
+This module provides the download scheduler that limits how many downloads
+run at the same time, keeps a queue of pending requests and applies
+admission control before a request is started.
+"""
+
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Callable, Optional, List
+
+from .validation import DownloadRequest
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadScheduler:
+    """
+    Bounded scheduler for download requests.
+    
+    Requests are queued in FIFO order and dispatched onto a fixed number
+    of worker slots. Each dispatched request runs on its own daemon thread
+    and occupies one slot until the worker function returns. Requests the
+    admission check turns down are held in the queue without blocking the
+    ones behind them and are checked again later.
+    """
+    
+    def __init__(self, worker: Callable[[DownloadRequest], None],
+                 max_concurrent: int = 3, max_pending: int = 0,
+                 on_dispatch: Optional[Callable[[DownloadRequest], None]] = None,
+                 admission: Optional[Callable[[DownloadRequest], bool]] = None,
+                 admission_retry: float = 10.0):
+        """
+        Initialize download scheduler.
+        
+        Args:
+            worker: Function that performs a single download
+            max_concurrent: Maximum number of downloads running at once
+            max_pending: Maximum number of queued requests (0 for unlimited)
+            on_dispatch: Optional callback invoked when a request leaves the queue
+            admission: Optional check a request must pass before it is started
+            admission_retry: Seconds after which held requests are checked again
+        """
+        self._worker = worker
+        self._max_concurrent = max(1, int(max_concurrent))
+        self._max_pending = max(0, int(max_pending))
+        self._on_dispatch = on_dispatch
+        self._admission = admission
+        self._admission_retry = admission_retry
+        self._retry_timer: Optional[threading.Timer] = None
+        
+        self._pending: "OrderedDict[str, DownloadRequest]" = OrderedDict()
+        self._running: Dict[str, threading.Thread] = {}
+        self._shutdown = False
+        
+        # Thread safety
+        self._lock = threading.RLock()
+        self._state_changed = threading.Condition(self._lock)
+        
+        logger.info(f"Download scheduler initialized with {self._max_concurrent} slots")
+    
+    @property
+    def max_concurrent(self) -> int:
+        """Maximum number of concurrent downloads."""
+        return self._max_concurrent
+    
+    def set_max_concurrent(self, max_concurrent: int):
+        """
+        Change the number of worker slots at runtime.
+        
+        Args:
+            max_concurrent: New maximum number of concurrent downloads
+        """
+        with self._lock:
+            self._max_concurrent = max(1, int(max_concurrent))
+            logger.info(f"Download scheduler resized to {self._max_concurrent} slots")
+            self._dispatch()
+    
+    def submit(self, request: DownloadRequest) -> bool:
+        """
+        Queue a request for download.
+        
+        Args:
+            request: Download request to schedule
+        
+        Returns:
+            True if the request was accepted, False if the queue is full
+        """
+        with self._lock:
+            if self._shutdown:
+                return False
+            
+            if request.request_id in self._pending or request.request_id in self._running:
+                logger.warning(f"Request already scheduled: {request.request_id}")
+                return False
+            
+            if self._max_pending and len(self._pending) >= self._max_pending:
+                logger.warning(f"Download queue is full, rejecting: {request.request_id}")
+                return False
+            
+            self._pending[request.request_id] = request
+            self._dispatch()
+            return True
+    
+    def remove_pending(self, request_id: str) -> bool:
+        """
+        Remove a request that has not been started yet.
+        
+        Args:
+            request_id: Request ID to remove
+        
+        Returns:
+            True if the request was still pending and has been removed
+        """
+        with self._lock:
+            if self._pending.pop(request_id, None) is None:
+                return False
+            self._state_changed.notify_all()
+            return True
+    
+    def is_pending(self, request_id: str) -> bool:
+        """Check whether a request is waiting for a slot."""
+        with self._lock:
+            return request_id in self._pending
+    
+    def is_running(self, request_id: str) -> bool:
+        """Check whether a request currently occupies a slot."""
+        with self._lock:
+            return request_id in self._running
+    
+    def get_pending_ids(self) -> List[str]:
+        """Get pending request IDs in dispatch order."""
+        with self._lock:
+            return list(self._pending.keys())
+    
+    def get_running_ids(self) -> List[str]:
+        """Get request IDs that currently occupy a slot."""
+        with self._lock:
+            return list(self._running.keys())
+    
+    def recheck_held(self):
+        """Check held requests again, e.g. after resources were freed."""
+        self._dispatch()
+    
+    def _admit(self, request: DownloadRequest) -> bool:
+        """Run the admission check, admitting the request if the check fails."""
+        if self._admission is None:
+            return True
+        try:
+            return self._admission(request)
+        except Exception as e:
+            logger.error(f"Error in admission check for {request.request_id}: {e}")
+            return True
+    
+    def _dispatch(self):
+        """Start pending requests that pass admission while free slots are available."""
+        with self._lock:
+            held = False
+            for request_id, request in list(self._pending.items()):
+                if self._shutdown or len(self._running) >= self._max_concurrent:
+                    break
+                if not self._admit(request):
+                    held = True
+                    continue
+                
+                del self._pending[request_id]
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(request,),
+                    name=f"download-{request_id}",
+                    daemon=True
+                )
+                self._running[request_id] = thread
+                
+                if self._on_dispatch:
+                    try:
+                        self._on_dispatch(request)
+                    except Exception as e:
+                        logger.error(f"Error in dispatch callback: {e}")
+                
+                thread.start()
+            
+            if held and self._retry_timer is None:
+                self._retry_timer = threading.Timer(self._admission_retry, self._retry_held)
+                self._retry_timer.daemon = True
+                self._retry_timer.start()
+    
+    def _retry_held(self):
+        """Timer callback checking held requests again."""
+        with self._lock:
+            self._retry_timer = None
+            self._dispatch()
+    
+    def _run(self, request: DownloadRequest):
+        """
+        Run a single request and release its slot afterwards.
+        
+        Args:
+            request: Download request to run
+        """
+        try:
+            self._worker(request)
+        except Exception as e:
+            logger.error(f"Unhandled error in download worker for {request.request_id}: {e}")
+        finally:
+            self._free(request.request_id, threading.current_thread())
+    
+    def release(self, request_id: str):
+        """
+        Release the slot of a request before its worker returns.
+        
+        Used when a running request is paused or cancelled. The worker
+        ending later does not free a slot again, even if the request has
+        been submitted anew in the meantime.
+        
+        Args:
+            request_id: Request ID whose slot should be freed
+        """
+        self._free(request_id)
+    
+    def _free(self, request_id: str, thread: Optional[threading.Thread] = None):
+        """Free a slot, only if it is still held by the given worker thread, and start the next request."""
+        with self._lock:
+            if thread is not None and self._running.get(request_id) is not thread:
+                return
+            if self._running.pop(request_id, None) is None:
+                return
+            self._dispatch()
+            self._state_changed.notify_all()
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no requests are pending or running.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            True if the scheduler became idle, False on timeout
+        """
+        with self._lock:
+            return self._state_changed.wait_for(
+                lambda: not self._pending and not self._running,
+                timeout=timeout
+            )
+    
+    def wait_for_capacity(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the pending queue can accept another request.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            True if a request can be submitted, False on timeout or shutdown
+        """
+        with self._lock:
+            self._state_changed.wait_for(
+                lambda: self._shutdown or not self._max_pending or len(self._pending) < self._max_pending,
+                timeout=timeout
+            )
+            return not self._shutdown and (not self._max_pending or len(self._pending) < self._max_pending)
+    
+    def shutdown(self) -> List[DownloadRequest]:
+        """
+        Stop dispatching new requests.
+        
+        Returns:
+            Requests that were still pending and will not be started
+        """
+        with self._lock:
+            self._shutdown = True
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+            remaining = list(self._pending.values())
+            self._pending.clear()
+            self._state_changed.notify_all()
+        
+        logger.info(f"Download scheduler shut down with {len(remaining)} pending requests")
+        return remaining
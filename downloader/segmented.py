@@ -0,0 +1,497 @@
+"""
+Multi-connection segmented HTTP downloads.
+
+This module splits a resource of known length into byte ranges and
+fetches them on several pooled connections at once, writing each range
+straight into its place in a preallocated file. Servers that throttle
+each connection separately are thereby used closer to link speed.
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+
+from .writer import BufferedFileWriter, preallocate
+
+logger = logging.getLogger(__name__)
+
+
+# Segment boundaries fall on multiples of this many bytes
+_SEGMENT_ALIGNMENT = 65536
+
+
+class SegmentedDownloadCancelled(Exception):
+    """Raised when a segmented download is aborted through its cancel event."""
+
+
+class _IncompleteSegment(Exception):
+    """A segment ended before all of its bytes arrived."""
+
+
+class _Segment:
+    """Byte range of the resource and how much of it has been written."""
+    
+    __slots__ = ('start', 'end', 'done', 'written')
+    
+    def __init__(self, start: int, end: int, done: int = 0):
+        self.start = start
+        self.end = end
+        self.done = done
+        # Bytes that left the write buffer and survive the process ending
+        self.written = done
+    
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+    
+    @property
+    def complete(self) -> bool:
+        # Open-ended segments (no range support) finish when the response ends
+        return self.end >= 0 and self.done >= self.length
+
+
+def is_segmentable(fmt: Dict[str, Any]) -> bool:
+    """
+    Check whether a yt-dlp format can be fetched in byte ranges.
+    
+    Args:
+        fmt: yt-dlp format dictionary
+    
+    Returns:
+        True for plain HTTP(S) formats with a known size
+    """
+    return (
+        fmt.get('protocol', 'https') in ('http', 'https')
+        and bool(fmt.get('url'))
+        and bool(fmt.get('filesize'))
+        and not fmt.get('fragments')
+    )
+
+
+class SegmentedDownloader:
+    """
+    Range-request downloader using several connections per file.
+    
+    Connections come from a shared requests session, so they are kept
+    alive and reused across segments and downloads. Every segment retries
+    on its own, continuing from the last byte it wrote. The progress of
+    all segments is reported as one yt-dlp style progress dictionary.
+    Servers that do not honor range requests are downloaded over a single
+    connection instead.
+    """
+    
+    def __init__(self, connections: int = 4, min_segment_size: int = 1048576, chunk_size: int = 65536,
+                 retries: int = 3, timeout: float = 30.0, progress_interval: float = 0.1,
+                 write_buffer_size: int = 2097152, fsync_policy: str = 'close', state_interval: float = 5.0):
+        """
+        Initialize segmented downloader.
+        
+        Args:
+            connections: Maximum number of connections per download
+            min_segment_size: Smallest byte range worth its own connection
+            chunk_size: Read size of each connection
+            retries: Attempts per segment after the first one fails
+            timeout: Connect and read timeout in seconds
+            progress_interval: Minimum time in seconds between progress reports
+            write_buffer_size: Buffer size of each segment's file writer
+            fsync_policy: When written data is synced, see BufferedFileWriter
+            state_interval: Seconds between saves of the segment state while downloading
+        """
+        if requests is None:
+            raise Exception("requests is required for segmented downloads")
+        
+        self.connections = max(1, connections)
+        self.min_segment_size = max(1, min_segment_size)
+        self.chunk_size = chunk_size
+        self.retries = max(0, retries)
+        self.timeout = timeout
+        self.progress_interval = progress_interval
+        self.write_buffer_size = write_buffer_size
+        self.fsync_policy = fsync_policy
+        self.state_interval = state_interval
+        
+        # Keep-alive connections shared by all downloads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.connections * 4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+    
+    def probe(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """
+        Check whether a server honors range requests.
+        
+        Args:
+            url: Resource URL
+            headers: Extra request headers
+        
+        Returns:
+            Total size of the resource, or None if ranges are not supported
+        """
+        request_headers = dict(headers or {}, Range='bytes=0-0')
+        with self.session.get(url, headers=request_headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code != 206 or '/' not in content_range:
+                return None
+            
+            total = content_range.rsplit('/', 1)[1]
+            return int(total) if total.isdigit() else None
+    
+    def plan_segments(self, total_size: int) -> List[_Segment]:
+        """
+        Split a resource into equally sized byte ranges.
+        
+        Segment boundaries are aligned to _SEGMENT_ALIGNMENT so every
+        segment's writes start on a block boundary.
+        
+        Args:
+            total_size: Size of the resource in bytes
+        
+        Returns:
+            Segments covering the whole resource
+        """
+        count = max(1, min(self.connections, total_size // self.min_segment_size))
+        size = -(-total_size // count)
+        size = -(-size // _SEGMENT_ALIGNMENT) * _SEGMENT_ALIGNMENT
+        return [
+            _Segment(start, min(start + size, total_size) - 1)
+            for start in range(0, total_size, size)
+        ]
+    
+    def download(self, url: str, destination: Path, headers: Optional[Dict[str, str]] = None,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cancel_event: Optional[threading.Event] = None, resume: bool = True,
+                 retries: Optional[int] = None, request_size: Optional[int] = None,
+                 preallocated_callback: Optional[Callable[[Path, int], None]] = None) -> Path:
+        """
+        Download a resource into a file.
+        
+        Data is written to '<destination>.part', which is renamed once
+        every segment is complete. The segment state is saved next to the
+        partial file while downloading and when the download is
+        interrupted, so a later call with resume=True continues where it
+        stopped, even after the process was killed. With request_size set
+        every segment is fetched as a series of range requests of at most
+        that many bytes, for servers that throttle longer ranges.
+        
+        Args:
+            url: Resource URL
+            destination: Final file path
+            headers: Extra request headers, e.g. the format's http_headers
+            progress_callback: Receives yt-dlp style progress dictionaries;
+                an exception raised by it aborts the download
+            cancel_event: Optional event that aborts the download
+            resume: Continue a previously interrupted download
+            retries: Attempts per segment after the first, overriding the default
+            request_size: Largest byte range per request, e.g. the format's
+                http_chunk_size; None requests each segment at once
+            preallocated_callback: Called with the partial file and its size
+                once the file's blocks have been allocated on disk
+        
+        Returns:
+            Path of the downloaded file
+        
+        Raises:
+            SegmentedDownloadCancelled: If cancel_event is set
+            Exception: If a segment keeps failing
+        """
+        destination = Path(destination)
+        temp_path = destination.with_name(destination.name + '.part')
+        state_path = destination.with_name(destination.name + '.part.segments')
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        
+        total_size = self.probe(url, headers)
+        if total_size is None:
+            segments = None
+        else:
+            segments = self._load_state(state_path, temp_path, total_size) if resume else None
+            if segments is None:
+                segments = self.plan_segments(total_size)
+                # Reserve the whole file so segments can be written in place
+                if preallocate(temp_path, total_size) and preallocated_callback is not None:
+                    preallocated_callback(temp_path, total_size)
+        
+        if segments is None:
+            logger.info(f"Server does not support ranges, using a single connection: {destination.name}")
+            segments = [_Segment(0, -1)]
+            preallocate(temp_path, 0)
+        
+        checkpoint = None
+        if total_size is not None:
+            checkpoint = functools.partial(self._save_state, state_path, segments, total_size)
+        progress = _ProgressTracker(segments, total_size, destination, temp_path,
+                                    progress_callback, self.progress_interval,
+                                    checkpoint, self.state_interval)
+        stop = threading.Event()
+        
+        try:
+            pending = [segment for segment in segments if not segment.complete]
+            with ThreadPoolExecutor(max_workers=max(1, len(pending)), thread_name_prefix="segment") as pool:
+                futures = [
+                    pool.submit(self._download_segment, url, headers, temp_path, segment,
+                                progress, stop, cancel_event, self.retries if retries is None else retries,
+                                request_size)
+                    for segment in pending
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    # Stop the other segments at their next chunk
+                    stop.set()
+                    raise
+        except BaseException:
+            if total_size is not None:
+                self._save_state(state_path, segments, total_size)
+            raise
+        
+        progress.finish()
+        os.replace(temp_path, destination)
+        if state_path.exists():
+            state_path.unlink()
+        return destination
+    
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None,
+               progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+               cancel_event: Optional[threading.Event] = None, name: Optional[str] = None) -> Iterator[bytes]:
+        """
+        Fetch a resource in order over a single pooled connection.
+        
+        Chunks are yielded as they arrive, for consumers that process the
+        data without it being written to disk first.
+        
+        Args:
+            url: Resource URL
+            headers: Extra request headers
+            progress_callback: Receives yt-dlp style progress dictionaries
+            cancel_event: Optional event that aborts the transfer
+            name: Filename reported in the progress dictionaries
+        
+        Yields:
+            Chunks of the response body
+        
+        Raises:
+            SegmentedDownloadCancelled: If cancel_event is set
+        """
+        with self.session.get(url, headers=dict(headers or {}), stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length', '')
+            
+            segment = _Segment(0, -1)
+            progress = _ProgressTracker([segment], int(length) if length.isdigit() else None,
+                                        Path(name or url), None, progress_callback, self.progress_interval)
+            
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise SegmentedDownloadCancelled("Streamed download cancelled")
+                if chunk:
+                    progress.add(len(chunk))
+                    yield chunk
+            
+            progress.finish()
+    
+    def _download_segment(self, url: str, headers: Optional[Dict[str, str]], temp_path: Path,
+                          segment: _Segment, progress: "_ProgressTracker", stop: threading.Event,
+                          cancel_event: Optional[threading.Event], retries: int,
+                          request_size: Optional[int] = None):
+        """
+        Fetch one byte range, retrying from the last written byte.
+        
+        The retry budget applies to each range request, so a long segment
+        split into many requests does not run out of retries.
+        
+        Raises:
+            SegmentedDownloadCancelled: If the download is cancelled
+            Exception: If the segment fails after all retries
+        """
+        attempt = 0
+        while True:
+            try:
+                self._fetch_range(url, headers, temp_path, segment, progress, stop, cancel_event, request_size)
+                if segment.end < 0:
+                    segment.end = segment.done - 1
+                if segment.complete:
+                    return
+                attempt = 0
+            except (requests.RequestException, OSError, _IncompleteSegment) as e:
+                if stop.is_set() or (cancel_event is not None and cancel_event.is_set()):
+                    raise SegmentedDownloadCancelled("Segmented download cancelled")
+                if isinstance(e, requests.HTTPError) and getattr(e.response, 'status_code', None) == 403:
+                    # Expired signed URLs stay rejected; the caller needs a fresh URL
+                    raise
+                if attempt >= retries:
+                    raise Exception(f"Segment {segment.start}-{segment.end} failed after "
+                                    f"{attempt + 1} attempts: {e}") from e
+                
+                attempt += 1
+                delay = min(30.0, 2.0 ** attempt)
+                logger.warning(f"Segment {segment.start}-{segment.end} failed, retry "
+                               f"{attempt}/{retries} in {delay:.0f}s: {e}")
+                if cancel_event is not None and cancel_event.wait(delay):
+                    raise SegmentedDownloadCancelled("Segmented download cancelled")
+                if cancel_event is None:
+                    time.sleep(delay)
+    
+    def _fetch_range(self, url: str, headers: Optional[Dict[str, str]], temp_path: Path,
+                     segment: _Segment, progress: "_ProgressTracker", stop: threading.Event,
+                     cancel_event: Optional[threading.Event], request_size: Optional[int] = None):
+        """Stream the next range of a segment, up to request_size bytes, into the partial file."""
+        ranged = segment.end >= 0
+        request_headers = dict(headers or {})
+        if ranged:
+            # Absolute offset past the last byte this request is for
+            position = segment.start + segment.done
+            stop_at = segment.end + 1
+            if request_size:
+                stop_at = min(stop_at, position + request_size)
+            request_headers['Range'] = f"bytes={position}-{stop_at - 1}"
+        elif segment.done:
+            # Without range support the resource has to be fetched again
+            progress.add(-segment.done)
+            segment.done = segment.written = 0
+        
+        with self.session.get(url, headers=request_headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            if ranged and response.status_code != 206:
+                raise _IncompleteSegment(f"Server ignored range request (HTTP {response.status_code})")
+            
+            f = BufferedFileWriter(temp_path, offset=segment.start + segment.done,
+                                   buffer_size=self.write_buffer_size, fsync_policy=self.fsync_policy)
+            try:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if stop.is_set() or (cancel_event is not None and cancel_event.is_set()):
+                        raise SegmentedDownloadCancelled("Segmented download cancelled")
+                    if not chunk:
+                        continue
+                    if ranged:
+                        chunk = chunk[:stop_at - segment.start - segment.done]
+                    
+                    f.write(chunk)
+                    segment.done += len(chunk)
+                    segment.written = f.written_position - segment.start
+                    progress.add(len(chunk))
+                    
+                    if ranged and segment.start + segment.done >= stop_at:
+                        break
+            finally:
+                f.close()
+                segment.written = segment.done
+        
+        if ranged and segment.start + segment.done < stop_at:
+            raise _IncompleteSegment(f"Connection closed after {segment.done} of {segment.length} bytes")
+    
+    def _load_state(self, state_path: Path, temp_path: Path, total_size: int) -> Optional[List[_Segment]]:
+        """Load the segments of an interrupted download if they still match the resource."""
+        if not state_path.exists() or not temp_path.exists():
+            return None
+        
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('total_size') != total_size or temp_path.stat().st_size != total_size:
+                return None
+            segments = [_Segment(*values) for values in state['segments']]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable segment state {state_path}: {e}")
+            return None
+        
+        logger.info(f"Resuming segmented download with {sum(s.done for s in segments)} of {total_size} bytes")
+        return segments
+    
+    def _save_state(self, state_path: Path, segments: List[_Segment], total_size: int):
+        """Remember the segment progress of a download that may be interrupted."""
+        # Replace the state in one step so a killed process never leaves half a file
+        temp_state = state_path.with_name(state_path.name + '.tmp')
+        try:
+            with open(temp_state, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'total_size': total_size,
+                    'segments': [[s.start, s.end, s.written] for s in segments]
+                }, f)
+            os.replace(temp_state, state_path)
+        except OSError as e:
+            logger.warning(f"Failed to save segment state {state_path}: {e}")
+
+
+class _ProgressTracker:
+    """Thread-safe aggregation of segment progress."""
+    
+    def __init__(self, segments: List[_Segment], total_size: Optional[int], destination: Path,
+                 temp_path: Optional[Path], callback: Optional[Callable[[Dict[str, Any]], None]], interval: float,
+                 checkpoint: Optional[Callable[[], None]] = None, checkpoint_interval: float = 5.0):
+        self.total_size = total_size
+        self.destination = destination
+        self.temp_path = temp_path
+        self.callback = callback
+        self.interval = interval
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        
+        self.downloaded = sum(s.done for s in segments)
+        self._samples = deque([(time.monotonic(), self.downloaded)], maxlen=64)
+        self._last_report = 0.0
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def add(self, amount: int):
+        """Count transferred bytes, report progress and save the segment state when due."""
+        with self._lock:
+            self.downloaded += amount
+            now = time.monotonic()
+            if self.checkpoint is not None and now - self._last_checkpoint >= self.checkpoint_interval:
+                self._last_checkpoint = now
+                self.checkpoint()
+            if now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            self._samples.append((now, self.downloaded))
+            
+            # Callbacks are serialized so consumers see monotonic totals
+            self._report('downloading', now)
+    
+    def finish(self):
+        """Report the completed download."""
+        with self._lock:
+            self._report('finished', time.monotonic())
+    
+    def _report(self, status: str, now: float):
+        """Invoke the callback with a yt-dlp style dictionary. Must hold _lock."""
+        if self.callback is None:
+            return
+        
+        # Speed over the last few seconds
+        while len(self._samples) > 2 and now - self._samples[0][0] > 3.0:
+            self._samples.popleft()
+        start_time, start_bytes = self._samples[0]
+        elapsed = now - start_time
+        speed = (self.downloaded - start_bytes) / elapsed if elapsed > 0 else None
+        
+        total = self.total_size or (self.downloaded if status == 'finished' else None)
+        self.callback({
+            'status': status,
+            'downloaded_bytes': self.downloaded,
+            'total_bytes': total,
+            'speed': speed,
+            'eta': int((total - self.downloaded) / speed) if total and speed else None,
+            'filename': str(self.destination),
+            'tmpfilename': str(self.temp_path) if self.temp_path and status == 'downloading' else None,
+            'elapsed': elapsed,
+        })
@@ -0,0 +1,147 @@
+"""
+Separate video and audio stream handling.
+
+This module holds the helpers for downloading DASH video and audio
+streams side by side: selector construction, combining the progress of
+concurrently downloading streams and the stream-copy remux that joins
+them into the requested container without re-encoding.
+"""
+
+import os
+import shutil
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+from .postprocess import run_ffmpeg, PostProcessingCancelled
+
+logger = logging.getLogger(__name__)
+
+
+# Stream extensions that can be stream-copied into each container
+_CONTAINER_STREAM_EXTS = {
+    'mp4': ('mp4', 'm4a'),
+    'webm': ('webm', 'webm'),
+    'mkv': (None, None),
+}
+
+
+def find_ffmpeg(preferred: Optional[Path] = None) -> Optional[str]:
+    """
+    Locate the ffmpeg executable.
+    
+    Args:
+        preferred: Bundled ffmpeg binary to use when it exists
+    
+    Returns:
+        Path of the executable or None if ffmpeg is not available
+    """
+    if preferred is not None and Path(preferred).exists():
+        return str(preferred)
+    return shutil.which('ffmpeg')
+
+
+def build_stream_selector(video_format: str, height: Optional[int] = None, worst: bool = False) -> str:
+    """
+    Build a selector for separate video and audio streams.
+    
+    Streams whose codecs the container can hold natively are preferred;
+    otherwise the best streams of any codec are taken.
+    
+    Args:
+        video_format: Target container (mp4, webm or mkv)
+        height: Maximum video height or None for no limit
+        worst: Select the lowest quality streams instead of the best
+    
+    Returns:
+        yt-dlp format selector without a progressive fallback
+    """
+    video, audio = ('worstvideo', 'worstaudio') if worst else ('bestvideo', 'bestaudio')
+    height_filter = f"[height<={height}]" if height else ""
+    video_ext, audio_ext = _CONTAINER_STREAM_EXTS.get(video_format, (None, None))
+    
+    selectors = []
+    if video_ext:
+        selectors.append(f"{video}{height_filter}[ext={video_ext}]+{audio}[ext={audio_ext}]")
+    selectors.append(f"{video}{height_filter}+{audio}")
+    return "/".join(selectors)
+
+
+def combine_stream_progress(streams: Iterable[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge the progress of concurrently downloading streams.
+    
+    Args:
+        streams: Latest yt-dlp progress dictionary of every stream
+        current: Progress dictionary that triggered the update
+    
+    Returns:
+        Progress dictionary describing the streams as one download
+    """
+    streams = list(streams)
+    
+    downloaded = sum(s.get('downloaded_bytes') or 0 for s in streams)
+    totals = [s.get('total_bytes') or s.get('total_bytes_estimate') for s in streams]
+    total = sum(totals) if all(totals) else None
+    speed = sum(s.get('speed') or 0 for s in streams if s.get('status') == 'downloading')
+    
+    combined = dict(current)
+    combined.update({
+        'status': 'finished' if all(s.get('status') == 'finished' for s in streams) else 'downloading',
+        'downloaded_bytes': downloaded,
+        'total_bytes': total,
+        'total_bytes_estimate': None,
+        'speed': speed or None,
+        'eta': int((total - downloaded) / speed) if total and speed else None,
+    })
+    return combined
+
+
+def remux_streams(ffmpeg: str, inputs: List[Dict[str, Any]], output_path: Path,
+                  duration: Optional[float] = None, cancel_event: Optional[threading.Event] = None,
+                  progress_callback: Optional[Callable[[float], None]] = None):
+    """
+    Join separate streams into one file with a stream copy.
+    
+    Args:
+        ffmpeg: ffmpeg executable
+        inputs: Dictionaries with 'path' and the stream's yt-dlp format
+            under 'format'
+        output_path: Final output file
+        duration: Media duration in seconds for progress reporting
+        cancel_event: Optional event that aborts the remux
+        progress_callback: Receives the percentage remuxed
+    
+    Raises:
+        Exception: If ffmpeg fails
+    """
+    output_path = Path(output_path)
+    temp_output = output_path.with_name(f"{output_path.stem}.temp{output_path.suffix}")
+    
+    args = []
+    for stream in inputs:
+        args += ['-i', str(stream['path'])]
+    for index, stream in enumerate(inputs):
+        kind = 'a' if stream['format'].get('vcodec') == 'none' else 'v'
+        args += ['-map', f"{index}:{kind}:0"]
+    args += ['-c', 'copy', str(temp_output)]
+    
+    try:
+        run_ffmpeg(ffmpeg, args, duration, cancel_event, progress_callback)
+    except PostProcessingCancelled:
+        if temp_output.exists():
+            temp_output.unlink()
+        raise
+    except Exception as e:
+        if temp_output.exists():
+            temp_output.unlink()
+        raise Exception(f"Failed to merge streams: {e}") from e
+    
+    os.replace(temp_output, output_path)
+    
+    for stream in inputs:
+        try:
+            Path(stream['path']).unlink()
+        except OSError as e:
+            logger.warning(f"Failed to remove stream file {stream['path']}: {e}")
@@ -55,7 +55,9 @@ class ProgressStatus(str, Enum):
     PENDING = "pending"
     FETCHING_INFO = "fetching_info"
     DOWNLOADING = "downloading"
+    PAUSED = "paused"
     PROCESSING = "processing"
+    POSTPROCESSING = "postprocessing"
     COMPLETED = "completed"
     FAILED = "failed"
     CANCELLED = "cancelled"
@@ -190,6 +192,8 @@ class DownloadRequest(BaseModel):
     video_format: Optional[VideoFormat] = Field(None, description="Video container format")
     audio_format: Optional[AudioFormat] = Field(None, description="Audio format for audio-only downloads")
     quality: QualityOption = Field(QualityOption.BEST, description="Video quality preference")
+    format_id: Optional[str] = Field(None, description="Explicit yt-dlp format ID(s), overrides quality")
+    merge_streams: bool = Field(True, description="Download separate video and audio streams and remux them")
     
     # Advanced options
     extract_audio: bool = Field(False, description="Extract audio from video")
@@ -201,6 +205,7 @@ class DownloadRequest(BaseModel):
     overwrite: bool = Field(False, description="Overwrite existing files")
     continue_partial: bool = Field(True, description="Continue partial downloads")
     retry_count: int = Field(3, description="Number of retry attempts")
+    concurrent_fragments: Optional[int] = Field(None, ge=1, le=16, description="Fragments of HLS/DASH formats fetched in parallel")
     
     # Metadata
     request_id: str = Field(..., description="Unique identifier for this request")
@@ -218,6 +223,8 @@ class DownloadRequest(BaseModel):
             r'(?:https?://)?(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
             r'(?:https?://)?(?:www\.)?youtube\.com/shorts/[\w-]+',
             r'(?:https?://)?(?:m\.)?youtube\.com/watch\?v=[\w-]+',
+            r'(?:https?://)?(?:www\.)?youtube\.com/@[\w.-]+',
+            r'(?:https?://)?(?:www\.)?youtube\.com/(?:channel|c|user)/[\w-]+',
         ]
         
         if not any(re.match(pattern, url_str, re.IGNORECASE) for pattern in youtube_patterns):
@@ -418,4 +425,137 @@ class ProgressInfo(BaseModel):
     class Config:
         """Pydantic configuration."""
         # Use enum values for serialization
-        use_enum_values = True
\ No newline at end of file
+        use_enum_values = True
+
+
+def _optional(coerce):
+    """Wrap a coercion so None passes through unchanged."""
+    return lambda value: None if value is None else coerce(value)
+
+
+# Status values by member and by value; a lookup is much cheaper than ProgressStatus(value)
+_STATUS_VALUES = {status: status.value for status in ProgressStatus}
+
+# Coercions matching the ProgressInfo field types and validators
+_RECORD_COERCIONS = {
+    'status': lambda value: _STATUS_VALUES.get(value) or ProgressStatus(value).value,
+    'percentage': lambda value: min(100.0, max(0.0, float(value or 0.0))),
+    'downloaded_bytes': lambda value: int(value or 0),
+    'total_bytes': _optional(int),
+    'total_bytes_estimate': _optional(int),
+    'speed': _optional(lambda value: float(value) if value >= 0 else None),
+    'eta': _optional(lambda value: int(value) if value >= 0 else None),
+}
+
+
+class ProgressRecord:
+    """
+    Lightweight mutable progress state used on the download hot path.
+    
+    Holds the same fields as ProgressInfo in __slots__ and applies the
+    model's coercions and constraints as they are set, so progress hooks
+    can update it without pydantic validation. It is converted to a
+    ProgressInfo only where progress leaves the downloader, at most once
+    per state, and without running the validators a second time.
+    """
+    
+    __slots__ = (
+        'request_id', 'status', 'percentage', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate',
+        'speed', 'eta', 'elapsed', 'filename', 'temp_filename', 'final_filename', 'current_operation',
+        'fragment_index', 'fragment_count', 'error_message', 'warning_messages', 'retry_count',
+        'started_at', 'updated_at', 'completed_at', '_info'
+    )
+    
+    def __init__(self, request_id: str, status: ProgressStatus, **fields):
+        """
+        Create a progress record.
+        
+        Args:
+            request_id: Associated download request ID
+            status: Current download status
+            **fields: Any other ProgressInfo field
+        """
+        self.request_id = request_id
+        self.percentage = 0.0
+        self.downloaded_bytes = 0
+        self.total_bytes = None
+        self.total_bytes_estimate = None
+        self.speed = None
+        self.eta = None
+        self.elapsed = 0.0
+        self.filename = None
+        self.temp_filename = None
+        self.final_filename = None
+        self.current_operation = None
+        self.fragment_index = None
+        self.fragment_count = None
+        self.error_message = None
+        self.warning_messages = []
+        self.retry_count = 0
+        self.started_at = None
+        self.completed_at = None
+        self.updated_at = datetime.now()
+        self.update(status=status, **fields)
+    
+    @classmethod
+    def from_info(cls, info: ProgressInfo) -> 'ProgressRecord':
+        """
+        Create a record holding the state of a progress model.
+        
+        Args:
+            info: Progress model
+        
+        Returns:
+            New progress record
+        """
+        record = cls(**info.dict())
+        record._info = info
+        return record
+    
+    def update(self, **fields) -> 'ProgressRecord':
+        """
+        Change fields in place.
+        
+        Values are coerced to the model's field types. Out of range
+        percentages are clamped and negative speeds or ETAs are dropped
+        instead of raising, as they come from network code.
+        
+        Args:
+            **fields: ProgressInfo fields to change
+        
+        Returns:
+            The record itself
+        """
+        for name, value in fields.items():
+            coerce = _RECORD_COERCIONS.get(name)
+            setattr(self, name, coerce(value) if coerce is not None else value)
+        
+        if 'updated_at' not in fields:
+            self.updated_at = datetime.now()
+        
+        self._info = None
+        return self
+    
+    def copy(self) -> 'ProgressRecord':
+        """Create an independent copy of the record."""
+        record = ProgressRecord.__new__(ProgressRecord)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        record.warning_messages = list(self.warning_messages)
+        return record
+    
+    def to_info(self) -> ProgressInfo:
+        """
+        Get the progress model of the current state.
+        
+        The fields already hold validated values, so the model is
+        constructed without running the validators again.
+        
+        Returns:
+            ProgressInfo, cached until the record changes
+        """
+        if self._info is None:
+            fields = {name: getattr(self, name) for name in self.__slots__ if name != '_info'}
+            fields['warning_messages'] = list(self.warning_messages)
+            self._info = ProgressInfo.construct(**fields)
+        return self._info
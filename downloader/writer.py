@@ -0,0 +1,160 @@
+"""
+Buffered output file writing.
+
+This module collects small writes into large buffers that are written at
+block-aligned file offsets, preallocates files whose size is known up
+front and applies a configurable fsync policy. Network filesystems then
+see a few large writes to a file of fixed size instead of many small
+appends that keep growing it.
+"""
+
+import os
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+# When buffered data is synced to disk
+FSYNC_POLICIES = ('never', 'close', 'flush')
+
+
+def preallocate(path: Path, size: int) -> bool:
+    """
+    Create a file and reserve its full size on disk.
+    
+    Uses posix_fallocate where available so the blocks are really
+    allocated; elsewhere the file is extended to its final size. An
+    existing file keeps its data and is only extended or cut to size.
+    
+    Args:
+        path: File to create or resize
+        size: Size in bytes
+    
+    Returns:
+        True if the blocks were allocated, False if the file may be sparse
+    """
+    with open(path, 'r+b' if Path(path).exists() else 'wb') as f:
+        f.truncate(max(0, min(size, os.fstat(f.fileno()).st_size)))
+        if size <= 0:
+            return False
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+                return True
+            except OSError as e:
+                logger.debug(f"posix_fallocate not supported for {path}: {e}")
+        f.truncate(size)
+        return False
+
+
+class BufferedFileWriter:
+    """
+    File writer with a large buffer flushed at aligned offsets.
+    
+    Data is written once the buffer is full, up to the last block
+    boundary it covers, so every write after the first starts and ends
+    on a block boundary. The remainder is written on flush() or close().
+    The writer starts at any offset of an existing file, which lets
+    several writers fill separate ranges of one preallocated file.
+    """
+    
+    def __init__(self, path: Path, offset: int = 0, buffer_size: int = 4194304, alignment: int = 4096,
+                 fsync_policy: str = 'close', truncate: bool = False):
+        """
+        Open a file for buffered writing.
+        
+        Args:
+            path: File to write
+            offset: File offset the first byte is written to
+            buffer_size: Amount of data collected before writing
+            alignment: Block size the writes are aligned to
+            fsync_policy: 'never', 'close' to sync when closing, or
+                'flush' to sync after every buffer write
+            truncate: Start with an empty file instead of writing into the existing one
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise Exception(f"Invalid fsync policy: {fsync_policy}")
+        
+        self.path = Path(path)
+        self.alignment = max(1, alignment)
+        self.buffer_size = max(buffer_size, self.alignment)
+        self.fsync_policy = fsync_policy
+        
+        mode = 'r+b' if self.path.exists() and not truncate else 'wb'
+        self._file = open(self.path, mode, buffering=0)
+        self._file.seek(offset)
+        
+        # File offset of the first buffered byte
+        self._position = offset
+        self._buffer = bytearray()
+    
+    @property
+    def position(self) -> int:
+        """File offset the next byte will be written to."""
+        return self._position + len(self._buffer)
+    
+    @property
+    def written_position(self) -> int:
+        """File offset up to which data has been handed to the file."""
+        return self._position
+    
+    def write(self, data: bytes) -> int:
+        """
+        Buffer data, writing full blocks once the buffer is full.
+        
+        Args:
+            data: Bytes to write
+        
+        Returns:
+            Number of bytes accepted
+        """
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self._write_aligned()
+        return len(data)
+    
+    def _write_aligned(self):
+        """Write the buffered data up to the last block boundary."""
+        end = self._position + len(self._buffer)
+        count = end - end % self.alignment - self._position
+        if count <= 0:
+            return
+        
+        self._write(memoryview(self._buffer)[:count])
+        del self._buffer[:count]
+    
+    def _write(self, data):
+        """Write data at the current position and apply the fsync policy."""
+        view = memoryview(data)
+        while view:
+            written = self._file.write(view)
+            view = view[written:]
+            self._position += written
+        
+        if self.fsync_policy == 'flush':
+            os.fsync(self._file.fileno())
+    
+    def flush(self):
+        """Write all buffered data."""
+        if self._buffer:
+            self._write(self._buffer)
+            self._buffer = bytearray()
+    
+    def close(self):
+        """Write remaining data, sync according to the policy and close the file."""
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+            if self.fsync_policy == 'close':
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+    
+    def __enter__(self) -> "BufferedFileWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
@@ -846,6 +846,14 @@ class SettingsDialog(QDialog):
         self.concurrent_downloads_spin.setValue(1)
         advanced_layout.addRow("Concurrent Downloads:", self.concurrent_downloads_spin)
         
+        self.bandwidth_limit_spin = QSpinBox()
+        self.bandwidth_limit_spin.setRange(0, 1000000)
+        self.bandwidth_limit_spin.setSingleStep(100)
+        self.bandwidth_limit_spin.setSuffix(" KB/s")
+        self.bandwidth_limit_spin.setSpecialValueText("Unlimited")
+        self.bandwidth_limit_spin.setToolTip("Total bandwidth shared by all downloads")
+        advanced_layout.addRow("Bandwidth Limit:", self.bandwidth_limit_spin)
+        
         self.retry_attempts_spin = QSpinBox()
         self.retry_attempts_spin.setRange(1, 10)
         self.retry_attempts_spin.setValue(3)
@@ -907,7 +915,16 @@ class SettingsDialog(QDialog):
         
         # Advanced settings
         self.concurrent_downloads_spin.setValue(
-            self.settings.value("concurrent_downloads", 1, type=int)
+            self.config.get("download_settings", {}).get(
+                "max_concurrent_downloads",
+                self.settings.value("concurrent_downloads", 1, type=int)
+            )
+        )
+        self.bandwidth_limit_spin.setValue(
+            self.config.get("download_settings", {}).get(
+                "bandwidth_limit_kbps",
+                self.settings.value("bandwidth_limit_kbps", 0, type=int)
+            )
         )
         self.retry_attempts_spin.setValue(
             self.settings.value("retry_attempts", 3, type=int)
@@ -934,6 +951,12 @@ class SettingsDialog(QDialog):
             self.config["downloads"]["video_format"] = self.video_format_combo.currentText()
             self.config["downloads"]["audio_format"] = self.audio_format_combo.currentText()
             
+            # Scheduler settings
+            if "download_settings" not in self.config:
+                self.config["download_settings"] = {}
+            self.config["download_settings"]["max_concurrent_downloads"] = self.concurrent_downloads_spin.value()
+            self.config["download_settings"]["bandwidth_limit_kbps"] = self.bandwidth_limit_spin.value()
+            
             # Save to JSON file
             with open(self.config_file, 'w') as f:
                 json.dump(self.config, f, indent=4)
@@ -942,6 +965,7 @@ class SettingsDialog(QDialog):
             self.settings.setValue("show_preview", self.show_preview_checkbox.isChecked())
             self.settings.setValue("show_progress", self.show_progress_checkbox.isChecked())
             self.settings.setValue("concurrent_downloads", self.concurrent_downloads_spin.value())
+            self.settings.setValue("bandwidth_limit_kbps", self.bandwidth_limit_spin.value())
             self.settings.setValue("retry_attempts", self.retry_attempts_spin.value())
             
             # Also save default download path to QSettings for immediate use
@@ -972,4 +996,5 @@ class SettingsDialog(QDialog):
             self.show_preview_checkbox.setChecked(True)
             self.show_progress_checkbox.setChecked(True)
             self.concurrent_downloads_spin.setValue(1)
+            self.bandwidth_limit_spin.setValue(0)
             self.retry_attempts_spin.setValue(3)
\ No newline at end of file
@@ -376,6 +376,10 @@ class MainWindow(QMainWindow):
                     shutil.rmtree(cache_dir)
                     cache_dir.mkdir()
                 
+                downloader = getattr(self, 'downloader', None)
+                if downloader:
+                    downloader.metadata_cache.clear()
+                
                 self.set_status("Cache cleared successfully")
                 
             except Exception as e:
@@ -825,21 +829,27 @@ class MainWindow(QMainWindow):
             download_complete = pyqtSignal(str)
             download_error = pyqtSignal(str)
             
-            def __init__(self, url, opts):
+            def __init__(self, url, opts, downloader=None):
                 super().__init__()
                 self.url = url
                 self.opts = opts
+                self.downloader = downloader
                 
             def run(self):
                 try:
                     with yt_dlp.YoutubeDL(self.opts) as ydl:
-                        ydl.download([self.url])
+                        if self.downloader:
+                            # Reuse the info extracted for the preview if it is still fresh
+                            info = self.downloader.get_reusable_info(self.url)
+                            self.downloader.download_with_info(ydl, self.url, info)
+                        else:
+                            ydl.download([self.url])
                     self.download_complete.emit("Download completed successfully!")
                 except Exception as e:
                     self.download_error.emit(str(e))
         
         # Create and start worker
-        self.download_worker = DownloadWorker(url, ydl_opts)
+        self.download_worker = DownloadWorker(url, ydl_opts, getattr(self, 'downloader', None))
         self.download_worker.download_complete.connect(self._on_download_complete)
         self.download_worker.download_error.connect(self._on_download_error)
         self.download_worker.start()
@@ -985,8 +995,17 @@ class MainWindow(QMainWindow):
     def _load_settings(self):
         """Load application settings."""
         # This method is called after settings are changed
-        # You can add any settings reload logic here
-        pass
+        settings = QSettings('YTDownloaderGUI', 'Settings')
+        
+        downloader = getattr(self, 'downloader', None)
+        if downloader:
+            max_concurrent = settings.value("concurrent_downloads", 3, type=int)
+            downloader.set_max_concurrent_downloads(max_concurrent)
+            self.config.setdefault("download_settings", {})["max_concurrent_downloads"] = max_concurrent
+            
+            bandwidth_limit = settings.value("bandwidth_limit_kbps", 0, type=int)
+            downloader.set_bandwidth_limit(bandwidth_limit * 1024)
+            self.config["download_settings"]["bandwidth_limit_kbps"] = bandwidth_limit
     
     def _on_download_error(self, error_message):
         """Handle download errors."""
@@ -1006,69 +1025,77 @@ class MainWindow(QMainWindow):
             info_error = pyqtSignal(str)
             thumbnail_ready = pyqtSignal(str)  # Signal for thumbnail path
             
-            def __init__(self, url):
+            def __init__(self, url, downloader=None):
                 super().__init__()
                 self.url = url
+                self.downloader = downloader
+            
+            def _extract_info(self):
+                # Go through the downloader so repeated previews hit the metadata cache
+                if self.downloader:
+                    return self.downloader.extract_info_dict(self.url)
+                
+                ydl_opts = {
+                    'quiet': False,  # Enable output to see what's happening
+                    'no_warnings': False,
+                    'skip_download': True,
+                }
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    return ydl.extract_info(self.url, download=False)
                 
             def run(self):
                 try:
                     print(f"DEBUG: Fetching video info for URL: {self.url}")
-                    ydl_opts = {
-                        'quiet': False,  # Enable output to see what's happening
-                        'no_warnings': False,
-                        'skip_download': True,
+                    
+                    print("DEBUG: Calling extract_info...")
+                    info = self._extract_info()
+                    print(f"DEBUG: Info extracted successfully, title: {info.get('title', 'Unknown')}")
+                    
+                    # Extract relevant info
+                    video_info = {
+                        'title': info.get('title', 'Unknown Title'),
+                        'uploader': info.get('uploader', 'Unknown Channel'),
+                        'duration_string': info.get('duration_string', 'Unknown'),
+                        'view_count': info.get('view_count', 0),
+                        'upload_date': info.get('upload_date', 'Unknown'),
+                        'description': info.get('description', '')[:200] + '...' if info.get('description') else 'No description',
+                        'thumbnail': info.get('thumbnail', None)
                     }
                     
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        print("DEBUG: Calling extract_info...")
-                        info = ydl.extract_info(self.url, download=False)
-                        print(f"DEBUG: Info extracted successfully, title: {info.get('title', 'Unknown')}")
-                        
-                        # Extract relevant info
-                        video_info = {
-                            'title': info.get('title', 'Unknown Title'),
-                            'uploader': info.get('uploader', 'Unknown Channel'),
-                            'duration_string': info.get('duration_string', 'Unknown'),
-                            'view_count': info.get('view_count', 0),
-                            'upload_date': info.get('upload_date', 'Unknown'),
-                            'description': info.get('description', '')[:200] + '...' if info.get('description') else 'No description',
-                            'thumbnail': info.get('thumbnail', None)
-                        }
-                        
-                        print(f"DEBUG: Emitting info_ready signal with data: {video_info}")
-                        self.info_ready.emit(video_info)
-                        
-                        # Download thumbnail if available
-                        thumbnail_url = video_info.get('thumbnail')
-                        if thumbnail_url:
-                            try:
-                                import requests
-                                import tempfile
-                                import os
+                    print(f"DEBUG: Emitting info_ready signal with data: {video_info}")
+                    self.info_ready.emit(video_info)
+                    
+                    # Download thumbnail if available
+                    thumbnail_url = video_info.get('thumbnail')
+                    if thumbnail_url:
+                        try:
+                            import requests
+                            import tempfile
+                            import os
+                            
+                            print(f"DEBUG: Downloading thumbnail from: {thumbnail_url}")
+                            response = requests.get(thumbnail_url, timeout=10)
+                            if response.status_code == 200:
+                                # Save thumbnail to temp directory
+                                temp_dir = tempfile.gettempdir()
+                                thumbnail_path = os.path.join(temp_dir, f"yt_thumbnail_{hash(self.url)}.jpg")
                                 
-                                print(f"DEBUG: Downloading thumbnail from: {thumbnail_url}")
-                                response = requests.get(thumbnail_url, timeout=10)
-                                if response.status_code == 200:
-                                    # Save thumbnail to temp directory
-                                    temp_dir = tempfile.gettempdir()
-                                    thumbnail_path = os.path.join(temp_dir, f"yt_thumbnail_{hash(self.url)}.jpg")
-                                    
-                                    with open(thumbnail_path, 'wb') as f:
-                                        f.write(response.content)
-                                    
-                                    print(f"DEBUG: Thumbnail saved to: {thumbnail_path}")
-                                    self.thumbnail_ready.emit(thumbnail_path)
-                                else:
-                                    print(f"DEBUG: Failed to download thumbnail, status: {response.status_code}")
-                            except Exception as thumb_error:
-                                print(f"DEBUG: Error downloading thumbnail: {str(thumb_error)}")
-                        
+                                with open(thumbnail_path, 'wb') as f:
+                                    f.write(response.content)
+                                
+                                print(f"DEBUG: Thumbnail saved to: {thumbnail_path}")
+                                self.thumbnail_ready.emit(thumbnail_path)
+                            else:
+                                print(f"DEBUG: Failed to download thumbnail, status: {response.status_code}")
+                        except Exception as thumb_error:
+                            print(f"DEBUG: Error downloading thumbnail: {str(thumb_error)}")
+                    
                 except Exception as e:
                     print(f"DEBUG: Error in video info extraction: {str(e)}")
                     self.info_error.emit(str(e))
         
         # Create and start worker
-        self.info_worker = VideoInfoWorker(url)
+        self.info_worker = VideoInfoWorker(url, getattr(self, 'downloader', None))
         self.info_worker.info_ready.connect(self._on_video_info_ready)
         self.info_worker.info_error.connect(self._on_video_info_error)
         self.info_worker.thumbnail_ready.connect(self._on_thumbnail_ready)
@@ -10,6 +10,7 @@ import sys
 import os
 import logging
 import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
@@ -103,16 +104,16 @@ class VideoPreviewWorker(QThread):
             self.progress_update.emit("Fetching video information...")
             logger.info(f"Fetching preview for URL: {url}")
             
-            # Extract video information using asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                video_info = loop.run_until_complete(
-                    self.downloader.extract_video_info(url)
-                )
-            finally:
-                loop.close()
+            # Extract video information on the downloader's extraction executor
+            future = self.downloader.submit_video_info(url)
+            while True:
+                try:
+                    video_info = future.result(timeout=0.2)
+                    break
+                except FutureTimeoutError:
+                    if self._stop_requested:
+                        future.cancel()
+                        return
             
             if not video_info:
                 self.preview_failed.emit("Failed to extract video information")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared bandwidth limiter
+Checks that concurrent jobs stay under the global cap together and that
+the fair shares are rebalanced when jobs come and go
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from downloader.ratelimit import BandwidthLimiter
+
+RATE = 512 * 1024
+CHUNK = 16 * 1024
+
+
+def test_cap_enforcement():
+    """Test that concurrent jobs together stay under the global rate"""
+    
+    print("Testing cap enforcement...")
+    limiter = BandwidthLimiter(rate=RATE, burst_seconds=0.1)
+    transferred = {}
+    deadline = time.monotonic() + 1.0
+    
+    def job(job_id):
+        limiter.register(job_id)
+        transferred[job_id] = 0
+        try:
+            while time.monotonic() < deadline:
+                limiter.consume(job_id, CHUNK)
+                transferred[job_id] += CHUNK
+        finally:
+            limiter.unregister(job_id)
+    
+    started = time.monotonic()
+    threads = [threading.Thread(target=job, args=(f"job-{i}",)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    
+    total = sum(transferred.values())
+    print(f"Transferred {total} bytes in {elapsed:.2f}s, cap {RATE} bytes/s")
+    
+    # The initial bursts plus one chunk per job may exceed the steady rate
+    allowance = RATE * 0.1 * (len(threads) + 1) + CHUNK * len(threads)
+    assert total <= RATE * elapsed + allowance, "limiter let too much through"
+    assert total >= RATE * elapsed * 0.5, "limiter is far below its cap"
+    assert all(transferred.values()), "a job was starved"
+    print("✅ Cap enforcement: PASSED")
+
+
+def test_rebalance_on_unregister():
+    """Test that leaving jobs hand their share to the remaining ones"""
+    
+    print("Testing rebalancing on unregister...")
+    limiter = BandwidthLimiter(rate=RATE)
+    
+    for job_id in ("a", "b", "c", "d"):
+        limiter.register(job_id)
+    assert limiter.get_stats()['share'] == RATE / 4
+    
+    limiter.unregister("c")
+    limiter.unregister("d")
+    stats = limiter.get_stats()
+    print(f"Share after unregister: {stats['share']:.0f} bytes/s for {stats['jobs']} jobs")
+    assert stats['jobs'] == 2
+    assert stats['share'] == RATE / 2
+    
+    limiter.unregister("b")
+    assert limiter.get_stats()['share'] == RATE
+    print("✅ Rebalancing on unregister: PASSED")
+
+
+def test_unregister_wakes_waiting_job():
+    """Test that a job blocked on its budget returns once it is unregistered"""
+    
+    print("Testing unregister of a waiting job...")
+    limiter = BandwidthLimiter(rate=1024, burst_seconds=1.0)
+    limiter.register("slow")
+    
+    finished = threading.Event()
+    
+    def consume():
+        # Ten seconds' worth of data at this rate; the job's own share and
+        # borrowed spare capacity cover only the first few chunks
+        for _ in range(10):
+            limiter.consume("slow", 1024)
+        finished.set()
+    
+    threading.Thread(target=consume, daemon=True).start()
+    assert not finished.wait(0.2), "consume did not wait for budget"
+    
+    limiter.unregister("slow")
+    assert finished.wait(1.0), "waiting job was not released"
+    print("✅ Unregister of a waiting job: PASSED")
+
+
+if __name__ == "__main__":
+    test_cap_enforcement()
+    test_rebalance_on_unregister()
+    test_unregister_wakes_waiting_job()
+    print("\nAll bandwidth limiter tests completed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for download size estimates
+Checks the estimates disk space admission is based on against format
+lists like the ones YouTube returns, and that admission can look up
+expired metadata without touching the cache statistics
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from downloader.diskspace import estimate_download_size
+from downloader.cache import MetadataCache
+
+STORYBOARD = {'format_id': 'sb0', 'ext': 'mhtml', 'vcodec': 'none', 'acodec': 'none', 'protocol': 'mhtml'}
+AUDIO_LOW = {'format_id': '139', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.5', 'filesize': 1000}
+AUDIO_HIGH = {'format_id': '140', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'filesize_approx': 3000}
+AUDIO_UNKNOWN = {'format_id': '251', 'ext': 'webm', 'vcodec': 'none', 'acodec': 'opus'}
+VIDEO = {'format_id': '137', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none', 'filesize': 50000}
+
+
+def test_audio_only_estimate():
+    """Test that storyboards and formats without a size are ignored for audio"""
+    
+    print("Testing audio-only estimate...")
+    info = {'formats': [STORYBOARD, AUDIO_LOW, AUDIO_UNKNOWN, AUDIO_HIGH, VIDEO], 'filesize_approx': 99999}
+    size = estimate_download_size(info, audio_only=True)
+    print(f"Audio estimate: {size}")
+    assert size == 3000
+    
+    # Without any sized audio format the video's own estimate is used
+    info = {'formats': [STORYBOARD, AUDIO_UNKNOWN, VIDEO], 'filesize_approx': 99999}
+    assert estimate_download_size(info, audio_only=True) == 99999
+    assert estimate_download_size({'formats': [STORYBOARD]}, audio_only=True) is None
+    print("✅ Audio-only estimate: PASSED")
+
+
+def test_format_estimate():
+    """Test estimates for explicit and merged format selections"""
+    
+    print("Testing format estimates...")
+    info = {'formats': [STORYBOARD, AUDIO_LOW, AUDIO_HIGH, VIDEO]}
+    
+    # Separate streams are counted twice for the remux
+    assert estimate_download_size(info, '137+139') == 2 * 51000
+    assert estimate_download_size(info, '140') == 3000
+    assert estimate_download_size(info, 'sb0') is None
+    
+    info = dict(info, requested_formats=[VIDEO, AUDIO_HIGH])
+    assert estimate_download_size(info) == 2 * 53000
+    assert estimate_download_size(None) is None
+    print("✅ Format estimates: PASSED")
+
+
+def test_cache_peek():
+    """Test that peeking finds expired entries and leaves the stats alone"""
+    
+    print("Testing cache peek...")
+    with tempfile.TemporaryDirectory() as temp:
+        cache = MetadataCache(Path(temp), ttl=0.05, max_memory_entries=1)
+        info = {'id': 'dQw4w9WgXcQ', 'formats': [AUDIO_LOW, VIDEO]}
+        cache.put('dQw4w9WgXcQ', info)
+        cache.put('jNQXAC9IVRw', {'id': 'jNQXAC9IVRw'})
+        time.sleep(0.1)
+        
+        # The first entry was evicted from memory and is read from disk
+        for _ in range(3):
+            assert cache.peek('dQw4w9WgXcQ') is None
+            assert cache.peek('dQw4w9WgXcQ', ignore_ttl=True) == info
+        assert cache.peek('missing0000', ignore_ttl=True) is None
+        
+        stats = cache.get_stats()
+        print(f"Stats after peeking: {stats}")
+        assert stats['memory_hits'] == stats['disk_hits'] == stats['misses'] == 0
+        assert stats['disk_entries'] == 2
+        
+        assert cache.get('dQw4w9WgXcQ') is None
+        assert cache.get_stats()['misses'] == 1
+    print("✅ Cache peek: PASSED")
+
+
+if __name__ == "__main__":
+    test_audio_only_estimate()
+    test_format_estimate()
+    test_cache_peek()
+    print("\nAll disk space tests completed!")
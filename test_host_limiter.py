@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-host limiter
+Checks that throttled hosts get fewer slots, recover after successful
+requests, that the circuit breaker opens, probes and closes again, and
+that yt-dlp's internal retries are charged to the media host
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from downloader.hostlimit import HostLimiter, HostSlotCancelled, is_throttling_error, is_forbidden_error
+from downloader.core import YouTubeDownloader
+from downloader.validation import DownloadRequest, DownloadType
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+MEDIA_HOST = "rr3---sn-4g5e6nsz.googlevideo.com"
+MEDIA_URL = f"https://{MEDIA_HOST}/videoplayback?itag=137"
+
+
+class HTTPStatusError(Exception):
+    """Error carrying an HTTP status like the ones yt-dlp raises"""
+    
+    def __init__(self, status):
+        super().__init__(f"HTTP Error {status}")
+        self.status = status
+
+
+def run_request(limiter, status=None):
+    """Hold a slot for one request, failing with the given HTTP status"""
+    try:
+        with limiter.slot(URL):
+            if status is not None:
+                raise HTTPStatusError(status)
+    except HTTPStatusError:
+        pass
+
+
+def circuit(limiter):
+    """Get the circuit state of the test host"""
+    return limiter.get_stats()['youtube.com']['circuit']
+
+
+def test_error_classification():
+    """Test that only 429 and 503 count as throttling"""
+    
+    print("Testing error classification...")
+    assert is_throttling_error(HTTPStatusError(429))
+    assert is_throttling_error(HTTPStatusError(503))
+    assert not is_throttling_error(HTTPStatusError(403))
+    assert not is_throttling_error(HTTPStatusError(500))
+    assert is_forbidden_error(HTTPStatusError(403))
+    
+    # yt-dlp wraps the original error
+    wrapped = Exception("Unable to download")
+    wrapped.exc_info = (HTTPStatusError, HTTPStatusError(429), None)
+    assert is_throttling_error(wrapped)
+    print("✅ Error classification: PASSED")
+
+
+def test_backoff_and_recovery():
+    """Test that the limit halves on 429 and grows back on success"""
+    
+    print("Testing backoff on 429 and recovery...")
+    limiter = HostLimiter(max_per_host=4, failure_threshold=10)
+    
+    run_request(limiter, 429)
+    assert limiter.get_stats()['youtube.com']['limit'] == 2
+    
+    # A 403 is not throttling and leaves the limit alone
+    run_request(limiter, 403)
+    assert limiter.get_stats()['youtube.com']['limit'] == 2
+    
+    for _ in range(10):
+        run_request(limiter)
+    stats = limiter.get_stats()['youtube.com']
+    print(f"Limit after recovery: {stats['limit']}")
+    assert stats['limit'] == 4
+    assert stats['in_flight'] == 0
+    assert circuit(limiter) == 'closed'
+    print("✅ Backoff and recovery: PASSED")
+
+
+def test_concurrency_cap():
+    """Test that callers wait once the host's slots are taken"""
+    
+    print("Testing concurrency cap...")
+    limiter = HostLimiter(max_per_host=2)
+    release = threading.Event()
+    
+    def hold():
+        with limiter.slot(URL):
+            release.wait()
+    
+    holders = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in holders:
+        thread.start()
+    while limiter.get_stats().get('youtube.com', {}).get('in_flight') != 2:
+        time.sleep(0.01)
+    
+    cancel_event = threading.Event()
+    threading.Timer(0.2, cancel_event.set).start()
+    try:
+        with limiter.slot(URL, cancel_event):
+            raise AssertionError("third caller got a slot")
+    except HostSlotCancelled:
+        pass
+    
+    release.set()
+    for thread in holders:
+        thread.join()
+    print("✅ Concurrency cap: PASSED")
+
+
+def test_circuit_breaker():
+    """Test that the circuit opens, lets one probe through and closes"""
+    
+    print("Testing circuit breaker...")
+    limiter = HostLimiter(max_per_host=4, min_per_host=1, failure_threshold=2,
+                          base_backoff=0.2, max_backoff=0.2)
+    
+    # A request admitted before the trip keeps running throughout
+    release = threading.Event()
+    started = threading.Event()
+    
+    def hold():
+        with limiter.slot(URL):
+            started.set()
+            release.wait()
+    
+    holder = threading.Thread(target=hold)
+    holder.start()
+    started.wait()
+    
+    run_request(limiter, 429)
+    assert circuit(limiter) == 'closed'
+    run_request(limiter, 429)
+    assert circuit(limiter) == 'open'
+    
+    # The probe is admitted after the backoff despite the older request
+    waited = time.monotonic()
+    with limiter.slot(URL):
+        waited = time.monotonic() - waited
+        assert circuit(limiter) == 'half-open'
+    print(f"Probe admitted after {waited:.2f}s")
+    assert waited >= 0.05
+    assert circuit(limiter) == 'closed'
+    
+    release.set()
+    holder.join()
+    
+    # A throttled probe opens the circuit again
+    run_request(limiter, 429)
+    run_request(limiter, 429)
+    assert circuit(limiter) == 'open'
+    time.sleep(0.25)
+    run_request(limiter, 429)
+    assert circuit(limiter) == 'open'
+    print("✅ Circuit breaker: PASSED")
+
+
+def test_internal_retries():
+    """Test that only throttled yt-dlp retries shrink the media host's limit"""
+    
+    print("Testing internal retries...")
+    with tempfile.TemporaryDirectory() as temp:
+        downloader = YouTubeDownloader(Path(temp), {})
+        try:
+            downloader.host_limiter = HostLimiter(max_per_host=4, base_backoff=0.01, max_backoff=0.02)
+            request = DownloadRequest(url=URL, download_type=DownloadType.VIDEO, output_path=Path(temp),
+                                      request_id="retries")
+            downloader.active_downloads[request.request_id] = {'media_url': MEDIA_URL}
+            opts = downloader._get_ydl_opts(request)
+            retry_sleep = opts['retry_sleep_functions']
+            
+            # yt-dlp logs the error of a retry right before asking for the delay
+            opts['logger'].debug("[download] Got error: Connection reset by peer. Retrying fragment 3 (1/10)...")
+            retry_sleep['fragment'](n=0)
+            assert MEDIA_HOST not in downloader.host_limiter.get_stats()
+            
+            # Fragments throttled together shrink the limit once
+            opts['logger'].debug("[download] Got error: HTTP Error 429: Too Many Requests. Retrying fragment 3 (1/10)...")
+            retry_sleep['fragment'](n=0)
+            retry_sleep['fragment'](n=0)
+            stats = downloader.host_limiter.get_stats()
+            print(f"Host limits after throttled retries: {stats}")
+            assert stats[MEDIA_HOST]['limit'] == 2
+            assert 'youtube.com' not in stats
+            
+            # Extraction retries count against the page host
+            opts['logger'].warning("HTTP Error 503: Service Unavailable. Retrying (1/3)...")
+            retry_sleep['extractor'](n=0)
+            assert downloader.host_limiter.get_stats()['youtube.com']['limit'] == 2
+        finally:
+            downloader.shutdown()
+    print("✅ Internal retries: PASSED")
+
+
+if __name__ == "__main__":
+    test_error_classification()
+    test_backoff_and_recovery()
+    test_concurrency_cap()
+    test_circuit_breaker()
+    test_internal_retries()
+    print("\nAll host limiter tests completed!")
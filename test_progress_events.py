@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for progress event delivery
+Checks that queued updates of a download are coalesced into its latest
+state, that terminal events are never dropped and that listeners run off
+the publishing thread
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from downloader.progress import ProgressEventDispatcher, ProgressEvent, ProgressEventType
+from downloader.validation import ProgressInfo, ProgressStatus
+
+
+def make_event(request_id, percentage, event_type=ProgressEventType.UPDATED, status=ProgressStatus.DOWNLOADING):
+    """Build an event for a download at the given percentage"""
+    progress = ProgressInfo(request_id=request_id, status=status, percentage=percentage)
+    return ProgressEvent(event_type=event_type, request_id=request_id, progress=progress,
+                         data={'percentage': percentage})
+
+
+class BlockingListener:
+    """Records events and holds the delivery thread on the first one"""
+    
+    def __init__(self):
+        self.events = []
+        self.threads = set()
+        self.first_delivered = threading.Event()
+        self.gate = threading.Event()
+    
+    def __call__(self, event):
+        self.events.append(event)
+        self.threads.add(threading.current_thread().name)
+        if not self.first_delivered.is_set():
+            self.first_delivered.set()
+            self.gate.wait(5)
+
+
+def start_dispatcher():
+    """Start a dispatcher whose delivery thread is held by its listener"""
+    listener = BlockingListener()
+    dispatcher = ProgressEventDispatcher(lambda: [listener], rate=20.0)
+    dispatcher.publish(make_event("warmup", 0.0))
+    assert listener.first_delivered.wait(2), "first event was not delivered"
+    return dispatcher, listener
+
+
+def test_coalescing():
+    """Test that only the latest update per download is delivered"""
+    
+    print("Testing update coalescing...")
+    dispatcher, listener = start_dispatcher()
+    
+    for step in range(1, 51):
+        dispatcher.publish(make_event("a", float(step)))
+        dispatcher.publish(make_event("b", step / 2))
+    
+    listener.gate.set()
+    assert dispatcher.flush(2), "queued events were not delivered"
+    dispatcher.close()
+    
+    delivered = [e for e in listener.events if e.request_id != "warmup"]
+    print(f"Published 100 updates, delivered {len(delivered)}")
+    assert [e.request_id for e in delivered] == ["a", "b"]
+    assert delivered[0].progress.percentage == 50.0
+    assert delivered[1].progress.percentage == 25.0
+    assert delivered[0].data['percentage'] == 50.0
+    assert threading.current_thread().name not in listener.threads
+    print("✅ Update coalescing: PASSED")
+
+
+def test_terminal_events():
+    """Test that terminal events are delivered in order and never merged"""
+    
+    print("Testing terminal event delivery...")
+    dispatcher, listener = start_dispatcher()
+    
+    dispatcher.publish(make_event("a", 90.0))
+    dispatcher.publish(make_event("a", 100.0, ProgressEventType.COMPLETED, ProgressStatus.COMPLETED), urgent=True)
+    dispatcher.publish(make_event("b", 10.0))
+    dispatcher.publish(make_event("b", 10.0, ProgressEventType.FAILED, ProgressStatus.FAILED), urgent=True)
+    dispatcher.publish(make_event("c", 5.0, ProgressEventType.STARTED), urgent=True)
+    dispatcher.publish(make_event("c", 6.0, ProgressEventType.CANCELLED, ProgressStatus.CANCELLED), urgent=True)
+    
+    listener.gate.set()
+    assert dispatcher.flush(2), "queued events were not delivered"
+    dispatcher.close()
+    
+    delivered = [(e.request_id, e.event_type) for e in listener.events if e.request_id != "warmup"]
+    print(f"Delivered: {delivered}")
+    assert delivered == [
+        ("a", ProgressEventType.COMPLETED),
+        ("b", ProgressEventType.FAILED),
+        ("c", ProgressEventType.STARTED),
+        ("c", ProgressEventType.CANCELLED),
+    ]
+    print("✅ Terminal event delivery: PASSED")
+
+
+def test_close_delivers_remaining():
+    """Test that closing the dispatcher delivers what is still queued"""
+    
+    print("Testing close...")
+    dispatcher, listener = start_dispatcher()
+    
+    dispatcher.publish(make_event("a", 40.0))
+    listener.gate.set()
+    dispatcher.close()
+    
+    assert [e.request_id for e in listener.events] == ["warmup", "a"]
+    print("✅ Close: PASSED")
+
+
+if __name__ == "__main__":
+    test_coalescing()
+    test_terminal_events()
+    test_close_delivers_remaining()
+    print("\nAll progress event tests completed!")
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Test script for the segmented HTTP downloader
+Serves a file from a local range-capable HTTP server and checks that
+segmented downloads arrive intact, retry failed segments and resume
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from downloader.segmented import SegmentedDownloader, SegmentedDownloadCancelled
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 12345)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Range support, optionally dropping connections"""
+    
+    ranges_enabled = True
+    drop_after = None  # bytes sent before the first response is cut off
+    drop_lock = threading.Lock()
+    delay = 0.0
+    requests_seen = []
+    
+    def do_GET(self):
+        start, end = 0, len(PAYLOAD) - 1
+        range_header = self.headers.get('Range')
+        type(self).requests_seen.append(range_header)
+        
+        if range_header and self.ranges_enabled:
+            first, last = range_header.replace('bytes=', '').split('-')
+            start, end = int(first), int(last) if last else len(PAYLOAD) - 1
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        
+        body = PAYLOAD[start:end + 1]
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        
+        # Only one request may take the injected failure
+        drop_after = None
+        with self.drop_lock:
+            if type(self).drop_after is not None and len(body) > type(self).drop_after:
+                drop_after, type(self).drop_after = type(self).drop_after, None
+        
+        if drop_after is not None:
+            # Simulate a connection reset in the middle of a segment
+            self.wfile.write(body[:drop_after])
+            self.close_connection = True
+            return
+        
+        for offset in range(0, len(body), 65536):
+            self.wfile.write(body[offset:offset + 65536])
+            if self.delay:
+                time.sleep(self.delay)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    """Start the test server on a free port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+
+
+def reset_handler(**overrides):
+    """Restore the default server behaviour"""
+    RangeHandler.ranges_enabled = True
+    RangeHandler.drop_after = None
+    RangeHandler.delay = 0.0
+    RangeHandler.requests_seen = []
+    for key, value in overrides.items():
+        setattr(RangeHandler, key, value)
+
+
+def test_segmented_download():
+    """Test downloading over several connections"""
+    
+    print("Testing segmented download...")
+    server, url = start_server()
+    reset_handler()
+    
+    downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024, progress_interval=0)
+    reports = []
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            destination = Path(temp) / "video.mp4"
+            downloader.download(url, destination, progress_callback=reports.append)
+            
+            assert destination.read_bytes() == PAYLOAD
+            assert not Path(f"{destination}.part").exists()
+            
+            ranged = [r for r in RangeHandler.requests_seen if r and r != 'bytes=0-0']
+            print(f"Ranged requests: {len(ranged)}")
+            assert len(ranged) == 4
+            
+            downloaded = [r['downloaded_bytes'] for r in reports]
+            assert downloaded == sorted(downloaded), "progress moved backwards"
+            assert reports[-1]['status'] == 'finished'
+            assert reports[-1]['downloaded_bytes'] == len(PAYLOAD)
+            print("✅ Segmented download: PASSED")
+    finally:
+        downloader.close()
+        server.shutdown()
+
+
+def test_segment_retry():
+    """Test that a dropped connection only retries its own segment"""
+    
+    print("Testing segment retry...")
+    server, url = start_server()
+    reset_handler(drop_after=100000)
+    
+    downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024, retries=2)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            destination = Path(temp) / "video.mp4"
+            # Retry immediately instead of backing off
+            cancel_event = threading.Event()
+            original_wait = cancel_event.wait
+            cancel_event.wait = lambda timeout=None: original_wait(0)
+            
+            downloader.download(url, destination, cancel_event=cancel_event)
+            assert destination.read_bytes() == PAYLOAD
+            
+            # One segment resumed after the bytes it already had
+            ranged = [r for r in RangeHandler.requests_seen if r and r != 'bytes=0-0']
+            print(f"Ranged requests: {len(ranged)}")
+            assert len(ranged) == 5
+            print("✅ Segment retry: PASSED")
+    finally:
+        downloader.close()
+        server.shutdown()
+
+
+def test_chunked_requests():
+    """Test that no range request exceeds the request size"""
+    
+    print("Testing chunked range requests...")
+    server, url = start_server()
+    reset_handler(drop_after=100000)
+    
+    downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024, retries=1)
+    request_size = 256 * 1024
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            destination = Path(temp) / "video.mp4"
+            cancel_event = threading.Event()
+            original_wait = cancel_event.wait
+            cancel_event.wait = lambda timeout=None: original_wait(0)
+            
+            downloader.download(url, destination, cancel_event=cancel_event, request_size=request_size)
+            assert destination.read_bytes() == PAYLOAD
+            
+            ranged = [r for r in RangeHandler.requests_seen if r and r != 'bytes=0-0']
+            sizes = [int(r.split('-')[1]) - int(r.split('=')[1].split('-')[0]) + 1 for r in ranged]
+            print(f"Ranged requests: {len(ranged)}, largest {max(sizes)} bytes")
+            assert max(sizes) <= request_size
+            assert len(ranged) > len(PAYLOAD) // request_size
+            print("✅ Chunked range requests: PASSED")
+    finally:
+        downloader.close()
+        server.shutdown()
+
+
+def test_cancel_and_resume():
+    """Test that a cancelled download continues from its partial file"""
+    
+    print("Testing cancel and resume...")
+    server, url = start_server()
+    reset_handler(delay=0.01)
+    
+    downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024, progress_interval=0)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            destination = Path(temp) / "video.mp4"
+            cancel_event = threading.Event()
+            
+            def cancel_halfway(d):
+                if d['downloaded_bytes'] > len(PAYLOAD) // 2:
+                    cancel_event.set()
+            
+            try:
+                downloader.download(url, destination, progress_callback=cancel_halfway,
+                                    cancel_event=cancel_event)
+                raise AssertionError("download was not cancelled")
+            except SegmentedDownloadCancelled:
+                pass
+            
+            assert Path(f"{destination}.part.segments").exists()
+            
+            reset_handler()
+            reports = []
+            downloader.download(url, destination, progress_callback=reports.append)
+            assert destination.read_bytes() == PAYLOAD
+            assert not Path(f"{destination}.part.segments").exists()
+            
+            fetched = sum(int(r.split('-')[1]) - int(r.split('=')[1].split('-')[0]) + 1
+                          for r in RangeHandler.requests_seen if r and r != 'bytes=0-0')
+            print(f"Bytes fetched after resume: {fetched} of {len(PAYLOAD)}")
+            assert fetched < len(PAYLOAD)
+            print("✅ Cancel and resume: PASSED")
+    finally:
+        downloader.close()
+        server.shutdown()
+
+
+def saved_bytes(state_path):
+    """Get the bytes recorded in a segment state file"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return sum(done for _, _, done in json.load(f)['segments'])
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def test_resume_after_kill():
+    """Test that a killed download continues from its periodically saved state"""
+    
+    print("Testing resume after the process was killed...")
+    server, url = start_server()
+    reset_handler(delay=0.05)
+    
+    script = (
+        "import sys\n"
+        "sys.path.insert(0, sys.argv[1])\n"
+        "from downloader.segmented import SegmentedDownloader\n"
+        "downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024,\n"
+        "                                 write_buffer_size=65536, state_interval=0.05)\n"
+        "downloader.download(sys.argv[2], sys.argv[3])\n"
+    )
+    downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            destination = Path(temp) / "video.mp4"
+            state_path = Path(f"{destination}.part.segments")
+            
+            process = subprocess.Popen([sys.executable, '-c', script, str(Path(__file__).parent),
+                                        url, str(destination)])
+            try:
+                # Kill without any cleanup once part of the data is on record
+                deadline = time.monotonic() + 20
+                while saved_bytes(state_path) < len(PAYLOAD) // 4 and time.monotonic() < deadline:
+                    time.sleep(0.02)
+            finally:
+                process.kill()
+                process.wait()
+            
+            saved = saved_bytes(state_path)
+            print(f"Saved before kill: {saved} of {len(PAYLOAD)}")
+            assert 0 < saved < len(PAYLOAD)
+            
+            reset_handler()
+            downloader.download(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+            assert not state_path.exists()
+            
+            fetched = sum(int(r.split('-')[1]) - int(r.split('=')[1].split('-')[0]) + 1
+                          for r in RangeHandler.requests_seen if r and r != 'bytes=0-0')
+            print(f"Bytes fetched after resume: {fetched}")
+            assert fetched == len(PAYLOAD) - saved
+            print("✅ Resume after kill: PASSED")
+    finally:
+        downloader.close()
+        server.shutdown()
+
+
+def test_no_range_support():
+    """Test the single connection fallback"""
+    
+    print("Testing server without range support...")
+    server, url = start_server()
+    reset_handler(ranges_enabled=False)
+    
+    downloader = SegmentedDownloader(connections=4, min_segment_size=512 * 1024)
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            destination = Path(temp) / "video.mp4"
+            downloader.download(url, destination)
+            assert destination.read_bytes() == PAYLOAD
+            print("✅ Single connection fallback: PASSED")
+    finally:
+        downloader.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_segmented_download()
+    test_segment_retry()
+    test_chunked_requests()
+    test_cancel_and_resume()
+    test_resume_after_kill()
+    test_no_range_support()
+    print("\nAll segmented download tests completed!")